@@ -0,0 +1,209 @@
+# testes/artifacts.py
+
+import atexit
+import base64
+import hashlib
+import io
+import os
+import queue
+import shutil
+import threading
+import time
+
+from config import LOG_DIR
+
+SCREENSHOT_DIR = os.path.join(LOG_DIR, "screenshots")
+
+# Política: "always" grava tudo; "failure" só guarda capturas de falhas
+# (e as do mesmo grupo quando o grupo termina com falha)
+POLICY = os.environ.get("SCREENSHOT_POLICY", "always")
+# Formato final (png, webp ou jpeg) e escala (1.0 = tamanho original).
+# Conversão e redução exigem Pillow; sem ele o PNG é gravado como veio.
+FORMAT = os.environ.get("SCREENSHOT_FORMAT", "png").lower()
+SCALE = float(os.environ.get("SCREENSHOT_SCALE", "1.0"))
+QUALITY = 80
+# Capturas aguardando o worker; com a fila cheia o teste espera (memória limitada)
+QUEUE_SIZE = 16
+
+_EXTENSIONS = {"png": "png", "webp": "webp", "jpeg": "jpg", "jpg": "jpg"}
+
+
+def _has_pillow():
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class ArtifactPipeline:
+    """
+    Pipeline de screenshots em segundo plano.
+
+    A thread do teste só pega a captura crua do driver (base64). Decodificação,
+    deduplicação de frames idênticos, redução, compressão e escrita em disco
+    ficam com um worker que consome uma fila limitada.
+    """
+
+    def __init__(self, out_dir=SCREENSHOT_DIR, policy=POLICY, fmt=FORMAT, scale=SCALE, queue_size=QUEUE_SIZE):
+        self.out_dir = out_dir
+        self.policy = policy
+        self.fmt = "jpeg" if fmt == "jpg" else fmt
+        self.scale = scale
+        # Sem Pillow não há conversão: os caminhos devolvidos já saem em .png
+        self.ext = _EXTENSIONS.get(fmt, "png") if _has_pillow() or (self.fmt == "png" and scale >= 1.0) else "png"
+        self.stats = {"captured": 0, "written": 0, "deduped": 0, "discarded": 0, "bytes_written": 0, "capture_s": 0.0}
+        self._queue = queue.Queue(maxsize=queue_size)
+        # digest → primeiro caminho com o conteúdo, e o inverso para invalidar
+        self._seen = {}
+        self._paths = {}
+        self._held = {}
+        self._lock = threading.Lock()
+        self._pillow_warned = False
+        self.pid = os.getpid()
+        self._worker = threading.Thread(target=self._work, name="artifacts", daemon=True)
+        self._worker.start()
+
+    # --- Thread do teste ---
+    def capture(self, driver, name, group=None, failure=False):
+        """
+        Captura a tela e devolve o caminho final do arquivo (gravado depois
+        pelo worker), ou None se a política descarta a captura.
+        """
+        if self.policy == "failure" and not failure and group is None:
+            with self._lock:
+                self.stats["discarded"] += 1
+            return None
+
+        start = time.perf_counter()
+        data = driver.get_screenshot_as_base64()
+        path = os.path.join(self.out_dir, f"{name}.{self.ext}")
+        with self._lock:
+            self.stats["captured"] += 1
+            self.stats["capture_s"] += time.perf_counter() - start
+            if self.policy == "failure" and not failure:
+                # Fica em memória até o grupo terminar (resolve)
+                self._held.setdefault(group, []).append((path, data))
+                return path
+        self._queue.put((path, data))
+        return path
+
+    def resolve(self, group, failed):
+        """
+        Encerra um grupo: com falha, grava as capturas retidas; sem falha,
+        descarta. Retorna os caminhos descartados.
+        """
+        with self._lock:
+            held = self._held.pop(group, [])
+            if not failed:
+                self.stats["discarded"] += len(held)
+        if not failed:
+            return [path for path, _ in held]
+        for item in held:
+            self._queue.put(item)
+        return []
+
+    def flush(self):
+        """Espera o worker gravar tudo o que já foi enfileirado."""
+        self._queue.join()
+
+    def close(self):
+        self.flush()
+        self._queue.put(None)
+        self._worker.join()
+
+    # --- Worker ---
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception as e:
+                print(f"⚠️ Falha ao gravar screenshot {item[0]}: {e!r}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, path, data):
+        raw = base64.b64decode(data)
+        digest = hashlib.sha1(raw).hexdigest()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # O caminho vai receber conteúdo novo: deixa de servir de origem para links
+        old = self._paths.pop(path, None)
+        if old is not None and self._seen.get(old) == path:
+            del self._seen[old]
+
+        # Frame idêntico a um já gravado: link para o arquivo existente
+        first = self._seen.get(digest)
+        if first and first != path and os.path.exists(first):
+            tmp = path + ".tmp"
+            try:
+                os.link(first, tmp)
+            except OSError:
+                shutil.copyfile(first, tmp)
+            os.replace(tmp, path)
+            with self._lock:
+                self.stats["deduped"] += 1
+            return
+
+        body, ext = self._encode(raw)
+        if ext != self.ext:
+            path = os.path.splitext(path)[0] + "." + ext
+        # Arquivo temporário + os.replace: reescrever um caminho nunca altera
+        # outro nome ligado ao mesmo conteúdo (hard link de um frame repetido)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+        self._seen[digest] = path
+        self._paths[path] = digest
+        with self._lock:
+            self.stats["written"] += 1
+            self.stats["bytes_written"] += len(body)
+
+    def _encode(self, raw):
+        """
+        Reduz e converte o PNG capturado; devolve (bytes, extensão). Sem
+        Pillow, devolve o PNG original com a extensão `png`.
+        """
+        if self.fmt == "png" and self.scale >= 1.0:
+            return raw, self.ext
+        try:
+            from PIL import Image
+        except ImportError:
+            if not self._pillow_warned:
+                print("⚠️ Pillow não instalado: screenshots gravados em PNG sem redução")
+                self._pillow_warned = True
+            return raw, "png"
+
+        image = Image.open(io.BytesIO(raw))
+        if self.scale < 1.0:
+            size = (max(1, int(image.width * self.scale)), max(1, int(image.height * self.scale)))
+            image = image.resize(size, Image.LANCZOS)
+        out = io.BytesIO()
+        if self.fmt == "jpeg":
+            image.convert("RGB").save(out, "JPEG", quality=QUALITY, optimize=True)
+        elif self.fmt == "webp":
+            image.save(out, "WEBP", quality=QUALITY, method=4)
+        else:
+            image.save(out, "PNG", optimize=True)
+        return out.getvalue(), self.ext
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def pipeline():
+    """
+    Pipeline do processo, criado na primeira captura e esvaziado na saída.
+    Um processo filho (fork) herda o objeto do pai, mas não a thread do
+    worker: ganha um pipeline próprio, senão `flush()` esperaria para sempre.
+    """
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None or _pipeline.pid != os.getpid():
+            _pipeline = ArtifactPipeline()
+            atexit.register(_pipeline.close)
+        return _pipeline
@@ -0,0 +1,178 @@
+# testes/auth_bench.py
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from urllib.parse import quote, urlsplit
+
+import auth_session
+import report_store
+from config import LOG_DIR, ROOT, TESTS
+from load_api import run_load, summarize
+
+REPORT_PATH = os.path.join(LOG_DIR, "auth_bench.json")
+
+WORKLOADS = ["login", "protected", "public"]
+
+
+def _cookie(token):
+    return {"Cookie": f"{auth_session.COOKIE_NAME}={token}"} if token else {}
+
+
+def login_targets(supabase_url, supabase_key, tests=TESTS):
+    """
+    Mesma consulta de authService.login: user_data filtrado por email e senha
+    com .single() (Accept de objeto único). Credenciais inválidas dão 406.
+    """
+    targets = []
+    for i, t in enumerate(tests, start=1):
+        url = (f"{supabase_url}/rest/v1/user_data?select=*"
+               f"&email=eq.{quote(t['login'])}&password=eq.{quote(t['password'])}")
+        valid = t.get("expect_success", False)
+        targets.append({
+            "name": f"login.{i}",
+            "label": t["label"],
+            "url": url,
+            "headers": {
+                "apikey": supabase_key,
+                "Authorization": f"Bearer {supabase_key}",
+                "Accept": "application/vnd.pgrst.object+json",
+            },
+            "expect": {"status": 200 if valid else 406},
+        })
+    return targets
+
+
+def token_targets(root, path="/"):
+    """Rota protegida com token válido, expirado, malformado e sem token."""
+    user_id, email = auth_session.TOKEN_USER
+    tokens = {
+        "valid": auth_session.forge_token(user_id, email),
+        "expired": auth_session.forge_token(user_id, email, time.time() - auth_session.EXPIRED_AGE_S),
+        "malformed": "nao-e-um-token",
+        "none": None,
+    }
+    targets = []
+    for kind, token in tokens.items():
+        expect = {"status": 200} if kind == "valid" else {"status": 307, "location": "/login"}
+        targets.append({
+            "name": f"protected.{kind}",
+            "label": f"{path} com token {kind}",
+            "url": root + path,
+            "headers": _cookie(token),
+            "allow_redirects": False,
+            "expect": expect,
+        })
+    return targets
+
+
+def public_targets(root, path="/login"):
+    """Rota pública: sem token renderiza; com token válido redireciona para a home."""
+    user_id, email = auth_session.TOKEN_USER
+    return [
+        {"name": "public.none", "label": f"{path} sem token", "url": root + path,
+         "allow_redirects": False, "expect": {"status": 200}},
+        {"name": "public.valid", "label": f"{path} com token válido", "url": root + path,
+         "headers": _cookie(auth_session.forge_token(user_id, email)),
+         "allow_redirects": False, "expect": {"status": 307, "location": "/"}},
+    ]
+
+
+def _location_path(location):
+    """Só o caminho do redirect (a origem varia entre ambientes)."""
+    if not location:
+        return None
+    parts = urlsplit(location)
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+def _matches(record, expect):
+    if record["error"] or record["status"] != expect["status"]:
+        return False
+    location = _location_path(record["location"])
+    return "location" not in expect or (location or "").split("?")[0] == expect["location"]
+
+
+def analyze(targets, records, wall):
+    """
+    Resumo do load_api (vazão, latências, status) acrescido, por alvo, dos
+    destinos de redirect e da taxa de respostas diferentes do esperado.
+    """
+    summary = summarize(records, wall)
+    for target in targets:
+        s = summary.get(target["name"])
+        if s is None:
+            continue
+        rows = [r for r in records if r["name"] == target["name"]]
+        redirects = {}
+        for r in rows:
+            location = _location_path(r["location"])
+            if location:
+                redirects[location] = redirects.get(location, 0) + 1
+        unexpected = sum(1 for r in rows if not _matches(r, target["expect"]))
+        s.update(
+            label=target["label"],
+            expected=target["expect"],
+            redirects=redirects,
+            unexpected_rate=round(unexpected / len(rows), 4),
+        )
+    return summary
+
+
+def print_workload(name, summary, wall, dropped):
+    total = sum(s["requests"] for s in summary.values())
+    print(f"\n== {name}: {total} req em {wall:.1f}s ({total / wall:.1f} req/s) | descartadas: {dropped}")
+    print(f"{'alvo':<20}{'req':>7}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'inesp.%':>9}  status / redirects")
+    for key, s in summary.items():
+        lat = s["latency"]
+        breakdown = ", ".join(f"{k}×{v}" for k, v in {**s["statuses"], **s["redirects"]}.items())
+        print(f"{key:<20}{s['requests']:>7}{s['throughput_rps']:>9}{lat['p50_ms']:>9}{lat['p95_ms']:>9}{lat['p99_ms']:>9}"
+              f"{s['unexpected_rate'] * 100:>8.1f}%  {breakdown}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de vazão do login (Supabase) e do middleware de autenticação")
+    parser.add_argument("--root", default=ROOT)
+    parser.add_argument("--workloads", nargs="+", default=WORKLOADS, choices=WORKLOADS)
+    parser.add_argument("--supabase-url", default=os.environ.get("NEXT_PUBLIC_SUPABASE_URL"))
+    parser.add_argument("--supabase-key", default=os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY", "local"))
+    parser.add_argument("--protected-path", default="/")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=None, help="req/s (open loop); omitido = closed loop")
+    parser.add_argument("--duration", type=float, default=10, help="segundos por workload")
+    parser.add_argument("--output", default=REPORT_PATH)
+    args = parser.parse_args()
+
+    builders = {
+        "login": lambda: login_targets(args.supabase_url.rstrip("/"), args.supabase_key),
+        "protected": lambda: token_targets(args.root, args.protected_path),
+        "public": lambda: public_targets(args.root),
+    }
+    report = {"date": time.ctime(), "root": args.root, "concurrency": args.concurrency,
+              "rate": args.rate, "duration_s": args.duration, "workloads": {}}
+    flat = {}
+    for name in args.workloads:
+        if name == "login" and not args.supabase_url:
+            print("⚠️ Workload login ignorado: defina --supabase-url (ou NEXT_PUBLIC_SUPABASE_URL)")
+            continue
+        targets = builders[name]()
+        records, wall, dropped = asyncio.run(run_load(targets, args.concurrency, args.rate, args.duration))
+        summary = analyze(targets, records, wall)
+        print_workload(name, summary, wall, dropped)
+        report["workloads"][name] = {"wall_s": round(wall, 3), "dropped": dropped, "targets": summary}
+        for key, s in summary.items():
+            flat[f"auth.{key}.p95_ms"] = s["latency"]["p95_ms"]
+            flat[f"auth.{key}.unexpected_rate"] = s["unexpected_rate"]
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    if flat:
+        report_store.append_run(report_store.build_run("auth", flat))
+    print(f"\nRelatório salvo em: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
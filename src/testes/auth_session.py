@@ -0,0 +1,126 @@
+# testes/auth_session.py
+
+import base64
+import json
+import os
+import threading
+import time
+
+from config import LOG_DIR, ROOT, VALID_LOGIN
+
+# Cookie verificado pelo middleware.ts
+COOKIE_NAME = "auth-token"
+SESSION_PATH = os.path.join(LOG_DIR, ".session.json")
+
+# Validade do token em auth-service.ts (1 hora) e folga antes de renovar
+TOKEN_TTL_S = 60 * 60
+RENEW_MARGIN_S = 120
+
+# Usuário dos tokens forjados: o middleware só decodifica o token, não consulta o banco
+TOKEN_USER = (1, VALID_LOGIN["login"])
+# Idade de um token já recusado pelo verifySimpleToken (mais de 1 hora)
+EXPIRED_AGE_S = 2 * TOKEN_TTL_S
+
+_lock = threading.Lock()
+
+
+def token_issued_at(token):
+    """
+    Instante de emissão do token (segundos). O token do auth-service é
+    base64 de `${userId}-${email}-${timestamp_ms}`.
+    """
+    try:
+        decoded = base64.b64decode(token + "=" * (-len(token) % 4)).decode("utf-8")
+        return int(decoded.rsplit("-", 1)[1]) / 1000
+    except (ValueError, IndexError, UnicodeDecodeError):
+        return None
+
+
+def forge_token(user_id, email, issued_at=None):
+    """
+    Gera um token no mesmo formato do auth-service (para benchmarks).
+    `issued_at` em segundos; padrão = agora.
+    """
+    timestamp_ms = int((time.time() if issued_at is None else issued_at) * 1000)
+    return base64.b64encode(f"{user_id}-{email}-{timestamp_ms}".encode("utf-8")).decode("ascii")
+
+
+def is_valid(cookie, now=None):
+    """True se o token ainda tem validade (com folga de RENEW_MARGIN_S)."""
+    if not cookie:
+        return False
+    issued = token_issued_at(cookie["value"])
+    if issued is None:
+        return False
+    return (now or time.time()) < issued + TOKEN_TTL_S - RENEW_MARGIN_S
+
+
+def load_cached(path=SESSION_PATH):
+    """Cookie em cache, se ainda for válido."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            cookie = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return cookie if is_valid(cookie) else None
+
+
+def store_from_driver(driver, path=SESSION_PATH):
+    """Guarda o cookie de autenticação do driver (após um login pela UI)."""
+    cookie = next((c for c in driver.get_cookies() if c["name"] == COOKIE_NAME), None)
+    if cookie is None:
+        return None
+    cookie = {"name": COOKIE_NAME, "value": cookie["value"], "obtained_at": time.time()}
+    with _lock:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(cookie, f)
+    return cookie
+
+
+def get_session(login, password, driver=None, path=SESSION_PATH):
+    """
+    Retorna o cookie de sessão, fazendo login pela UI só quando o cache
+    não existe ou expirou. Sem `driver`, sobe um Chrome temporário.
+    """
+    with _lock:
+        cookie = load_cached(path)
+    if cookie:
+        return cookie
+
+    # Import tardio: teste_ui_api também importa este módulo
+    from driver_factory import build_driver
+    from teste_ui_api import run_login_attempt
+
+    own_driver = driver is None
+    if own_driver:
+        driver = build_driver(block_media=True)
+    try:
+        attempt = run_login_attempt(driver, 0, {"login": login, "password": password, "label": "sessão"})
+        return store_from_driver(driver, path) if attempt["success"] else None
+    finally:
+        if own_driver:
+            driver.quit()
+
+
+def inject_into_driver(driver, cookie, root=ROOT):
+    """
+    Injeta o cookie num driver novo. O navegador precisa estar na origem do
+    app; /favicon.ico é estático e não passa pelo middleware.
+    """
+    driver.get(root + "/favicon.ico")
+    driver.add_cookie({"name": cookie["name"], "value": cookie["value"], "path": "/"})
+
+
+def inject_into_requests(http, cookie):
+    """
+    Injeta o cookie numa requests.Session usada nas checagens de API. Sem
+    `domain`: o cookiejar recusa domínios sem ponto como `localhost`.
+    """
+    http.cookies.set(cookie["name"], cookie["value"])
+    return http
+
+
+def cookie_header(cookie):
+    """Header Cookie para clientes que não usam cookie jar (ex.: aiohttp)."""
+    return {"Cookie": f"{cookie['name']}={cookie['value']}"}
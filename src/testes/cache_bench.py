@@ -0,0 +1,331 @@
+# testes/cache_bench.py
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+import aiohttp
+import requests
+
+import report_store
+from config import API_ROUTES, LOG_DIR, ROOT
+from metrics import latency_summary
+from profile_data import DATA_PARTS
+
+REPORT_PATH = os.path.join(LOG_DIR, "cache_bench.json")
+
+# Rota → tabelas consultadas no Supabase a cada chamada sem cache
+ROUTE_TABLES = {route: [table] for route, table in DATA_PARTS.values()}
+ROUTE_TABLES["data"] = [table for _, table in DATA_PARTS.values()]
+
+# Padrão de acesso: cada visita abre uma página, que dispara as rotas dela
+# (home: editais + proponentes; feed: /api/data; filtro por tags)
+PAGE_VIEWS = {
+    "home": {"weight": 0.5, "routes": ["editals", "proposers"]},
+    "feed": {"weight": 0.35, "routes": ["data"]},
+    "tags": {"weight": 0.15, "routes": ["tags"]},
+}
+# Chance de o cliente virar um visitante novo (cache vazio) antes de cada visita
+NEW_VISITOR_P = 0.05
+# ETag que nenhuma resposta deveria ter: um 304 para ele é cache quebrado
+BOGUS_ETAG = '"cache-bench-nao-confere"'
+
+MODES = ["off", "on"]
+
+
+def parse_cache_control(value):
+    """`Cache-Control` → {diretiva: argumento ou True}."""
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') or True
+    return directives
+
+
+def freshness_s(directives):
+    """Tempo de vida explícito (max-age) para um cache privado; no-cache força revalidar."""
+    if "no-store" in directives or "no-cache" in directives:
+        return 0
+    try:
+        return max(0, int(directives.get("max-age", 0)))
+    except (TypeError, ValueError):
+        return 0
+
+
+async def _access(session, root, route, cache):
+    """
+    Um acesso lógico a `route`. Com `cache` (dict do cliente), se comporta
+    como o cache HTTP do navegador: resposta fresca não sai do cliente;
+    vencida com ETag é revalidada com If-None-Match.
+    """
+    now = time.monotonic()
+    entry = cache.get(route) if cache is not None else None
+    record = {"route": route, "outcome": None, "status": None, "latency": 0.0, "bytes": 0, "error": None}
+    if entry and entry["expires"] > now:
+        record["outcome"] = "fresh"
+        return record
+
+    headers = {"If-None-Match": entry["etag"]} if entry and entry["etag"] else {}
+    start = time.perf_counter()
+    try:
+        async with session.get(root + API_ROUTES[route], headers=headers) as resp:
+            body = await resp.read()
+            record.update(status=resp.status, bytes=len(body))
+            directives = parse_cache_control(resp.headers.get("Cache-Control"))
+            if resp.status == 304:
+                record["outcome"] = "revalidated"
+                if cache is not None:
+                    entry["expires"] = now + freshness_s(directives)
+            elif resp.status == 200:
+                record["outcome"] = "miss"
+                etag = resp.headers.get("ETag")
+                ttl = freshness_s(directives)
+                if cache is not None and "no-store" not in directives and (etag or ttl):
+                    cache[route] = {"etag": etag, "expires": now + ttl}
+            else:
+                record["outcome"] = "error"
+    except Exception as e:
+        record.update(outcome="error", error=type(e).__name__)
+    record["latency"] = time.perf_counter() - start
+    return record
+
+
+async def _client(session, root, rng, cache_on, end, think_s, records):
+    """Um visitante: visitas sorteadas por peso, com pausa exponencial entre elas."""
+    cache = {} if cache_on else None
+    views = list(PAGE_VIEWS)
+    weights = [PAGE_VIEWS[v]["weight"] for v in views]
+    while time.perf_counter() < end:
+        if cache is not None and rng.random() < NEW_VISITOR_P:
+            cache.clear()
+        view = rng.choices(views, weights)[0]
+        for route in PAGE_VIEWS[view]["routes"]:
+            records.append(await _access(session, root, route, cache))
+        # Mesmo sem pausa cede o loop: acessos frescos não fazem I/O
+        await asyncio.sleep(rng.expovariate(1 / think_s) if think_s else 0)
+
+
+async def upstream_stats(session, supabase_url, reset=False):
+    """Consultas por tabela no mock_supabase (`/__stats`); None se indisponível."""
+    if not supabase_url:
+        return None
+    try:
+        async with session.get(f"{supabase_url}/__stats", params={"reset": "1"} if reset else None) as resp:
+            return await resp.json() if resp.status == 200 else None
+    except (aiohttp.ClientError, ValueError):
+        return None
+
+
+async def run_mode(root, supabase_url, cache_on, clients, duration, think_s, seed):
+    """Roda os `clients` por `duration` segundos; mesma semente nos dois modos."""
+    records = []
+    connector = aiohttp.TCPConnector(limit=clients)
+    async with aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar()) as session:
+        await upstream_stats(session, supabase_url, reset=True)
+        start = time.perf_counter()
+        end = start + duration
+        await asyncio.gather(*(_client(session, root, random.Random(seed + i), cache_on, end, think_s, records)
+                               for i in range(clients)))
+        wall = time.perf_counter() - start
+        upstream = await upstream_stats(session, supabase_url)
+    return records, wall, upstream
+
+
+def _outcomes(rows):
+    counts = dict.fromkeys(["fresh", "revalidated", "miss", "error"], 0)
+    for r in rows:
+        counts[r["outcome"]] += 1
+    return counts
+
+
+def summarize_mode(records, wall, upstream):
+    """
+    Taxas de acerto e latências do modo. `latency` é a do acesso lógico
+    (resposta fresca do cache local conta como 0); `network_latency` só
+    das requisições que saíram do cliente.
+    """
+    sent = [r for r in records if r["outcome"] != "fresh"]
+    outcomes = _outcomes(records)
+    accesses = len(records)
+    hits = outcomes["fresh"] + outcomes["revalidated"]
+    summary = {
+        "accesses": accesses,
+        "requests_sent": len(sent),
+        "throughput_aps": round(accesses / wall, 2) if wall else None,
+        "outcomes": outcomes,
+        "hit_rate": round(hits / accesses, 4) if accesses else None,
+        "miss_rate": round(outcomes["miss"] / accesses, 4) if accesses else None,
+        "latency": latency_summary([r["latency"] for r in records]),
+        "network_latency": latency_summary([r["latency"] for r in sent]),
+        "bytes_total": sum(r["bytes"] for r in records),
+        "upstream": upstream,
+        "upstream_per_access": round(upstream["total"] / accesses, 4) if upstream and accesses else None,
+        "routes": {},
+    }
+    for route in dict.fromkeys(r["route"] for r in records):
+        rows = [r for r in records if r["route"] == route]
+        summary["routes"][route] = {
+            "accesses": len(rows),
+            "outcomes": _outcomes(rows),
+            "latency": latency_summary([r["latency"] for r in rows]),
+            "upstream_expected_uncached": len(rows) * len(ROUTE_TABLES[route]),
+        }
+    return summary
+
+
+def check_headers(root, routes):
+    """
+    Sonda cada rota fora da carga: cabeçalhos de cache, estabilidade do ETag,
+    304 para o ETag certo e 200 para um ETag que não confere. Rotas sem ETag
+    ficam só registradas (sem cache); `--require-cache` as torna problema.
+    """
+    results = {}
+    with requests.Session() as http:
+        for route in routes:
+            url = root + API_ROUTES[route]
+            first = http.get(url, timeout=30)
+            second = http.get(url, timeout=30)
+            etag = first.headers.get("ETag")
+            r = {
+                "status": first.status_code,
+                "etag": etag,
+                "cache_control": first.headers.get("Cache-Control"),
+                "vary": first.headers.get("Vary"),
+                "etag_stable": None,
+                "conditional_status": None,
+                "bogus_status": None,
+                "problems": [],
+            }
+            if etag:
+                same_body = first.content == second.content
+                r["etag_stable"] = second.headers.get("ETag") == etag
+                if same_body and not r["etag_stable"]:
+                    r["problems"].append("ETag muda com o mesmo corpo")
+                if not same_body and r["etag_stable"]:
+                    r["problems"].append("ETag igual para corpos diferentes")
+                conditional = http.get(url, headers={"If-None-Match": etag}, timeout=30)
+                r["conditional_status"] = conditional.status_code
+                if same_body and conditional.status_code != 304:
+                    r["problems"].append(f"If-None-Match com o ETag atual deu {conditional.status_code}, esperado 304")
+                if conditional.status_code == 304 and conditional.content:
+                    r["problems"].append("304 com corpo")
+                bogus = http.get(url, headers={"If-None-Match": BOGUS_ETAG}, timeout=30)
+                r["bogus_status"] = bogus.status_code
+                if bogus.status_code != 200:
+                    r["problems"].append(f"If-None-Match com ETag que não confere deu {bogus.status_code}, esperado 200")
+            directives = parse_cache_control(r["cache_control"])
+            if "public" in directives and "private" in directives:
+                r["problems"].append("Cache-Control public e private ao mesmo tempo")
+            results[route] = r
+    return results
+
+
+def _pct(rate):
+    return "n/d" if rate is None else f"{rate * 100:.1f}%"
+
+
+def print_mode(mode, s):
+    lat, net = s["latency"], s["network_latency"]
+    up = s["upstream"]["total"] if s["upstream"] else "n/d"
+    o = s["outcomes"]
+    print(f"\n== cache {mode}: {s['accesses']} acessos, {s['requests_sent']} requisições, upstream: {up}")
+    print(f"   fresco {o['fresh']} | revalidado {o['revalidated']} | miss {o['miss']} | erro {o['error']}"
+          f" | acerto {_pct(s['hit_rate'])}")
+    print(f"   acesso p50/p95: {lat['p50_ms']}/{lat['p95_ms']} ms | rede p50/p95: {net['p50_ms']}/{net['p95_ms']} ms")
+    for route, r in s["routes"].items():
+        ro = r["outcomes"]
+        print(f"   {route:<12}{r['accesses']:>7}  hit {ro['fresh'] + ro['revalidated']:>6}  p95 {r['latency']['p95_ms']} ms")
+
+
+def compare_modes(off, on):
+    """Ganho do cache: razão de consultas ao upstream e de latência (on / off)."""
+    def ratio(a, b):
+        return round(a / b, 4) if a is not None and b else None
+
+    return {
+        "upstream_ratio": ratio(on["upstream_per_access"], off["upstream_per_access"]),
+        "p50_ratio": ratio(on["latency"]["p50_ms"], off["latency"]["p50_ms"]),
+        "p95_ratio": ratio(on["latency"]["p95_ms"], off["latency"]["p95_ms"]),
+        "bytes_ratio": ratio(on["bytes_total"] / on["accesses"] if on["accesses"] else None,
+                             off["bytes_total"] / off["accesses"] if off["accesses"] else None),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Efetividade de cache (ETag/Cache-Control) nas rotas GET /api/*")
+    parser.add_argument("--root", default=ROOT)
+    parser.add_argument("--supabase-url", default=os.environ.get("NEXT_PUBLIC_SUPABASE_URL"),
+                        help="mock_supabase.py, para contar as consultas ao upstream via /__stats")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=15, help="segundos por modo")
+    parser.add_argument("--think", type=float, default=0.2, help="pausa média entre visitas (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--require-cache", action="store_true", help="rota sem ETag ou Cache-Control é problema")
+    parser.add_argument("--min-hit-rate", type=float, default=None, help="acerto mínimo no modo on (0–1)")
+    parser.add_argument("--max-upstream-ratio", type=float, default=None, help="consultas on/off máxima (0–1)")
+    parser.add_argument("--output", default=REPORT_PATH)
+    args = parser.parse_args()
+    supabase_url = args.supabase_url.rstrip("/") if args.supabase_url else None
+
+    routes = list(dict.fromkeys(r for v in PAGE_VIEWS.values() for r in v["routes"]))
+    headers = check_headers(args.root, routes)
+    problems = []
+    print(f"{'rota':<12}{'status':>7}  {'ETag':<6}{'304':>5}{'200*':>6}  Cache-Control")
+    for route, h in headers.items():
+        if args.require_cache and not h["etag"]:
+            h["problems"].append("sem ETag")
+        if args.require_cache and not h["cache_control"]:
+            h["problems"].append("sem Cache-Control")
+        problems += [f"{route}: {p}" for p in h["problems"]]
+        print(f"{route:<12}{h['status']:>7}  {'sim' if h['etag'] else 'não':<6}{str(h['conditional_status'] or '-'):>5}"
+              f"{str(h['bogus_status'] or '-'):>6}  {h['cache_control'] or '-'}")
+
+    report = {"date": time.ctime(), "root": args.root, "clients": args.clients, "duration_s": args.duration,
+              "think_s": args.think, "seed": args.seed, "page_views": PAGE_VIEWS, "headers": headers, "modes": {}}
+    for mode in args.modes:
+        records, wall, upstream = asyncio.run(run_mode(args.root, supabase_url, mode == "on",
+                                                       args.clients, args.duration, args.think, args.seed))
+        report["modes"][mode] = summarize_mode(records, wall, upstream)
+        print_mode(mode, report["modes"][mode])
+    if supabase_url and all(report["modes"][m]["upstream"] is None for m in report["modes"]):
+        print(f"⚠️ {supabase_url}/__stats indisponível: consultas ao upstream não contadas (use o mock_supabase.py)")
+
+    on = report["modes"].get("on")
+    if on and "off" in report["modes"]:
+        report["comparison"] = compare_modes(report["modes"]["off"], on)
+        c = report["comparison"]
+        print(f"\non/off → upstream: {c['upstream_ratio']} | p50: {c['p50_ratio']} | p95: {c['p95_ratio']} | bytes: {c['bytes_ratio']}")
+        if args.max_upstream_ratio is not None and c["upstream_ratio"] is not None \
+                and c["upstream_ratio"] > args.max_upstream_ratio:
+            problems.append(f"upstream on/off {c['upstream_ratio']} acima de {args.max_upstream_ratio}")
+    if on and args.min_hit_rate is not None and (on["hit_rate"] or 0) < args.min_hit_rate:
+        problems.append(f"acerto {on['hit_rate']} abaixo de {args.min_hit_rate}")
+    report["problems"] = problems
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    # Histórico só com métricas em que subir é piorar (o compare aponta aumentos)
+    flat = {"cache.problems": len(problems)}
+    for mode, s in report["modes"].items():
+        flat[f"cache.{mode}.p95_ms"] = s["latency"]["p95_ms"]
+        flat[f"cache.{mode}.miss_rate"] = s["miss_rate"]
+        if s["upstream_per_access"] is not None:
+            flat[f"cache.{mode}.upstream_per_access"] = s["upstream_per_access"]
+    report_store.append_run(report_store.build_run("cache", {k: v for k, v in flat.items() if v is not None}))
+
+    for p in problems:
+        print(f"❌ {p}")
+    print(f"\nRelatório salvo em: {args.output}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
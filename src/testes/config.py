@@ -0,0 +1,37 @@
+# testes/config.py
+
+import os
+
+# --- Configurações compartilhadas pelos scripts de teste ---
+ROOT = os.environ.get("ROOT_URL", "http://localhost:3000")
+LOG_DIR = "logs"
+
+# Rotas GET de src/app/api (nome da rota → caminho)
+API_ROUTES = {
+    "users": "/api/users",
+    "artists": "/api/artists",
+    "editals": "/api/editals",
+    "proposers": "/api/proposers",
+    "comments": "/api/comments",
+    "tags": "/api/tags",
+    "data": "/api/data",
+}
+
+# Credenciais das tentativas de login; `expect_success` marca as que devem entrar
+TESTS = [
+    {"login": "notanemail", "password": "password1", "label": "não-email + senha qualquer", "expect_success": False},
+    {"login": "anyone@example.com", "password": "wrongpass", "label": "email qualquer + senha errada", "expect_success": False},
+    {"login": "joao.silva@email.com", "password": "senha_segura_1", "label": "credenciais reais (esperado funcionar)", "expect_success": True},
+]
+
+# Usuário real do mock: a primeira credencial marcada como válida
+VALID_LOGIN = next(t for t in TESTS if t.get("expect_success"))
+
+# Usuário da sessão reaproveitada pelos testes de feed
+SESSION_USER = {
+    "login": os.environ.get("SESSION_LOGIN", VALID_LOGIN["login"]),
+    "password": os.environ.get("SESSION_PASSWORD", VALID_LOGIN["password"]),
+}
+
+# Timeouts das esperas (s): curto, médio e longo
+SHORT, MED, LONG = 3, 8, 15
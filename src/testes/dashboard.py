@@ -0,0 +1,306 @@
+# testes/dashboard.py
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import sys
+import time
+
+import report_store
+from config import LOG_DIR
+from metrics import percentile
+
+DASHBOARD_DIR = os.path.join(LOG_DIR, "dashboard")
+INDEX_VERSION = 1
+
+# Pontos por gráfico (as execuções mais recentes) e janela das faixas de percentil
+LAST_RUNS = 300
+BAND_WINDOW = 20
+BAND_LOW, BAND_HIGH = 10, 90
+# Bytes do início do histórico usados para detectar arquivo reescrito/rotacionado
+HEAD_BYTES = 4096
+
+# Prefixo da métrica (até o primeiro ponto) → seção do relatório
+GROUP_LABELS = {
+    "api": "Latência das APIs",
+    "attempt": "Login (por tentativa)",
+    "attempts": "Login (total)",
+    "page": "Métricas de página",
+    "step": "Passos do feed",
+    "interaction": "Cliques (até o DOM estabilizar)",
+    "inp": "Entrada → próximo paint",
+    "wait": "Esperas",
+    "startup": "Startup do navegador",
+}
+
+CHART_W, CHART_H, PAD = 360, 110, 4
+
+_CSS = """
+body { font-family: system-ui, sans-serif; margin: 24px; color: #222; }
+h2 { margin-top: 40px; border-bottom: 1px solid #ddd; }
+h3 { margin: 24px 0 8px; font-size: 15px; }
+table { border-collapse: collapse; font-size: 13px; }
+td, th { padding: 3px 10px; border-bottom: 1px solid #eee; text-align: left; }
+.grid { display: flex; flex-wrap: wrap; gap: 12px; }
+.chart { border: 1px solid #eee; padding: 6px; width: 360px; }
+.chart .name { font-size: 12px; word-break: break-all; }
+.chart .last { font-size: 12px; color: #555; }
+.reg { color: #c62828; }
+svg .band { fill: #90caf9; opacity: .45; }
+svg .median { fill: none; stroke: #1e88e5; stroke-dasharray: 3 2; }
+svg .value { fill: none; stroke: #333; stroke-width: 1.2; }
+svg .point { fill: #333; }
+svg .point.reg { fill: #c62828; }
+"""
+
+
+# --- Índice incremental ---
+def _head_digest(path, length):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+
+def new_index(source):
+    return {"version": INDEX_VERSION, "source": source, "offset": 0, "head": None, "head_len": 0, "kinds": {}}
+
+
+def load_index(path, source):
+    """Índice salvo, ou um novo se não existir, for de outra versão ou de outro histórico."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return new_index(source)
+    if index.get("version") != INDEX_VERSION or index.get("source") != source:
+        return new_index(source)
+    return index
+
+
+def _ingest(index, run):
+    """
+    Acrescenta uma execução às séries do seu tipo. A checagem de regressão
+    roda uma vez, na chegada: compara a execução com as BASELINE_RUNS
+    anteriores do mesmo tipo (report_store.compare) e fica gravada no índice.
+    """
+    kind = index["kinds"].setdefault(run.get("kind", "ui"), {"runs": [], "series": {}, "tail": []})
+    i = len(kind["runs"])
+    metrics = {k: v for k, v in run.get("metrics", {}).items() if isinstance(v, (int, float))}
+    regressions = {r["metric"]: r["change"] for r in report_store.compare(kind["tail"] + [{"metrics": metrics}])
+                   if r["regression"]}
+    kind["runs"].append({
+        "run_id": run.get("run_id"),
+        "timestamp": run.get("timestamp"),
+        "date": run.get("date"),
+        "commit": run.get("commit"),
+        "summary": run.get("summary"),
+        "regressions": regressions,
+    })
+    for key, value in metrics.items():
+        kind["series"].setdefault(key, []).append([i, value])
+    kind["tail"] = (kind["tail"] + [{"metrics": metrics}])[-report_store.BASELINE_RUNS:]
+
+
+def update_index(index, runs_path):
+    """
+    Lê só o que foi acrescentado ao histórico desde a última geração (a
+    partir do byte `offset`). Se o arquivo encolheu ou o início mudou, o
+    índice é refeito do zero. Devolve quantas execuções entraram.
+    """
+    if not os.path.exists(runs_path):
+        return 0
+    size = os.path.getsize(runs_path)
+    if size < index["offset"] or (index["head_len"] and _head_digest(runs_path, index["head_len"]) != index["head"]):
+        index.update(new_index(index["source"]))
+    added = 0
+    with open(runs_path, "rb") as f:
+        f.seek(index["offset"])
+        for line in f:
+            if not line.endswith(b"\n"):
+                # Linha ainda sendo escrita: fica para a próxima geração
+                break
+            index["offset"] += len(line)
+            try:
+                run = json.loads(line)
+            except ValueError:
+                continue
+            _ingest(index, run)
+            added += 1
+    # Assinatura do trecho já lido (até HEAD_BYTES): muda se o arquivo for reescrito
+    index["head_len"] = min(index["offset"], HEAD_BYTES)
+    index["head"] = _head_digest(runs_path, index["head_len"])
+    return added
+
+
+def save_index(index, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+# --- Gráficos ---
+def percentile_bands(values, window=BAND_WINDOW):
+    """Para cada ponto: (p10, p50, p90) das últimas `window` execuções até ele."""
+    bands = []
+    for i in range(len(values)):
+        recent = values[max(0, i - window + 1):i + 1]
+        bands.append((percentile(recent, BAND_LOW), percentile(recent, 50), percentile(recent, BAND_HIGH)))
+    return bands
+
+
+def render_chart(name, points, runs):
+    """
+    Cartão de uma métrica: valores (linha), mediana móvel (tracejada), faixa
+    p10–p90 móvel e execuções com regressão em vermelho. `points` = [[i, valor]].
+    """
+    values = [v for _, v in points]
+    bands = percentile_bands(values)
+    low = min(min(values), min(b[0] for b in bands))
+    high = max(max(values), max(b[2] for b in bands))
+    if high == low:
+        low, high = low - 1, high + 1
+    n = len(points)
+
+    def x(k):
+        return PAD + (CHART_W - 2 * PAD) * (k / (n - 1) if n > 1 else 0.5)
+
+    def y(v):
+        return CHART_H - PAD - (CHART_H - 2 * PAD) * (v - low) / (high - low)
+
+    def polyline(pairs):
+        return " ".join(f"{x(k):.1f},{y(v):.1f}" for k, v in pairs)
+
+    upper = polyline((k, b[2]) for k, b in enumerate(bands))
+    lower = polyline((k, bands[k][0]) for k in reversed(range(n)))
+    parts = [
+        f'<svg width="{CHART_W}" height="{CHART_H}" viewBox="0 0 {CHART_W} {CHART_H}">',
+        f'<polygon class="band" points="{upper} {lower}"/>',
+        f'<polyline class="median" points="{polyline((k, b[1]) for k, b in enumerate(bands))}"/>',
+        f'<polyline class="value" points="{polyline(enumerate(values))}"/>',
+    ]
+    regressions = 0
+    for k, (i, v) in enumerate(points):
+        run = runs[i]
+        regressed = name in run["regressions"]
+        # Só regressões e a última execução ganham marcador; o resto fica na linha
+        if not regressed and k != n - 1:
+            continue
+        tip = f"{run['date']} · {(run['commit'] or 'sem commit')[:10]} · {v}"
+        if regressed:
+            regressions += 1
+            change = run["regressions"][name]
+            tip += f" · regressão {change * 100:+.1f}%" if change is not None else " · regressão"
+        parts.append(f'<circle class="point{" reg" if regressed else ""}" cx="{x(k):.1f}" cy="{y(v):.1f}" r="{3 if regressed else 2}">'
+                     f"<title>{html.escape(tip)}</title></circle>")
+    parts.append("</svg>")
+    flag = f' <span class="reg">▲ {regressions} regressão(ões)</span>' if regressions else ""
+    return (f'<div class="chart"><div class="name">{html.escape(name)}</div>{"".join(parts)}'
+            f'<div class="last">último: {values[-1]} · p50 móvel: {bands[-1][1]:.4g}{flag}</div></div>')
+
+
+# --- Página ---
+def _group(metric):
+    prefix = metric.split(".", 1)[0]
+    return GROUP_LABELS.get(prefix, prefix)
+
+
+def render_kind(kind_name, kind, last=LAST_RUNS, match=None):
+    """Seção de um tipo de execução: tabela de commits e gráficos por grupo."""
+    runs = kind["runs"]
+    first = max(0, len(runs) - last)
+    out = [f'<h2 id="{html.escape(kind_name)}">{html.escape(kind_name)} · {len(runs)} execuções</h2>']
+
+    # Índice por commit (ordem da primeira aparição, mais recente primeiro)
+    commits = {}
+    for run in runs:
+        c = commits.setdefault(run["commit"] or "sem commit", {"runs": 0, "first": run["date"], "last": run["date"], "regressions": 0})
+        c["runs"] += 1
+        c["last"] = run["date"]
+        c["regressions"] += len(run["regressions"])
+    out.append("<table><tr><th>commit</th><th>execuções</th><th>primeira</th><th>última</th><th>regressões</th></tr>")
+    for commit, c in list(reversed(list(commits.items())))[:20]:
+        reg = f'<span class="reg">{c["regressions"]}</span>' if c["regressions"] else "0"
+        out.append(f"<tr><td><code>{html.escape(commit[:12])}</code></td><td>{c['runs']}</td>"
+                   f"<td>{html.escape(str(c['first']))}</td><td>{html.escape(str(c['last']))}</td><td>{reg}</td></tr>")
+    out.append("</table>")
+
+    groups = {}
+    for metric in sorted(kind["series"]):
+        if match and match not in metric:
+            continue
+        points = [p for p in kind["series"][metric] if p[0] >= first]
+        if points:
+            groups.setdefault(_group(metric), []).append(render_chart(metric, points, runs))
+    for group, charts in groups.items():
+        out.append(f"<h3>{html.escape(group)}</h3><div class=\"grid\">{''.join(charts)}</div>")
+    return "\n".join(out)
+
+
+def latest_regressions(index):
+    """Regressões da execução mais recente de cada tipo."""
+    rows = []
+    for kind_name, kind in index["kinds"].items():
+        if kind["runs"]:
+            run = kind["runs"][-1]
+            for metric, change in run["regressions"].items():
+                rows.append((kind_name, run, metric, change))
+    return rows
+
+
+def render_html(index, kinds=None, last=LAST_RUNS, match=None):
+    selected = [k for k in index["kinds"] if kinds is None or k in kinds]
+    out = [
+        "<!doctype html><html lang=\"pt-br\"><head><meta charset=\"utf-8\">",
+        f"<title>Histórico de performance</title><style>{_CSS}</style></head><body>",
+        "<h1>Histórico de performance</h1>",
+        f"<p>Gerado em {time.strftime('%Y-%m-%d %H:%M:%S')} a partir de <code>{html.escape(index['source'])}</code>. "
+        f"Faixa azul: p{BAND_LOW}–p{BAND_HIGH} das últimas {BAND_WINDOW} execuções; tracejado: mediana móvel; "
+        f"pontos vermelhos: regressão apontada pelo <code>report_store.compare</code> na chegada da execução.</p>",
+        "<p>" + " · ".join(f'<a href="#{html.escape(k)}">{html.escape(k)}</a>' for k in selected) + "</p>",
+    ]
+    regressions = [r for r in latest_regressions(index) if r[0] in selected]
+    if regressions:
+        out.append("<h2>Regressões na última execução</h2><table><tr><th>tipo</th><th>métrica</th><th>variação</th><th>commit</th><th>data</th></tr>")
+        for kind_name, run, metric, change in regressions:
+            change = f"{change * 100:+.1f}%" if change is not None else "n/d"
+            out.append(f"<tr><td>{html.escape(kind_name)}</td><td>{html.escape(metric)}</td><td class=\"reg\">{change}</td>"
+                       f"<td><code>{html.escape((run['commit'] or '')[:12])}</code></td><td>{html.escape(str(run['date']))}</td></tr>")
+        out.append("</table>")
+    for kind_name in selected:
+        out.append(render_kind(kind_name, index["kinds"][kind_name], last, match))
+    out.append("</body></html>")
+    return "\n".join(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard HTML estático do histórico de execuções (runs.jsonl)")
+    parser.add_argument("--runs", default=report_store.RUNS_PATH)
+    parser.add_argument("--output-dir", default=DASHBOARD_DIR)
+    parser.add_argument("--kinds", nargs="+", default=None, help="tipos de execução (ui, shard, auth, cache, ...)")
+    parser.add_argument("--last", type=int, default=LAST_RUNS, help="execuções mais recentes em cada gráfico")
+    parser.add_argument("--match", default=None, help="só métricas cujo nome contém este texto")
+    parser.add_argument("--rebuild", action="store_true", help="refaz o índice do zero")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index_path = os.path.join(args.output_dir, "index.json")
+    source = os.path.abspath(args.runs)
+    index = new_index(source) if args.rebuild else load_index(index_path, source)
+    added = update_index(index, args.runs)
+    save_index(index, index_path)
+
+    html_path = os.path.join(args.output_dir, "index.html")
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(render_html(index, args.kinds, args.last, args.match))
+
+    total = sum(len(k["runs"]) for k in index["kinds"].values())
+    print(f"{added} execuções novas ({total} no índice) em {time.perf_counter() - start:.2f}s")
+    print(f"Dashboard salvo em: {html_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+# testes/device_matrix.py
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+
+import artifacts
+import auth_session
+import interaction_trace
+import page_metrics
+import report_store
+import teste_ui_api
+from config import LOG_DIR, ROOT, SESSION_USER
+from driver_factory import build_driver
+from locators import CARD_SELECTOR
+from metrics import latency_summary
+from waits import Waiter
+
+REPORT_PATH = os.path.join(LOG_DIR, "device_matrix.json")
+CARD_IMAGE_SELECTOR = "div[class*='cardImage'] img"
+
+# Viewports emulados (CDP Emulation.setDeviceMetricsOverride)
+DEVICES = {
+    "desktop": {"width": 1920, "height": 1080, "scale": 1, "mobile": False, "user_agent": None},
+    "moto_g4": {
+        "width": 360, "height": 640, "scale": 3, "mobile": True,
+        "user_agent": "Mozilla/5.0 (Linux; Android 7.0; Moto G (4)) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/120.0.0.0 Mobile Safari/537.36",
+    },
+    "iphone_12": {
+        "width": 390, "height": 844, "scale": 3, "mobile": True,
+        "user_agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 "
+                      "(KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1",
+    },
+}
+
+# Perfis de rede (CDP Network.emulateNetworkConditions): latência em ms, vazão em bytes/s.
+# Valores do Lighthouse (4G lento) e do DevTools (3G rápido).
+NETWORKS = {
+    "none": None,
+    "4g": {"latency": 150, "download": 1638.4 * 1024 / 8, "upload": 750 * 1024 / 8},
+    "3g": {"latency": 562.5, "download": 1474.56 * 1024 / 8, "upload": 675 * 1024 / 8},
+    # Abre o feed offline e, com a conexão de volta (4G), repete a navegação
+    "offline_recovery": {"latency": 150, "download": 1638.4 * 1024 / 8, "upload": 750 * 1024 / 8},
+}
+# Fatores de desaceleração da CPU (CDP Emulation.setCPUThrottlingRate)
+CPU_RATES = [1, 4]
+
+DEFAULT_DEVICES = ["moto_g4"]
+DEFAULT_NETWORKS = ["none", "4g", "3g", "offline_recovery"]
+# Cenários do feed rodados em cada perfil, sobre a página já carregada
+FEED_SCENARIOS = ["cards", "card_interactions"]
+TIMEOUT_S = 60
+
+# Injetado em todo documento novo: momento do primeiro card, carga de cada
+# imagem do CardImage (da inserção no DOM ao load) e latência de clique até
+# o próximo frame (rAF + setTimeout depois dos handlers)
+_PROBE_JS = """
+(() => {
+  const card = %s, image = %s;
+  const m = window.__matrix = {firstCardMs: null, firstImageMs: null, images: 0, imageLoadMs: [], imageErrors: 0, clicks: []};
+  const seen = new WeakSet();
+  const watch = img => {
+    if (seen.has(img)) return;
+    seen.add(img);
+    m.images += 1;
+    const t0 = performance.now();
+    const loaded = () => {
+      const now = performance.now();
+      m.imageLoadMs.push(now - t0);
+      if (m.firstImageMs === null) m.firstImageMs = now;
+    };
+    if (img.complete && img.naturalWidth) loaded();
+    else {
+      img.addEventListener('load', loaded, {once: true});
+      img.addEventListener('error', () => { m.imageErrors += 1; }, {once: true});
+    }
+  };
+  new MutationObserver(() => {
+    if (m.firstCardMs === null && document.querySelector(card)) m.firstCardMs = performance.now();
+    document.querySelectorAll(image).forEach(watch);
+  }).observe(document, {childList: true, subtree: true});
+  document.addEventListener('click', e => {
+    const t = e.timeStamp;
+    requestAnimationFrame(() => setTimeout(() => m.clicks.push(performance.now() - t), 0));
+  }, true);
+})();
+""" % (json.dumps(CARD_SELECTOR), json.dumps(CARD_IMAGE_SELECTOR))
+
+
+def profile_name(device, network, cpu):
+    return f"{device}.{network}.cpu{cpu}x"
+
+
+def set_network(driver, network, offline=False):
+    """Aplica um perfil de rede; `None` remove a limitação."""
+    driver.execute_cdp_cmd("Network.enable", {})
+    conditions = NETWORKS.get(network) or {"latency": 0, "download": -1, "upload": -1}
+    driver.execute_cdp_cmd("Network.emulateNetworkConditions", {
+        "offline": offline,
+        "latency": conditions["latency"],
+        "downloadThroughput": conditions["download"],
+        "uploadThroughput": conditions["upload"],
+    })
+
+
+def apply_profile(driver, device, network, cpu):
+    """Viewport, user agent, toque, CPU e rede do perfil no driver."""
+    d = DEVICES[device]
+    driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+        "width": d["width"], "height": d["height"], "deviceScaleFactor": d["scale"], "mobile": d["mobile"],
+    })
+    if d["user_agent"]:
+        driver.execute_cdp_cmd("Emulation.setUserAgentOverride", {"userAgent": d["user_agent"]})
+    driver.execute_cdp_cmd("Emulation.setTouchEmulationEnabled", {"enabled": d["mobile"], "maxTouchPoints": 5 if d["mobile"] else 1})
+    driver.execute_cdp_cmd("Emulation.setCPUThrottlingRate", {"rate": cpu})
+    set_network(driver, network)
+
+
+def load_feed(driver, network, timeout):
+    """
+    Abre o feed e espera o primeiro card. Em `offline_recovery` a primeira
+    navegação é feita sem rede; o tempo de recuperação vai da volta da
+    conexão até o primeiro card na nova tentativa.
+    """
+    result = {"offline_url": None, "recovery_ms": None}
+    if network == "offline_recovery":
+        set_network(driver, network, offline=True)
+        try:
+            driver.get(ROOT + "/")
+            result["offline_url"] = driver.execute_script("return location.href")
+        except WebDriverException:
+            pass
+        set_network(driver, network)
+        restored = time.perf_counter()
+
+    driver.get(ROOT + "/")
+    found = Waiter(driver, timeout=timeout).element((By.CSS_SELECTOR, CARD_SELECTOR))
+    if network == "offline_recovery" and found:
+        result["recovery_ms"] = round((time.perf_counter() - restored) * 1000, 1)
+    result["cards_found"] = bool(found)
+    return result
+
+
+def run_profile(cookie, device, network, cpu, timeout=TIMEOUT_S):
+    """
+    Um perfil da matriz num navegador novo (cache HTTP vazio): homepage com
+    sessão (o feed), métricas da página e os cenários do feed.
+    """
+    name = profile_name(device, network, cpu)
+    # Todas as chaves existem desde o início: um perfil que falha no meio
+    # aparece no relatório com o que não foi medido em None
+    result = {
+        "profile": name, "device": device, "network": network, "cpu": cpu, "error": None,
+        "offline_url": None, "recovery_ms": None, "cards_found": False, "feed_wall_s": None,
+        "page": None, "scenarios": [], "ui": None, "first_card_ms": None, "first_image_ms": None,
+        "images": None, "image_load": latency_summary([]), "click_to_paint": latency_summary([]),
+        "interactions": [], "inp": {}, "interaction_settle": latency_summary([]), "traces": [],
+    }
+    driver = build_driver()
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _PROBE_JS})
+        # Cookie injetado antes da limitação: não faz parte da medição
+        auth_session.inject_into_driver(driver, cookie)
+        apply_profile(driver, device, network, cpu)
+
+        start = time.perf_counter()
+        result.update(load_feed(driver, network, timeout))
+        result["feed_wall_s"] = round(time.perf_counter() - start, 3)
+        if not result["cards_found"]:
+            result["error"] = f"nenhum card em {timeout}s"
+            return result
+        ctx = teste_ui_api.FeedContext(driver)
+        ctx.waiter = Waiter(driver, timeout=timeout)
+        ctx.waiter.network_idle()
+        result["page"] = page_metrics.collect(driver, name)
+
+        result["scenarios"] = [teste_ui_api.run_scenario(ctx, sc) for sc in FEED_SCENARIOS]
+        result["ui"] = ctx.feed_report["ui"]
+        # Cliques ainda aguardando o próximo frame
+        ctx.waiter.dom_stable(quiet_ms=100)
+        probe = driver.execute_script("return window.__matrix")
+        result.update(
+            first_card_ms=round(probe["firstCardMs"], 1) if probe["firstCardMs"] is not None else None,
+            first_image_ms=round(probe["firstImageMs"], 1) if probe["firstImageMs"] is not None else None,
+            images={"seen": probe["images"], "loaded": len(probe["imageLoadMs"]), "errors": probe["imageErrors"]},
+            image_load=latency_summary([ms / 1000 for ms in probe["imageLoadMs"]]),
+            click_to_paint=latency_summary([ms / 1000 for ms in probe["clicks"]]),
+            interactions=ctx.feed_report["interactions"],
+            inp=interaction_trace.summarize(ctx.feed_report["traces"]),
+            interaction_settle=latency_summary([i["duration_s"] for i in ctx.feed_report["interactions"]]),
+            # Trace completo só das interações mais lentas do perfil; o resto fica no resumo
+            traces=interaction_trace.keep_slowest(ctx.feed_report["traces"],
+                                                  os.path.join(interaction_trace.TRACE_DIR, "device_matrix", name)),
+        )
+    except WebDriverException as e:
+        result["error"] = repr(e)
+    finally:
+        driver.quit()
+    return result
+
+
+def _ms(value):
+    return "n/d" if value is None else f"{value:.0f}"
+
+
+def print_matrix(results):
+    print(f"\n{'perfil':<34}{'1º card':>9}{'1ª img':>9}{'img p95':>9}{'LCP':>8}{'clique p95':>12}{'estável p95':>13}{'recup.':>9}")
+    for r in results:
+        if r["error"] and r["page"] is None:
+            print(f"❌ {r['profile']:<32}{r['error']}")
+            continue
+        print(f"{r['profile']:<34}{_ms(r['first_card_ms']):>9}{_ms(r['first_image_ms']):>9}{_ms(r['image_load']['p95_ms']):>9}"
+              f"{_ms(r['page'].get('lcp_ms')):>8}{_ms(r['click_to_paint']['p95_ms']):>12}"
+              f"{_ms(r['interaction_settle']['p95_ms']):>13}{_ms(r['recovery_ms']):>9}")
+        if r["error"]:
+            print(f"   ❌ {r['error']}")
+        for sc in r["scenarios"]:
+            if not sc["ok"]:
+                print(f"   ❌ {sc['name']}: {sc['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Matriz de rede, CPU e dispositivo (CDP) para a homepage e o feed")
+    parser.add_argument("--devices", nargs="+", default=DEFAULT_DEVICES, choices=list(DEVICES))
+    parser.add_argument("--networks", nargs="+", default=DEFAULT_NETWORKS, choices=list(NETWORKS))
+    parser.add_argument("--cpu", type=float, nargs="+", default=CPU_RATES, help="fatores de desaceleração da CPU")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_S, help="espera máxima pelo primeiro card (s)")
+    parser.add_argument("--keep-screenshots", action="store_true", help="grava screenshots de cenários que passaram")
+    parser.add_argument("--output", default=REPORT_PATH)
+    args = parser.parse_args()
+
+    if not args.keep_screenshots:
+        # Os mesmos cenários rodam em cada perfil: só as falhas interessam
+        artifacts.pipeline().policy = "failure"
+
+    user = SESSION_USER
+    cookie = auth_session.get_session(user["login"], user["password"])
+    if cookie is None:
+        print("❌ Sessão não obtida")
+        return 1
+
+    results = []
+    for device, network, cpu in itertools.product(args.devices, args.networks, args.cpu):
+        cpu = int(cpu) if float(cpu).is_integer() else cpu
+        print(f"📱 {profile_name(device, network, cpu)}")
+        results.append(run_profile(cookie, device, network, cpu, args.timeout))
+    print_matrix(results)
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"date": time.ctime(), "root": ROOT, "results": results}, f, ensure_ascii=False, indent=2)
+
+    flat = {}
+    for r in results:
+        if r["page"] is None:
+            continue
+        prefix = f"matrix.{r['profile']}"
+        flat[f"{prefix}.first_card_ms"] = r["first_card_ms"]
+        flat[f"{prefix}.first_image_ms"] = r["first_image_ms"]
+        flat[f"{prefix}.image_p95_ms"] = r["image_load"]["p95_ms"]
+        flat[f"{prefix}.lcp_ms"] = r["page"].get("lcp_ms")
+        flat[f"{prefix}.click_p95_ms"] = r["click_to_paint"]["p95_ms"]
+        flat[f"{prefix}.recovery_ms"] = r["recovery_ms"]
+    report_store.append_run(report_store.build_run("matrix", {k: v for k, v in flat.items() if v is not None}))
+    print(f"\nRelatório salvo em: {args.output}")
+
+    failed = [r for r in results if r["error"] or not all(sc["ok"] for sc in r["scenarios"])]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
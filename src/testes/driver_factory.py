@@ -0,0 +1,129 @@
+# testes/driver_factory.py
+
+import atexit
+import os
+import threading
+import time
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+
+import page_metrics
+
+# --- Configurações Iniciais ---
+# Janela visível por padrão; HEADLESS=1 roda sem janela (CI)
+HEADLESS = os.environ.get("HEADLESS", "0") == "1"
+WINDOW_SIZE = "1920,1080"
+
+# Caminho do chromedriver resolvido na primeira execução; as próximas não tocam a rede
+DRIVER_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "editaliza", "chromedriver_path")
+
+# Recursos bloqueados quando o teste não precisa de imagens/fontes
+MEDIA_PATTERNS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+                  "*.woff", "*.woff2", "*.ttf", "*.otf", "*/_next/image*"]
+
+# Flags que cortam trabalho de startup que os testes não usam
+LEAN_ARGS = [
+    "--disable-extensions",
+    "--disable-infobars",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--mute-audio",
+]
+
+# Tempo de startup de cada driver criado neste processo (segundos)
+startup_times = []
+
+_path_lock = threading.Lock()
+_shared_lock = threading.Lock()
+_shared = None
+
+
+def chromedriver_path():
+    """
+    Resolve o chromedriver sem ir à rede quando possível:
+    1. variável CHROMEDRIVER_PATH;
+    2. caminho salvo em DRIVER_CACHE por uma execução anterior;
+    3. webdriver_manager (única etapa que acessa a rede), salvando o resultado.
+    """
+    env_path = os.environ.get("CHROMEDRIVER_PATH")
+    if env_path:
+        return env_path
+    with _path_lock:
+        if os.path.exists(DRIVER_CACHE):
+            with open(DRIVER_CACHE, encoding="utf-8") as f:
+                cached = f.read().strip()
+            if cached and os.path.exists(cached):
+                return cached
+
+        from webdriver_manager.chrome import ChromeDriverManager
+        path = ChromeDriverManager().install()
+        os.makedirs(os.path.dirname(DRIVER_CACHE), exist_ok=True)
+        with open(DRIVER_CACHE, "w", encoding="utf-8") as f:
+            f.write(path)
+        return path
+
+
+def set_media_blocking(driver, enabled):
+    """Liga/desliga o bloqueio de imagens e fontes (CDP Network.setBlockedURLs)."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": MEDIA_PATTERNS if enabled else []})
+    except WebDriverException:
+        pass
+
+
+def build_driver(headless=HEADLESS, block_media=False):
+    """
+    Cria um Chrome enxuto para os testes e registra o tempo de startup em
+    `startup_times` (e em `driver.startup_s`).
+    """
+    start = time.perf_counter()
+    options = webdriver.ChromeOptions()
+    # Log de performance: fonte dos eventos Network.* usados em Waiter.network_idle
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    for arg in LEAN_ARGS:
+        options.add_argument(arg)
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument(f"--window-size={WINDOW_SIZE}")
+    else:
+        options.add_argument("--start-maximized")
+
+    driver = webdriver.Chrome(service=Service(chromedriver_path()), options=options)
+    page_metrics.install_observers(driver)
+    if block_media:
+        set_media_blocking(driver, True)
+
+    driver.startup_s = round(time.perf_counter() - start, 3)
+    startup_times.append(driver.startup_s)
+    return driver
+
+
+def shared_driver():
+    """
+    Navegador quente compartilhado entre os módulos de teste do mesmo
+    processo. É criado na primeira chamada e fechado na saída do processo.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = build_driver()
+            atexit.register(quit_shared)
+        return _shared
+
+
+def quit_shared():
+    """Fecha o navegador compartilhado (chamado na saída do processo)."""
+    global _shared
+    if _shared is not None:
+        try:
+            _shared.quit()
+        except Exception:
+            pass
+        _shared = None
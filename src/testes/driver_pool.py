@@ -0,0 +1,76 @@
+# testes/driver_pool.py
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DriverPool:
+    """
+    Pool limitado de WebDrivers reutilizáveis.
+
+    Os drivers são criados uma única vez (via `factory`) e emprestados aos
+    workers com `acquire()` / `release()`. Assim o custo de subir o Chrome
+    não se repete a cada tentativa de login.
+
+    `warm` recebe navegadores já abertos (ex.: `driver_factory.shared_driver()`)
+    que entram no pool sem custo de startup e não são fechados por `quit()`.
+    """
+
+    def __init__(self, factory, size, warm=None):
+        self.size = max(1, int(size))
+        self._factory = factory
+        self._idle = queue.Queue()
+        self._all = []
+        self._lock = threading.Lock()
+
+        warm = list(warm or [])[:self.size]
+        for driver in warm:
+            self._idle.put(driver)
+
+        # Sobe os navegadores em paralelo: o startup do Chrome domina o tempo
+        missing = self.size - len(warm)
+        if missing:
+            with ThreadPoolExecutor(max_workers=missing) as executor:
+                for driver in executor.map(lambda _: factory(), range(missing)):
+                    self._all.append(driver)
+                    self._idle.put(driver)
+
+    def acquire(self, timeout=None):
+        """Retira um driver livre do pool (bloqueia até haver um disponível)."""
+        return self._idle.get(timeout=timeout)
+
+    def release(self, driver):
+        """Devolve o driver ao pool."""
+        self._idle.put(driver)
+
+    def map(self, fn, items):
+        """
+        Executa `fn(driver, item)` para cada item usando no máximo `size`
+        workers ao mesmo tempo. Retorna os resultados na ordem dos itens.
+        """
+        def worker(item):
+            driver = self.acquire()
+            try:
+                return fn(driver, item)
+            finally:
+                self.release(driver)
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(worker, items))
+
+    def quit(self):
+        """Fecha os navegadores criados pelo pool (os `warm` continuam abertos)."""
+        with self._lock:
+            for driver in self._all:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+            self._all = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.quit()
@@ -0,0 +1,248 @@
+# testes/interaction_trace.py
+
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+from config import LOG_DIR
+from locators import CARD_SELECTOR
+from metrics import percentile
+
+TRACE_DIR = os.path.join(LOG_DIR, "traces")
+# Quantas interações mais lentas guardam o trace completo
+KEEP_SLOWEST = int(os.environ.get("TRACE_KEEP", "5"))
+
+# Custos acumulados do CDP Performance.getMetrics (segundos) medidos por interação
+CDP_DURATIONS = {"ScriptDuration": "script_ms", "LayoutDuration": "layout_ms", "RecalcStyleDuration": "style_ms"}
+
+# Injetado no documento: Event Timing (entrada → próximo paint, >= 16 ms),
+# próximo frame após cada entrada (rAF + setTimeout, cobre eventos rápidos)
+# e lotes de mutações com os cards afetados. Buffers limitados a MAX itens.
+_TRACER_JS = """
+(() => {
+  if (window.__trace) return;
+  const card = %s, MAX = 2000;
+  const t = window.__trace = {events: [], frames: [], mutations: []};
+  const push = (list, item) => { list.push(item); if (list.length > MAX) list.shift(); };
+  const describe = n => {
+    if (!n) return null;
+    if (n.nodeType !== 1) return n.nodeName;
+    const cls = (n.getAttribute('class') || '').split(/\\s+/)[0];
+    return n.tagName.toLowerCase() + (cls ? '.' + cls : '');
+  };
+  const ids = new WeakMap();
+  let nextId = 0;
+  const cardId = n => {
+    const el = n && (n.nodeType === 1 ? n : n.parentElement);
+    const c = el && el.closest(card);
+    if (!c) return null;
+    if (!ids.has(c)) ids.set(c, ++nextId);
+    return ids.get(c);
+  };
+  const holdsCards = n => n.nodeType === 1 && (n.matches(card) || !!n.querySelector(card));
+  try {
+    new PerformanceObserver(list => list.getEntries().forEach(e => push(t.events, {
+      name: e.name, start: e.startTime, duration: e.duration, processingStart: e.processingStart,
+      processingEnd: e.processingEnd, interactionId: e.interactionId || 0, target: describe(e.target),
+    }))).observe({type: 'event', durationThreshold: 16, buffered: true});
+  } catch (e) {}
+  ['pointerdown', 'click', 'keydown', 'pointerover'].forEach(type => document.addEventListener(type, e => {
+    const start = e.timeStamp;
+    requestAnimationFrame(() => setTimeout(() => push(t.frames, {type, start, paint: performance.now()}), 0));
+  }, true));
+  new MutationObserver(records => {
+    const batch = {at: performance.now(), records: records.length, added: 0, removed: 0, attributes: 0, text: 0,
+                   cards: [], container: 0, targets: []};
+    const cards = new Set();
+    for (const r of records) {
+      if (r.type === 'childList') { batch.added += r.addedNodes.length; batch.removed += r.removedNodes.length; }
+      else if (r.type === 'attributes') batch.attributes += 1;
+      else batch.text += 1;
+      const id = cardId(r.target);
+      if (id !== null) cards.add(id);
+      else if (r.type === 'childList' && ([...r.addedNodes].some(holdsCards) || [...r.removedNodes].some(holdsCards))) batch.container += 1;
+      if (batch.targets.length < 20) batch.targets.push(r.type[0] + ':' + describe(r.target));
+    }
+    batch.cards = [...cards];
+    push(t.mutations, batch);
+  }).observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+})();
+""" % json.dumps(CARD_SELECTOR)
+
+# Espera o próximo frame (entradas do Event Timing chegam depois do paint) e
+# devolve o que foi registrado desde `since`
+_COLLECT_JS = """
+const since = arguments[0], card = arguments[1], done = arguments[arguments.length - 1];
+requestAnimationFrame(() => requestAnimationFrame(() => setTimeout(() => {
+  const t = window.__trace;
+  if (!t) return done(null);
+  done({
+    events: t.events.filter(e => e.start >= since),
+    frames: t.frames.filter(f => f.start >= since),
+    mutations: t.mutations.filter(m => m.at >= since),
+    cards_total: document.querySelectorAll(card).length,
+  });
+}, 0)));
+"""
+
+
+def _cdp_durations(driver):
+    try:
+        metrics = {m["name"]: m["value"] for m in driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+    except WebDriverException:
+        return None
+    return {key: metrics.get(key, 0.0) for key in CDP_DURATIONS}
+
+
+def _round(value):
+    return None if value is None else round(value, 1)
+
+
+class InteractionTracer:
+    """
+    Registra, por controle, a latência entre a entrada (clique/hover) e o
+    próximo paint e as mutações de DOM que ela causou. Cada `trace()` vira
+    um item de `records` (ex.: `feed_report["traces"]`).
+    """
+
+    def __init__(self, driver, records=None):
+        self.driver = driver
+        self.records = records if records is not None else []
+        self.install()
+
+    def install(self):
+        """Tracer no documento atual e nos próximos (uma vez por driver)."""
+        try:
+            if not getattr(self.driver, "_tracer_installed", False):
+                self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _TRACER_JS})
+                self.driver._tracer_installed = True
+            self.driver.execute_script(_TRACER_JS)
+        except WebDriverException:
+            # Sem CDP ou sem documento ainda: o próximo documento recebe o script
+            pass
+
+    def begin(self):
+        """Marca o início de uma interação (relógio da página + custos do CDP)."""
+        try:
+            since = self.driver.execute_script("if (!window.__trace) return null; return performance.now();")
+        except WebDriverException:
+            since = None
+        if since is None:
+            # Documento novo sem o script (ex.: driver criado antes da navegação)
+            self.install()
+            since = self.driver.execute_script("return performance.now();")
+        return {"since": since, "cdp": _cdp_durations(self.driver), "wall": time.perf_counter()}
+
+    def end(self, control, kind, mark):
+        """Fecha a interação aberta em `begin` e registra o resultado."""
+        wall_ms = (time.perf_counter() - mark["wall"]) * 1000
+        try:
+            self.driver.set_script_timeout(5)
+            data = self.driver.execute_async_script(_COLLECT_JS, mark["since"], CARD_SELECTOR)
+        except WebDriverException:
+            data = None
+        record = analyze(control, kind, data or {"events": [], "frames": [], "mutations": [], "cards_total": None})
+        record["wall_ms"] = round(wall_ms, 1)
+        after = _cdp_durations(self.driver)
+        if mark["cdp"] and after:
+            for key, name in CDP_DURATIONS.items():
+                record[name] = round((after[key] - mark["cdp"][key]) * 1000, 1)
+        self.records.append(record)
+        return record
+
+    @contextmanager
+    def trace(self, control, kind="click"):
+        mark = self.begin()
+        try:
+            yield
+        finally:
+            self.end(control, kind, mark)
+
+
+def analyze(control, kind, data):
+    """
+    Resumo de uma interação a partir dos dados coletados na página.
+
+    - `inp_ms`: maior duração do Event Timing (entrada → próximo paint), com
+      preferência às entradas com interactionId (as que contam para o INP).
+    - `next_frame_ms`: entrada → primeiro frame depois dos handlers; cobre
+      interações abaixo do limiar de 16 ms do Event Timing.
+    - `cards_touched`: cards diferentes com mutações; mais de um (ou lista
+      de cards recriada) indica que a ação re-renderiza o feed inteiro.
+    """
+    events = data["events"]
+    scored = [e for e in events if e["interactionId"]] or events
+    worst = max(scored, key=lambda e: e["duration"], default=None)
+    frames = [f["paint"] - f["start"] for f in data["frames"]]
+    mutations = data["mutations"]
+    cards = {c for m in mutations for c in m["cards"]}
+    container = sum(m["container"] for m in mutations)
+
+    record = {
+        "control": control,
+        "kind": kind,
+        "inp_ms": _round(worst["duration"]) if worst else None,
+        "input_delay_ms": _round(worst["processingStart"] - worst["start"]) if worst else None,
+        "processing_ms": _round(worst["processingEnd"] - worst["processingStart"]) if worst else None,
+        "presentation_ms": _round(worst["start"] + worst["duration"] - worst["processingEnd"]) if worst else None,
+        "next_frame_ms": _round(max(frames)) if frames else None,
+        "events": len(events),
+        "mutation_batches": len(mutations),
+        "nodes_added": sum(m["added"] for m in mutations),
+        "nodes_removed": sum(m["removed"] for m in mutations),
+        "attribute_changes": sum(m["attributes"] for m in mutations),
+        "cards_touched": len(cards),
+        "cards_total": data["cards_total"],
+        "container_mutations": container,
+        "feed_rerender": len(cards) > 1 or container > 0,
+        "detail": data,
+    }
+    record["latency_ms"] = record["inp_ms"] if record["inp_ms"] is not None else record["next_frame_ms"]
+    return record
+
+
+def summarize(records):
+    """Por controle: contagem, p50/p95/máx da latência e re-renders do feed."""
+    summary = {}
+    for control in dict.fromkeys(r["control"] for r in records):
+        rows = [r for r in records if r["control"] == control]
+        latencies = [r["latency_ms"] for r in rows if r["latency_ms"] is not None]
+        summary[control] = {
+            "count": len(rows),
+            "p50_ms": _round(percentile(latencies, 50)),
+            "p95_ms": _round(percentile(latencies, 95)),
+            "max_ms": _round(max(latencies)) if latencies else None,
+            "max_cards_touched": max(r["cards_touched"] for r in rows),
+            "feed_rerenders": sum(1 for r in rows if r["feed_rerender"]),
+        }
+    return summary
+
+
+def keep_slowest(records, out_dir=TRACE_DIR, n=KEEP_SLOWEST):
+    """
+    Grava o trace completo das `n` interações mais lentas em `out_dir` e tira
+    o detalhe de todos os registros (o relatório fica só com o resumo).
+    """
+    pending = [r for r in records if "detail" in r]
+    slowest = sorted((r for r in pending if r["latency_ms"] is not None),
+                     key=lambda r: r["latency_ms"], reverse=True)[:n]
+    paths = []
+    if slowest:
+        os.makedirs(out_dir, exist_ok=True)
+        # Traces de uma execução anterior não se misturam com os desta
+        for name in os.listdir(out_dir):
+            if re.match(r"\d{2}_.*\.json$", name):
+                os.remove(os.path.join(out_dir, name))
+    for rank, r in enumerate(slowest, start=1):
+        path = os.path.join(out_dir, f"{rank:02d}_{re.sub(r'[^0-9A-Za-z_-]+', '_', r['control'])}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(r, f, ensure_ascii=False, indent=2)
+        r["trace"] = path
+        paths.append(path)
+    for r in pending:
+        del r["detail"]
+    return paths
@@ -0,0 +1,185 @@
+# testes/load_api.py
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+
+import aiohttp
+
+from config import API_ROUTES, LOG_DIR, ROOT
+from metrics import latency_summary
+
+REPORT_PATH = os.path.join(LOG_DIR, "load_report.json")
+# `error` dos envios descartados em open loop (fila cheia)
+DROPPED = "Dropped"
+
+
+def route_targets(root, names):
+    """Monta os alvos de carga (GET) para as rotas de API escolhidas."""
+    return [{"name": API_ROUTES[n], "url": root + API_ROUTES[n]} for n in names]
+
+
+def _dropped(target):
+    return {"name": target["name"], "status": None, "latency": None, "bytes": 0, "location": None, "error": DROPPED}
+
+
+async def _fire(session, target, scheduled=None):
+    """
+    Executa uma requisição e devolve o registro de medição. Com `scheduled`
+    (open loop), a latência conta a partir do horário agendado do envio,
+    incluindo a espera na fila (sem omissão coordenada).
+    """
+    sent = time.perf_counter()
+    start = sent if scheduled is None else scheduled
+    record = {"name": target["name"], "status": None, "latency": None, "bytes": 0, "location": None, "error": None,
+              "queue_wait": round(sent - start, 6)}
+    try:
+        async with session.request(
+            target.get("method", "GET"),
+            target["url"],
+            headers=target.get("headers"),
+            allow_redirects=target.get("allow_redirects", True),
+        ) as resp:
+            body = await resp.read()
+            record.update(status=resp.status, bytes=len(body), location=resp.headers.get("Location"))
+    except Exception as e:
+        record["error"] = type(e).__name__
+    record["latency"] = time.perf_counter() - start
+    return record
+
+
+async def run_load(targets, concurrency=10, rate=None, duration=10, timeout=30):
+    """
+    Dispara os `targets` em rodízio por `duration` segundos.
+
+    - `concurrency`: número de workers (e limite de conexões do pool).
+    - `rate`: requisições/s (open loop). Sem `rate`, cada worker dispara a
+      próxima assim que a anterior termina (closed loop).
+
+    Em open loop cada envio leva o horário agendado e a latência é medida a
+    partir dele. Quando a fila enche o envio é descartado, contado em
+    `dropped` e registrado como erro (`DROPPED`) — sinal de que o servidor
+    saturou.
+    """
+    records = []
+    dropped = 0
+    cycle = itertools.cycle(targets)
+    end = time.perf_counter() + duration
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    # DummyCookieJar: cada alvo controla os próprios cookies via header
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout, cookie_jar=aiohttp.DummyCookieJar()) as session:
+
+        async def worker():
+            while True:
+                if rate:
+                    item = await queue.get()
+                    if item is None:
+                        return
+                    target, scheduled = item
+                else:
+                    if time.perf_counter() >= end:
+                        return
+                    target, scheduled = next(cycle), None
+                records.append(await _fire(session, target, scheduled))
+
+        async def producer():
+            nonlocal dropped
+            interval = 1.0 / rate
+            next_at = time.perf_counter()
+            while next_at < end:
+                target = next(cycle)
+                try:
+                    queue.put_nowait((target, next_at))
+                except asyncio.QueueFull:
+                    dropped += 1
+                    records.append(_dropped(target))
+                next_at += interval
+                await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            for _ in range(concurrency):
+                await queue.put(None)
+
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        if rate:
+            tasks.append(asyncio.create_task(producer()))
+        await asyncio.gather(*tasks)
+        wall = time.perf_counter() - started
+
+    return records, wall, dropped
+
+
+def summarize(records, wall):
+    """Agrupa os registros por alvo: vazão, latências, erros, status e payload."""
+    summary = {}
+    for name in dict.fromkeys(r["name"] for r in records):
+        rows = [r for r in records if r["name"] == name]
+        # Descartes entram na taxa de erro, mas não na vazão nem nas latências
+        sent = [r for r in rows if r["error"] != DROPPED]
+        errors = [r for r in rows if r["error"] or r["status"] >= 400]
+        statuses = {}
+        for r in rows:
+            key = str(r["status"] or r["error"])
+            statuses[key] = statuses.get(key, 0) + 1
+        total_bytes = sum(r["bytes"] for r in sent)
+        summary[name] = {
+            "requests": len(sent),
+            "dropped": len(rows) - len(sent),
+            "throughput_rps": round(len(sent) / wall, 2) if wall else None,
+            "error_rate": round(len(errors) / len(rows), 4),
+            "statuses": statuses,
+            "latency": latency_summary([r["latency"] for r in sent]),
+            "queue_wait": latency_summary([r["queue_wait"] for r in sent]),
+            "bytes_total": total_bytes,
+            "bytes_avg": round(total_bytes / len(sent)) if sent else 0,
+        }
+    return summary
+
+
+def print_summary(summary, wall, dropped):
+    print(f"\n{'rota':<18}{'req':>7}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'erro%':>8}{'bytes':>10}")
+    for name, s in summary.items():
+        lat = s["latency"]
+        print(f"{name:<18}{s['requests']:>7}{s['throughput_rps']!s:>9}{lat['p50_ms']!s:>9}{lat['p95_ms']!s:>9}{lat['p99_ms']!s:>9}"
+              f"{s['error_rate'] * 100:>7.1f}%{s['bytes_avg']:>10}")
+    total = sum(s["requests"] for s in summary.values())
+    print(f"\nTotal: {total} req em {wall:.1f}s ({total / wall:.1f} req/s) | descartadas (saturação): {dropped}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de carga assíncrono para as rotas /api/*")
+    parser.add_argument("--root", default=ROOT)
+    parser.add_argument("--routes", nargs="+", default=list(API_ROUTES), choices=list(API_ROUTES))
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=None, help="req/s (open loop); omitido = closed loop")
+    parser.add_argument("--duration", type=float, default=10, help="segundos")
+    parser.add_argument("--output", default=REPORT_PATH)
+    args = parser.parse_args()
+
+    targets = route_targets(args.root, args.routes)
+    records, wall, dropped = asyncio.run(run_load(targets, args.concurrency, args.rate, args.duration))
+    summary = summarize(records, wall)
+    print_summary(summary, wall, dropped)
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "date": time.ctime(),
+            "root": args.root,
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            "duration_s": args.duration,
+            "wall_s": round(wall, 3),
+            "dropped": dropped,
+            "routes": summary,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"Relatório salvo em: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
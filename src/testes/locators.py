@@ -0,0 +1,151 @@
+# testes/locators.py
+
+import threading
+
+# Grupos de seletores da tela de login, em ordem de preferência.
+# Cada item é [css, textos]: com textos, o elemento precisa conter um deles.
+LOGIN_GROUPS = {
+    "login": [["input[type='email']"], ["input[name*='email']"], ["input[id*='email']"],
+              ["input[placeholder*='email']"], ["input[type='text']"]],
+    "password": [["input[type='password']"], ["input[name*='password']"], ["input[id*='password']"],
+                 ["input[placeholder*='senha']"]],
+    "submit": [["button[type='submit'], input[type='submit']"], ["button", ["Entrar", "Login", "Acessar"]]],
+}
+
+ERROR_SELECTORS = "[role='alert'], .error, div[class*='error']"
+ERROR_KEYWORDS = ["inválido", "senha incorreta", "erro", "credenciais", "invalid"]
+
+# Card do feed e as partes resolvidas junto com a contagem (feed_cards)
+CARD_SELECTOR = "div[class*='bodyCardFeed']"
+CARD_PARTS = {
+    "interactions": "div[class*='InteractButtonsCardFeed'] button, div[class*='InteractButtonsCardFeed'] a",
+    "more": "button[class*='moreButtonCard']",
+    "submit": "a[class*='ButtomSubmitCardFeed'], button[class*='ButtomSubmitCardFeed']",
+}
+
+# Seletor vencedor por página: {pathname: {grupo: índice}}
+_hints = {}
+_lock = threading.Lock()
+
+# Contadores do processo: chamadas ao WebDriver e grupos que precisaram sondar
+stats = {"round_trips": 0, "probes": 0, "hint_hits": 0}
+
+_FIRST_VISIBLE_JS = """
+const groups = arguments[0], hints = arguments[1][location.pathname] || {};
+function visible(el) {
+  if (!el.getClientRects().length) return false;
+  const style = getComputedStyle(el);
+  return style.visibility !== 'hidden' && style.display !== 'none';
+}
+function match(spec) {
+  const [css, texts] = spec;
+  for (const el of document.querySelectorAll(css)) {
+    if (!visible(el)) continue;
+    if (texts && !texts.some(t => el.textContent.includes(t))) continue;
+    return el;
+  }
+  return null;
+}
+const found = {};
+for (const [name, specs] of Object.entries(groups)) {
+  const hint = hints[name];
+  found[name] = null;
+  // Tenta primeiro o seletor que venceu da última vez; só sonda os demais se ele falhar
+  if (hint !== undefined && hint < specs.length) {
+    const el = match(specs[hint]);
+    if (el) { found[name] = {el, index: hint, probed: false}; continue; }
+  }
+  for (let i = 0; i < specs.length; i++) {
+    if (i === hint) continue;
+    const el = match(specs[i]);
+    if (el) { found[name] = {el, index: i, probed: true}; break; }
+  }
+}
+return {path: location.pathname, found};
+"""
+
+_SCAN_LOGIN_JS = """
+const html = document.documentElement.innerHTML.toLowerCase();
+let social = 0;
+if (html.includes('fa-google') || html.includes('/login/google')) social++;
+if (html.includes('fa-microsoft') || html.includes('/login/microsoft')) social++;
+const signup = Array.from(document.links).some(a => (a.href || '').toLowerCase().includes('cadastro'));
+return [social, signup];
+"""
+
+_ERROR_JS = """
+const selectors = arguments[0], keywords = arguments[1];
+const texts = Array.from(document.querySelectorAll(selectors)).map(e => e.innerText.trim()).filter(Boolean);
+if (texts.length) return texts.join(' | ');
+const html = document.documentElement.innerHTML.toLowerCase();
+const kw = keywords.find(k => html.includes(k));
+return kw ? `Mensagem contém '${kw}'` : null;
+"""
+
+_LOGIN_SETTLED_JS = """
+if (!location.href.includes('/login')) return true;
+return Array.from(document.querySelectorAll(arguments[0])).some(e => e.innerText.trim());
+"""
+
+_FEED_CARDS_JS = """
+const cards = document.querySelectorAll(arguments[0]), parts = arguments[1];
+const first = cards[0] || null;
+const out = {count: cards.length, first};
+for (const [name, css] of Object.entries(parts)) {
+  out[name] = first ? Array.from(first.querySelectorAll(css)) : [];
+}
+return out;
+"""
+
+
+def _run(driver, script, *args):
+    with _lock:
+        stats["round_trips"] += 1
+    return driver.execute_script(script, *args)
+
+
+def first_visible(driver, groups):
+    """
+    Resolve vários grupos de seletores numa única chamada ao navegador e
+    retorna {grupo: WebElement ou None}. O índice que casou fica guardado
+    por página e é tentado primeiro na próxima vez.
+    """
+    with _lock:
+        hints = {path: dict(h) for path, h in _hints.items()}
+    result = _run(driver, _FIRST_VISIBLE_JS, groups, hints)
+    elements = {}
+    with _lock:
+        page = _hints.setdefault(result["path"], {})
+        for name, hit in result["found"].items():
+            if hit is None:
+                page.pop(name, None)
+                elements[name] = None
+                continue
+            page[name] = hit["index"]
+            stats["probes" if hit["probed"] else "hint_hits"] += 1
+            elements[name] = hit["el"]
+    return elements
+
+
+def scan_login_page(driver):
+    """Conta botões sociais e detecta o link de cadastro sem baixar o HTML."""
+    social, signup = _run(driver, _SCAN_LOGIN_JS)
+    return social, signup
+
+
+def error_message(driver, selectors=ERROR_SELECTORS, keywords=ERROR_KEYWORDS):
+    """Texto de erro visível (ou palavra-chave de erro no HTML), ou None."""
+    return _run(driver, _ERROR_JS, selectors, keywords)
+
+
+def login_settled(driver, selectors=ERROR_SELECTORS):
+    """True se saiu de /login ou se há mensagem de erro na tela."""
+    return _run(driver, _LOGIN_SETTLED_JS, selectors)
+
+
+def feed_cards(driver, card_selector, parts):
+    """
+    Conta os cards e resolve as partes do primeiro (`{nome: css}`) numa
+    chamada só, sem trazer uma referência por card.
+    """
+    return _run(driver, _FEED_CARDS_JS, card_selector, parts)
@@ -0,0 +1,38 @@
+# testes/metrics.py
+
+
+def percentile(values, p):
+    """Percentil `p` (0–100) com interpolação linear; None se não houver valores."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def latency_summary(seconds):
+    """Resumo de latências (entrada em segundos, saída em ms)."""
+    if not seconds:
+        return {"count": 0, "min_ms": None, "mean_ms": None, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    ms = [s * 1000 for s in seconds]
+    return {
+        "count": len(ms),
+        "min_ms": round(min(ms), 2),
+        "mean_ms": round(sum(ms) / len(ms), 2),
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "max_ms": round(max(ms), 2),
+    }
+
+
+def theil_sen_slope(xs, ys):
+    """
+    Inclinação de Theil-Sen (mediana das inclinações entre todos os pares):
+    tendência robusta a picos isolados. None com menos de dois pontos.
+    """
+    slopes = [(ys[j] - ys[i]) / (xs[j] - xs[i])
+              for i in range(len(xs)) for j in range(i + 1, len(xs)) if xs[j] != xs[i]]
+    return percentile(slopes, 50)
@@ -0,0 +1,350 @@
+# testes/mock_supabase.py
+
+import argparse
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+# --- Configurações Iniciais ---
+MOCK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "mock")
+DEFAULT_PORT = 54321
+
+# Tabela do Supabase → arquivo CSV em mock/
+TABLE_FILES = {
+    "editals_data": "editals.csv",
+    "proposer_data": "proposer_data.csv",
+    "tags_data": "tags_data.csv",
+    "comments_data": "comments.csv",
+    "user_data": "user_data.csv",
+    "artist_data": "artist_data.csv",
+}
+
+# Colunas numéricas (ids e chaves estrangeiras); o resto continua texto
+INT_COLUMNS = {"id", "proposer", "user", "edital"}
+
+SINGLE_OBJECT = "application/vnd.pgrst.object+json"
+
+
+# --- Leitura dos CSVs ---
+def split_csv_line(line):
+    """
+    Divide uma linha dos CSVs de mock/ em campos.
+
+    Os arquivos trazem colunas JSON entre aspas sem escapar as aspas
+    internas (ex.: "[{"id": 1, "name": "Pintura"}]"), então o csv padrão
+    não serve: campos que começam com `"[` ou `"{` são lidos até fechar os
+    colchetes/chaves; os demais seguem as regras usuais de aspas.
+    """
+    fields, i, n = [], 0, len(line)
+    while i <= n:
+        if line.startswith(('"[', '"{'), i):
+            depth, j, in_str = 0, i + 1, False
+            while j < n:
+                c = line[j]
+                if in_str:
+                    if c == "\\":
+                        j += 1
+                    elif c == '"':
+                        in_str = False
+                elif c == '"':
+                    in_str = True
+                elif c in "[{":
+                    depth += 1
+                elif c in "]}":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                j += 1
+            fields.append(line[i + 1:j + 1])
+            i = j + 3  # pula `]"` e a vírgula
+        elif line.startswith('"', i):
+            j, value = i + 1, []
+            while j < n:
+                if line[j] == '"':
+                    if line.startswith('""', j):
+                        value.append('"')
+                        j += 2
+                        continue
+                    break
+                value.append(line[j])
+                j += 1
+            fields.append("".join(value))
+            i = j + 2
+        else:
+            j = line.find(",", i)
+            if j == -1:
+                j = n
+            fields.append(line[i:j])
+            i = j + 1
+    return fields
+
+
+def convert(column, raw):
+    """Converte o texto do CSV para o tipo que o PostgREST devolveria."""
+    if raw == "":
+        return None
+    if raw[0] in "[{":
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return raw
+    if raw in ("true", "false"):
+        return raw == "true"
+    if column in INT_COLUMNS:
+        try:
+            return int(raw)
+        except ValueError:
+            return raw
+    return raw
+
+
+def _drop_surplus_empty(fields, expected):
+    """
+    Remove vírgulas sobrando (ex.: editals 303, artist_data 201). O campo
+    extra fica sempre numa sequência de campos vazios; sai da mais longa
+    (empate: a última), para não deslocar vazios legítimos como o
+    `publishDate` em branco do edital 303.
+    """
+    while len(fields) > expected:
+        runs, start = [], None
+        for i, value in enumerate(fields + ["x"]):
+            if value == "" and start is None:
+                start = i
+            elif value != "" and start is not None:
+                runs.append((i - start, start))
+                start = None
+        if not runs:
+            break
+        length, start = max(runs)
+        del fields[start + length - 1]
+    return fields
+
+
+def load_csv(path):
+    """Carrega um CSV de mock/ como lista de dicts já tipados."""
+    with open(path, encoding="utf-8") as f:
+        header = split_csv_line(f.readline().rstrip("\r\n"))
+        rows = []
+        for lineno, line in enumerate(f, start=2):
+            line = line.rstrip("\r\n")
+            if not line:
+                continue
+            fields = _drop_surplus_empty(split_csv_line(line), len(header))
+            if len(fields) != len(header):
+                raise ValueError(f"{path}:{lineno}: {len(fields)} campos, o cabeçalho tem {len(header)}")
+            rows.append({col: convert(col, raw) for col, raw in zip(header, fields)})
+    return header, rows
+
+
+class Table:
+    """Tabela em memória com índice hash por coluna para filtros `eq`."""
+
+    def __init__(self, name, columns, rows):
+        self.name = name
+        self.columns = columns
+        self.rows = rows
+        self.index = {col: {} for col in columns}
+        for pos, row in enumerate(rows):
+            for col in columns:
+                self.index[col].setdefault(_key(row.get(col)), []).append(pos)
+        # `select=*` sem filtro é o caso mais comum: serializa uma única vez
+        self.full_body = json.dumps(rows, ensure_ascii=False).encode("utf-8")
+
+    def lookup(self, filters):
+        """Posições das linhas que satisfazem todos os filtros (col, valor)."""
+        if not filters:
+            return range(len(self.rows))
+        candidates = sorted((self.index[col].get(value, []) for col, value in filters), key=len)
+        result = set(candidates[0])
+        for other in candidates[1:]:
+            result.intersection_update(other)
+        return sorted(result)
+
+
+def _key(value):
+    """Chave de índice: o texto que chegaria na query string."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def load_tables(data_dir=MOCK_DIR):
+    """Carrega todas as tabelas de TABLE_FILES a partir de `data_dir`."""
+    tables = {}
+    for table, filename in TABLE_FILES.items():
+        path = os.path.join(data_dir, filename)
+        if os.path.exists(path):
+            columns, rows = load_csv(path)
+            tables[table] = Table(table, columns, rows)
+    return tables
+
+
+def _parse_count(value):
+    """Inteiro não negativo de `limit`/`offset`/`Range`, ou None se inválido."""
+    try:
+        number = int(value.strip())
+    except ValueError:
+        return None
+    return number if number >= 0 else None
+
+
+# --- Servidor PostgREST ---
+class PostgrestHandler(BaseHTTPRequestHandler):
+    """Subconjunto do PostgREST usado pelo supabase-js do app."""
+
+    protocol_version = "HTTP/1.1"
+    tables = {}
+    # Consultas atendidas por tabela (GET /__stats): mede o tráfego que chega ao "upstream"
+    stats = {}
+    stats_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        # Silencioso: o servidor roda junto com benchmarks
+        pass
+
+    def _cors(self):
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "GET, HEAD, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "apikey, authorization, content-type, x-client-info, accept-profile, prefer, range, range-unit")
+        self.send_header("Access-Control-Expose-Headers", "Content-Range")
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        self._cors()
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status, code, message):
+        self._send(status, json.dumps({"code": code, "message": message, "details": None, "hint": None}).encode("utf-8"))
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self._cors()
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def _stats(self, url):
+        """Contadores por tabela; `?reset=1` zera depois de ler."""
+        with self.stats_lock:
+            counts = dict(self.stats)
+            if dict(parse_qsl(url.query)).get("reset") == "1":
+                self.stats.clear()
+        counts["total"] = sum(counts.values())
+        self._send(200, json.dumps(counts).encode("utf-8"))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/__stats":
+            return self._stats(url)
+        if not url.path.startswith("/rest/v1/"):
+            return self._error(404, "PGRST000", "Rota não encontrada")
+        table = self.tables.get(url.path[len("/rest/v1/"):].strip("/"))
+        if table is None:
+            return self._error(404, "42P01", "relation does not exist")
+        with self.stats_lock:
+            self.stats[table.name] = self.stats.get(table.name, 0) + 1
+
+        select, columns, filters, limit, offset = "*", table.columns, [], None, 0
+        for name, value in parse_qsl(url.query, keep_blank_values=True):
+            if name == "select":
+                select = value
+                if select.strip() != "*":
+                    columns = [c.strip() for c in select.split(",")]
+                    unknown = [c for c in columns if c not in table.index]
+                    if unknown:
+                        return self._error(400, "42703", f"column {table.name}.{unknown[0]} does not exist")
+            elif name in ("limit", "offset"):
+                number = _parse_count(value)
+                if number is None:
+                    return self._error(400, "PGRST100", f"failed to parse {name} parameter ({value})")
+                if name == "limit":
+                    limit = number
+                else:
+                    offset = number
+            elif name in table.index:
+                op, _, operand = value.partition(".")
+                if op != "eq":
+                    return self._error(400, "PGRST100", f"Operador não suportado: {op}")
+                filters.append((name, operand))
+            else:
+                return self._error(400, "42703", f"column {table.name}.{name} does not exist")
+
+        # Paginação via header Range (supabase-js `.range()`)
+        rng = self.headers.get("Range")
+        if rng and "-" in rng:
+            first, _, last = rng.partition("-")
+            first_n = _parse_count(first)
+            last_n = _parse_count(last) if last else None
+            if first_n is None or (last and (last_n is None or last_n < first_n)):
+                return self._error(400, "PGRST100", f"failed to parse Range header ({rng})")
+            offset = first_n
+            if last_n is not None:
+                limit = last_n - offset + 1
+
+        positions = table.lookup(filters)
+        total = len(positions)
+        page = positions[offset:offset + limit if limit is not None else None]
+
+        single = SINGLE_OBJECT in (self.headers.get("Accept") or "")
+        if select.strip() == "*" and not filters and limit is None and offset == 0 and not single:
+            body, count = table.full_body, total
+        else:
+            rows = [{c: table.rows[p].get(c) for c in columns} for p in page]
+            count = len(rows)
+            if single:
+                if count != 1:
+                    return self._error(406, "PGRST116", f"JSON object requested, multiple (or no) rows returned ({count})")
+                body = json.dumps(rows[0], ensure_ascii=False).encode("utf-8")
+            else:
+                body = json.dumps(rows, ensure_ascii=False).encode("utf-8")
+
+        end = offset + count - 1
+        content_range = f"{offset}-{end}/{total}" if count else f"*/{total}"
+        self._send(200, body, {"Content-Range": content_range})
+
+
+def start_server(port=DEFAULT_PORT, data_dir=MOCK_DIR, host="127.0.0.1"):
+    """
+    Sobe o stand-in do Supabase em uma thread e retorna o servidor.
+    Use `server.shutdown()` para encerrar.
+    """
+    handler = type("Handler", (PostgrestHandler,), {"tables": load_tables(data_dir), "stats": {}, "stats_lock": threading.Lock()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in local do Supabase (PostgREST) servido a partir de mock/*.csv")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--data-dir", default=MOCK_DIR)
+    args = parser.parse_args()
+
+    server = start_server(args.port, args.data_dir)
+    for name, table in server.RequestHandlerClass.tables.items():
+        print(f"{name}: {len(table.rows)} linhas")
+    print(f"\nSupabase local em http://127.0.0.1:{args.port} (consultas por tabela em /__stats)")
+    print(f"Rode o app com NEXT_PUBLIC_SUPABASE_URL=http://127.0.0.1:{args.port} NEXT_PUBLIC_SUPABASE_ANON_KEY=local")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# testes/page_metrics.py
+
+from selenium.common.exceptions import WebDriverException
+
+# Injetado em todo documento novo: acumula LCP, CLS e long tasks em window.__perf
+_OBSERVERS_JS = """
+(() => {
+  const perf = window.__perf = {lcp: null, cls: 0, longTasks: 0, longTaskMs: 0, lastResourceCount: 0};
+  try { performance.setResourceTimingBufferSize(5000); } catch (e) {}
+  const observe = (type, cb) => {
+    try { new PerformanceObserver(list => list.getEntries().forEach(cb)).observe({type, buffered: true}); } catch (e) {}
+  };
+  observe('largest-contentful-paint', e => { perf.lcp = e.startTime; });
+  observe('layout-shift', e => { if (!e.hadRecentInput) perf.cls += e.value; });
+  observe('longtask', e => { perf.longTasks += 1; perf.longTaskMs += e.duration; });
+})();
+"""
+
+# Lê as métricas do documento atual; requests = recursos desde a última coleta
+_COLLECT_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const fcp = performance.getEntriesByName('first-contentful-paint')[0];
+const perf = window.__perf || {};
+const resources = performance.getEntriesByType('resource').length;
+const newRequests = resources - (perf.lastResourceCount || 0);
+if (window.__perf) window.__perf.lastResourceCount = resources;
+return {
+  url: location.href,
+  ttfb_ms: nav ? nav.responseStart - nav.requestStart : null,
+  dom_content_loaded_ms: nav ? nav.domContentLoadedEventEnd : null,
+  load_ms: nav ? nav.loadEventEnd : null,
+  transfer_bytes: nav ? nav.transferSize : null,
+  fcp_ms: fcp ? fcp.startTime : null,
+  lcp_ms: perf.lcp ?? null,
+  cls: perf.cls ?? null,
+  long_tasks: perf.longTasks ?? null,
+  long_task_ms: perf.longTaskMs ?? null,
+  requests_total: resources + (nav ? 1 : 0),
+  requests_new: newRequests,
+};
+"""
+
+
+def install_observers(driver):
+    """
+    Registra os observadores de performance em todo documento carregado
+    pelo driver (CDP Page.addScriptToEvaluateOnNewDocument) e habilita o
+    domínio Performance do CDP para a leitura do heap JS.
+    """
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _OBSERVERS_JS})
+        driver.execute_cdp_cmd("Performance.enable", {})
+    except WebDriverException:
+        # Driver sem CDP (ex.: outro navegador): coleta fica só com Navigation Timing
+        pass
+
+
+def js_heap(driver):
+    """Heap JS em uso/total (bytes), via CDP Performance.getMetrics."""
+    try:
+        metrics = {m["name"]: m["value"] for m in driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+    except WebDriverException:
+        return None, None
+    return metrics.get("JSHeapUsedSize"), metrics.get("JSHeapTotalSize")
+
+
+def collect(driver, step):
+    """Retrato das métricas da página no passo `step` (navegação ou interação)."""
+    try:
+        metrics = driver.execute_script(_COLLECT_JS)
+    except WebDriverException as e:
+        return {"step": step, "error": repr(e)}
+    for key, value in metrics.items():
+        if isinstance(value, float):
+            metrics[key] = round(value, 4 if key == "cls" else 1)
+    metrics["js_heap_used_bytes"], metrics["js_heap_total_bytes"] = js_heap(driver)
+    return {"step": step, **metrics}
+
+
+def format_metrics(m):
+    """Linha curta para o relatório em texto."""
+    if "error" in m:
+        return f"{m['step']}: erro na coleta ({m['error']})"
+    heap = f"{m['js_heap_used_bytes'] / 1e6:.1f}MB" if m.get("js_heap_used_bytes") else "n/d"
+    return (f"{m['step']}: TTFB {m['ttfb_ms']}ms | DCL {m['dom_content_loaded_ms']}ms | load {m['load_ms']}ms | "
+            f"LCP {m['lcp_ms']}ms | CLS {m['cls']} | long tasks {m['long_tasks']} ({m['long_task_ms']}ms) | "
+            f"heap {heap} | requests {m['requests_total']} (+{m['requests_new']})")
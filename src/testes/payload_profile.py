@@ -0,0 +1,421 @@
+# testes/payload_profile.py
+
+import argparse
+import codecs
+import gzip
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+import requests
+
+import report_store
+from config import API_ROUTES, LOG_DIR, ROOT
+from profile_data import DATA_PARTS
+
+REPORT_PATH = os.path.join(LOG_DIR, "payload_profile.json")
+TYPES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app", "types")
+
+# Rota → interface de src/app/types que descreve cada linha
+ROUTE_SCHEMAS = {
+    "users": "IUserData",
+    "artists": "IArtist",
+    "proposers": "IProposer",
+    "editals": "IEdital",
+    "tags": "ITagData",
+    "comments": "ICommentData",
+}
+
+# Orçamento de payload por rota (bytes, sem compressão)
+DEFAULT_BUDGET = 128 * 1024
+BUDGETS = {"data": 512 * 1024}
+
+CHUNK_SIZE = 16 * 1024
+# Exemplos guardados por violação de schema
+MAX_EXAMPLES = 3
+
+
+# --- Schemas a partir das interfaces TypeScript ---
+_INTERFACE_RE = re.compile(r"export interface (\w+)(?:\s+extends\s+(\w+))?\s*\{(.*?)\n\}", re.S)
+_FIELD_RE = re.compile(r"^\s*(\w+)(\?)?\s*:\s*([^;]+);")
+
+
+def load_schemas(types_dir=TYPES_DIR):
+    """
+    Lê as interfaces `export interface IX { campo?: tipo; }` de src/app/types
+    e resolve `extends`. Retorna {interface: {campo: (tipo, obrigatório)}}.
+    """
+    raw = {}
+    for name in sorted(os.listdir(types_dir)):
+        if not name.endswith(".ts"):
+            continue
+        with open(os.path.join(types_dir, name), encoding="utf-8") as f:
+            source = f.read()
+        for match in _INTERFACE_RE.finditer(source):
+            fields, depth = {}, 0
+            for line in match.group(3).splitlines():
+                # Ignora campos de objetos literais aninhados
+                if depth == 0:
+                    field = _FIELD_RE.match(line)
+                    if field:
+                        fields[field.group(1)] = (field.group(3).strip(), field.group(2) is None)
+                depth += line.count("{") - line.count("}")
+            raw[match.group(1)] = (match.group(2), fields)
+
+    def resolve(name):
+        parent, fields = raw[name]
+        return {**(resolve(parent) if parent in raw else {}), **fields}
+
+    return {name: resolve(name) for name in raw}
+
+
+def _is_date(value):
+    try:
+        datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return True
+    except (AttributeError, ValueError):
+        return False
+
+
+def check_type(value, ts_type):
+    """
+    Confere um valor do banco contra o tipo TypeScript. Referências a outras
+    entidades (`proposer: UserData`) chegam como id ou objeto; listas (`Tag[]`)
+    como array JSON.
+    """
+    for alt in (a.strip() for a in ts_type.split("|")):
+        if alt in ("null", "undefined"):
+            if value is None:
+                return True
+        elif alt.endswith("[]"):
+            if isinstance(value, list):
+                return True
+        elif alt == "number":
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return True
+        elif alt == "string":
+            if isinstance(value, str):
+                return True
+        elif alt == "boolean":
+            if isinstance(value, bool):
+                return True
+        elif alt == "Date":
+            if _is_date(value):
+                return True
+        elif alt[:1].isupper():
+            if isinstance(value, (int, dict)) and not isinstance(value, bool):
+                return True
+        else:
+            return True
+    return False
+
+
+def validate_row(row, schema):
+    """Lista de (campo, problema) da linha: missing, null, type ou extra."""
+    if not isinstance(row, dict):
+        return [("<linha>", "type")]
+    problems = []
+    for field, (ts_type, required) in schema.items():
+        if field not in row:
+            if required:
+                problems.append((field, "missing"))
+        elif row[field] is None:
+            if required and "null" not in ts_type:
+                problems.append((field, "null"))
+        elif not check_type(row[field], ts_type):
+            problems.append((field, "type"))
+    problems.extend((field, "extra") for field in row if field not in schema)
+    return problems
+
+
+# --- Parser incremental ---
+class RowStream:
+    """
+    Parser incremental para `[linha, ...]` e `{"seção": [linha, ...], ...}`.
+    `feed(texto)` devolve as linhas completas já recebidas como
+    (seção, linha, bytes), sem esperar o corpo inteiro.
+    """
+
+    _WS = " \t\r\n"
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"
+        self._section = None
+
+    def _skip(self, chars):
+        while self._pos < len(self._buf) and self._buf[self._pos] in chars:
+            self._pos += 1
+        return self._buf[self._pos] if self._pos < len(self._buf) else None
+
+    def _value(self, final):
+        """Decodifica o próximo valor; None se ele ainda não chegou inteiro."""
+        try:
+            value, end = self._decoder.raw_decode(self._buf, self._pos)
+        except ValueError:
+            if final:
+                raise
+            return None
+        # Número no fim do buffer pode continuar no próximo pedaço
+        if end == len(self._buf) and not final:
+            return None
+        text = self._buf[self._pos:end]
+        self._pos = end
+        return value, text
+
+    def feed(self, text, final=False):
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        rows = []
+        while True:
+            if self._state == "start":
+                ch = self._skip(self._WS)
+                if ch is None:
+                    break
+                self._pos += 1
+                if ch == "[":
+                    self._state = "elements"
+                elif ch == "{":
+                    self._state = "key"
+                else:
+                    raise ValueError(f"JSON inesperado: começa com {ch!r}")
+            elif self._state == "key":
+                ch = self._skip(self._WS + ",")
+                if ch is None:
+                    break
+                if ch == "}":
+                    self._pos += 1
+                    self._state = "done"
+                    continue
+                key_start = self._pos
+                try:
+                    key, self._pos = self._decoder.raw_decode(self._buf, self._pos)
+                except ValueError:
+                    if final:
+                        raise
+                    break
+                # Só avança quando chave, ":" e o início do valor já chegaram
+                ch = self._skip(self._WS)
+                if ch is not None:
+                    if ch != ":":
+                        raise ValueError(f"JSON inválido: esperado ':' e veio {ch!r}")
+                    self._pos += 1
+                    ch = self._skip(self._WS)
+                if ch is None:
+                    self._pos = key_start
+                    break
+                if ch == "[":
+                    self._pos += 1
+                    self._section = key
+                    self._state = "elements"
+                elif self._value(final) is None:
+                    self._pos = key_start
+                    break
+            elif self._state == "elements":
+                ch = self._skip(self._WS + ",")
+                if ch is None:
+                    break
+                if ch == "]":
+                    self._pos += 1
+                    self._state = "key" if self._section is not None else "done"
+                    self._section = None
+                    continue
+                decoded = self._value(final)
+                if decoded is None:
+                    break
+                value, raw = decoded
+                rows.append((self._section, value, len(raw.encode("utf-8"))))
+            else:
+                break
+        return rows
+
+    def close(self):
+        rows = self.feed("", final=True)
+        if self._state != "done":
+            raise ValueError("JSON truncado")
+        return rows
+
+
+# --- Medição ---
+def _compressed_sizes(body):
+    sizes = {"gzip": len(gzip.compress(body, 6))}
+    try:
+        import brotli
+    except ImportError:
+        return sizes
+    sizes["brotli"] = len(brotli.compress(body, quality=5))
+    return sizes
+
+
+def profile_route(session, url, schemas, section_schemas):
+    """
+    Baixa a rota em streaming, valida cada linha assim que ela chega e mede
+    tamanho, tempo até a primeira linha, parse e compressão.
+    `section_schemas` mapeia a seção (None para arrays no topo) → interface.
+    """
+    stream, decoder = RowStream(), codecs.getincrementaldecoder("utf-8")()
+    body = bytearray()
+    sections = {}
+    parse_s = validate_s = 0.0
+    first_row_s = None
+
+    def consume(rows):
+        nonlocal validate_s, first_row_s
+        if rows and first_row_s is None:
+            first_row_s = time.perf_counter() - start
+        v_start = time.perf_counter()
+        for section, row, size in rows:
+            s = sections.setdefault(section, {"rows": 0, "bytes": 0, "max_row_bytes": 0, "violations": {}})
+            s["rows"] += 1
+            s["bytes"] += size
+            s["max_row_bytes"] = max(s["max_row_bytes"], size)
+            schema = schemas.get(section_schemas.get(section))
+            for field, problem in validate_row(row, schema) if schema else []:
+                v = s["violations"].setdefault(f"{field}:{problem}", {"count": 0, "examples": []})
+                v["count"] += 1
+                if len(v["examples"]) < MAX_EXAMPLES:
+                    v["examples"].append(row.get("id") if isinstance(row, dict) else None)
+        validate_s += time.perf_counter() - v_start
+
+    start = time.perf_counter()
+    res = session.get(url, stream=True)
+    ttfb = time.perf_counter() - start
+    error = None
+    try:
+        for chunk in res.iter_content(chunk_size=CHUNK_SIZE):
+            body += chunk
+            p_start = time.perf_counter()
+            rows = stream.feed(decoder.decode(chunk))
+            parse_s += time.perf_counter() - p_start
+            consume(rows)
+        p_start = time.perf_counter()
+        rows = stream.feed(decoder.decode(b"", final=True)) + stream.close()
+        parse_s += time.perf_counter() - p_start
+        consume(rows)
+    except ValueError as e:
+        error = str(e)
+    total = time.perf_counter() - start
+    if not 200 <= res.status_code < 300:
+        # Página de erro: tamanho e linhas não dizem nada sobre a rota
+        error = f"status {res.status_code}" + (f" ({error})" if error else "")
+
+    try:
+        wire_bytes = res.raw.tell()
+    except AttributeError:
+        wire_bytes = None
+    compressed = _compressed_sizes(bytes(body))
+    rows_total = sum(s["rows"] for s in sections.values())
+    for s in sections.values():
+        s["bytes_per_row"] = round(s["bytes"] / s["rows"]) if s["rows"] else None
+    return {
+        "url": url,
+        "status": res.status_code,
+        "content_encoding": res.headers.get("Content-Encoding"),
+        "bytes": len(body),
+        "wire_bytes": wire_bytes,
+        "rows": rows_total,
+        "bytes_per_row": round(len(body) / rows_total) if rows_total else None,
+        "ttfb_ms": round(ttfb * 1000, 1),
+        "first_row_ms": round(first_row_s * 1000, 1) if first_row_s is not None else None,
+        "total_ms": round(total * 1000, 1),
+        "parse_ms": round(parse_s * 1000, 2),
+        "validate_ms": round(validate_s * 1000, 2),
+        "compressed_bytes": compressed,
+        "compression_ratio": {k: round(v / len(body), 3) if body else None for k, v in compressed.items()},
+        "sections": {str(k): v for k, v in sections.items()},
+        "violations_total": sum(v["count"] for s in sections.values() for v in s["violations"].values()),
+        "error": error,
+    }
+
+
+def section_schemas_for(route):
+    """Seções da resposta da rota → interface (o /api/data tem uma seção por tabela)."""
+    if route == "data":
+        return {part: ROUTE_SCHEMAS[r] for part, (r, _) in DATA_PARTS.items()}
+    return {None: ROUTE_SCHEMAS.get(route)}
+
+
+def print_profile(results, budgets):
+    print(f"\n{'rota':<12}{'bytes':>11}{'linhas':>8}{'B/linha':>9}{'gzip':>7}{'brotli':>8}{'1ª linha':>10}{'parse ms':>10}{'violações':>11}")
+    for route, r in results.items():
+        ratio = r["compression_ratio"]
+        brotli_ratio = f"{ratio['brotli']:.2f}" if "brotli" in ratio else "n/d"
+        flag = "❌" if r["error"] or r["bytes"] > budgets[route] else "  "
+        print(f"{flag}{route:<10}{r['bytes']:>11}{r['rows']:>8}{str(r['bytes_per_row']):>9}{str(ratio['gzip']):>7}{brotli_ratio:>8}"
+              f"{str(r['first_row_ms']):>10}{r['parse_ms']:>10}{r['violations_total']:>11}")
+    for route, r in results.items():
+        for section, s in r["sections"].items():
+            for key, v in sorted(s["violations"].items(), key=lambda kv: -kv[1]["count"]):
+                where = route if section == "None" else f"{route}.{section}"
+                print(f"⚠️ {where}: {key} em {v['count']} linha(s) (ids {v['examples']})")
+
+
+def _budget(item):
+    """`ROTA=BYTES` de `--budget` → (rota, bytes)."""
+    route, sep, value = item.partition("=")
+    if not sep or route not in API_ROUTES:
+        raise argparse.ArgumentTypeError(f"esperado ROTA=BYTES com ROTA em {', '.join(API_ROUTES)}: {item!r}")
+    try:
+        size = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"BYTES precisa ser um inteiro: {item!r}")
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"BYTES precisa ser positivo: {item!r}")
+    return route, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tamanho, compressão e schema das respostas das rotas /api/*")
+    parser.add_argument("--root", default=ROOT)
+    parser.add_argument("--routes", nargs="+", default=list(API_ROUTES), choices=list(API_ROUTES))
+    parser.add_argument("--budget", nargs="*", type=_budget, default=[], metavar="ROTA=BYTES", help="sobrescreve o orçamento de uma rota")
+    parser.add_argument("--output", default=REPORT_PATH)
+    args = parser.parse_args()
+
+    budgets = {route: BUDGETS.get(route, DEFAULT_BUDGET) for route in args.routes}
+    for route, size in args.budget:
+        budgets[route] = size
+
+    schemas = load_schemas()
+    results = {}
+    with requests.Session() as session:
+        # Sem Accept-Encoding: mede o JSON cru; a compressão é estimada localmente
+        session.headers["Accept-Encoding"] = "identity"
+        for route in args.routes:
+            results[route] = profile_route(session, args.root + API_ROUTES[route], schemas, section_schemas_for(route))
+    print_profile(results, budgets)
+
+    failed = [route for route, r in results.items() if r["error"]]
+    over = [route for route, r in results.items() if r["bytes"] > budgets[route] and route not in failed]
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"date": time.ctime(), "root": args.root, "budgets": budgets, "over_budget": over, "failed": failed,
+                   "routes": results}, f, ensure_ascii=False, indent=2)
+
+    # Histórico: `report_store.py compare --kind payload` aponta crescimento entre execuções
+    flat = {}
+    for route, r in results.items():
+        if route in failed:
+            continue
+        flat[f"payload.{route}.bytes"] = r["bytes"]
+        flat[f"payload.{route}.parse_ms"] = r["parse_ms"]
+        if r["bytes_per_row"] is not None:
+            flat[f"payload.{route}.bytes_per_row"] = r["bytes_per_row"]
+    if flat:
+        report_store.append_run(report_store.build_run("payload", flat))
+
+    for route in failed:
+        print(f"❌ {route}: {results[route]['error']}")
+    for route in over:
+        print(f"❌ {route}: {results[route]['bytes']} bytes acima do orçamento de {budgets[route]}")
+    print(f"\nRelatório salvo em: {args.output}")
+    return 1 if over or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
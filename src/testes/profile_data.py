@@ -0,0 +1,223 @@
+# testes/profile_data.py
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from config import API_ROUTES, LOG_DIR, ROOT
+
+REPORT_PATH = os.path.join(LOG_DIR, "data_profile.json")
+
+# Chave no JSON de /api/data → (rota individual, tabela do Supabase),
+# na mesma ordem em que src/app/api/data/route.ts faz as consultas
+DATA_PARTS = {
+    "userData": ("users", "user_data"),
+    "artists": ("artists", "artist_data"),
+    "proposers": ("proposers", "proposer_data"),
+    "editals": ("editals", "editals_data"),
+    "tags": ("tags", "tags_data"),
+    "comments": ("comments", "comments_data"),
+}
+
+# Folga antes de considerar o agregado mais lento que as chamadas em paralelo
+SLOWER_TOLERANCE = 0.10
+
+
+def measure(session, url, headers=None):
+    """
+    Mede uma requisição separando as fases:
+    - ttfb_s: até os headers (inclui o trabalho do servidor)
+    - transfer_s: download do corpo
+    - parse_s: json.loads local
+    """
+    start = time.perf_counter()
+    res = session.get(url, headers=headers, stream=True)
+    ttfb = time.perf_counter() - start
+    body = res.content
+    transfer = time.perf_counter() - start - ttfb
+    parse_start = time.perf_counter()
+    try:
+        data = json.loads(body)
+    except ValueError:
+        data = None
+    return {
+        "url": url,
+        "status": res.status_code,
+        "ttfb_s": ttfb,
+        "transfer_s": transfer,
+        "parse_s": time.perf_counter() - parse_start,
+        "total_s": time.perf_counter() - start,
+        "bytes": len(body),
+        "data": data,
+    }
+
+
+def check(record, aggregate=False):
+    """
+    Marca em `record["problem"]` o que impede de usar a medição (None se ok):
+    status diferente de 200 ou corpo fora do formato esperado (lista de
+    linhas; no agregado, um objeto com uma lista para cada parte).
+    """
+    data = record["data"]
+    if record["status"] != 200:
+        problem = f"status {record['status']}"
+    elif data is None:
+        problem = "corpo não é JSON"
+    elif aggregate and not isinstance(data, dict):
+        problem = "corpo não é um objeto"
+    elif aggregate:
+        missing = [part for part in DATA_PARTS if not isinstance(data.get(part), list)]
+        problem = f"sem lista em {', '.join(missing)}" if missing else None
+    else:
+        problem = None if isinstance(data, list) else "corpo não é uma lista"
+    record["problem"] = problem
+    return record
+
+
+def _median(samples, key):
+    return statistics.median(s[key] for s in samples)
+
+
+def profile_once(session, root, supabase_url=None, supabase_key=None):
+    """Uma rodada: agregado, rotas individuais em série, em paralelo e (opcional) Supabase direto."""
+    run = {"aggregate": check(measure(session, root + API_ROUTES["data"]), aggregate=True), "single": {}, "upstream": {}}
+
+    for part, (route, table) in DATA_PARTS.items():
+        run["single"][part] = check(measure(session, root + API_ROUTES[route]))
+        if supabase_url:
+            headers = {"apikey": supabase_key, "Authorization": f"Bearer {supabase_key}"}
+            run["upstream"][part] = check(measure(session, f"{supabase_url}/rest/v1/{table}?select=*", headers))
+
+    # Mesmas seis chamadas disparadas ao mesmo tempo (uma sessão por thread)
+    def fire(route):
+        with requests.Session() as s:
+            return check(measure(s, root + API_ROUTES[route]))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(DATA_PARTS)) as executor:
+        run["parallel"] = list(executor.map(fire, [route for route, _ in DATA_PARTS.values()]))
+    run["parallel_wall_s"] = time.perf_counter() - start
+    return run
+
+
+def problems(runs):
+    """Respostas com problema em qualquer rodada, como `url: problema` (sem repetição)."""
+    found = []
+    for run in runs:
+        records = [run["aggregate"], *run["single"].values(), *run["upstream"].values(), *run["parallel"]]
+        for r in records:
+            line = f"{r['url']}: {r['problem']}"
+            if r["problem"] and line not in found:
+                found.append(line)
+    return found
+
+
+def breakdown(runs):
+    """Correlaciona agregado e rotas individuais (medianas das rodadas)."""
+    agg = [r["aggregate"] for r in runs]
+    result = {
+        "aggregate": {
+            "ttfb_s": round(_median(agg, "ttfb_s"), 4),
+            "transfer_s": round(_median(agg, "transfer_s"), 4),
+            "parse_s": round(_median(agg, "parse_s"), 4),
+            "total_s": round(_median(agg, "total_s"), 4),
+            "bytes": agg[-1]["bytes"],
+        },
+        "queries": {},
+    }
+
+    # Tempo de cada consulta: Supabase direto quando disponível; senão o TTFB
+    # da rota individual (limite superior, inclui o overhead da rota)
+    source = "upstream" if runs[0]["upstream"] else "single"
+    for part in DATA_PARTS:
+        samples = [r[source][part] for r in runs]
+        single = [r["single"][part] for r in runs]
+        query = _median(samples, "ttfb_s")
+        if source == "upstream":
+            # O servidor só segue após receber o corpo inteiro do Supabase
+            query += _median(samples, "transfer_s")
+        result["queries"][part] = {
+            "query_s": round(query, 4),
+            "single_route_total_s": round(_median(single, "total_s"), 4),
+            "bytes": single[-1]["bytes"],
+            "rows": len(single[-1]["data"]) if isinstance(single[-1]["data"], list) else None,
+        }
+    result["query_source"] = source
+
+    queries_sum = sum(q["query_s"] for q in result["queries"].values())
+    agg_ttfb = result["aggregate"]["ttfb_s"]
+    # No agregado as consultas rodam em série: o que sobra do TTFB é serialização + overhead
+    result["serialization_overhead_s"] = round(max(0.0, agg_ttfb - queries_sum), 4)
+
+    # Custo local de serializar o mesmo objeto (referência para o JSON.stringify do servidor)
+    sample = runs[-1]["aggregate"]["data"]
+    start = time.perf_counter()
+    json.dumps(sample, ensure_ascii=False)
+    result["local_serialize_s"] = round(time.perf_counter() - start, 4)
+
+    total = result["aggregate"]["total_s"] or 1
+    result["share"] = {part: round(q["query_s"] / total, 3) for part, q in result["queries"].items()}
+    result["share"]["serialization_overhead"] = round(result["serialization_overhead_s"] / total, 3)
+    result["share"]["transfer"] = round(result["aggregate"]["transfer_s"] / total, 3)
+
+    parallel = statistics.median(r["parallel_wall_s"] for r in runs)
+    result["parallel_wall_s"] = round(parallel, 4)
+    result["aggregate_slower_than_parallel"] = result["aggregate"]["total_s"] > parallel * (1 + SLOWER_TOLERANCE)
+    # Tempos de uma resposta de erro não dizem nada sobre as consultas
+    result["problems"] = problems(runs)
+    return result
+
+
+def print_breakdown(result):
+    agg = result["aggregate"]
+    print(f"\n/api/data: total {agg['total_s']}s | TTFB {agg['ttfb_s']}s | transferência {agg['transfer_s']}s | parse {agg['parse_s']}s | {agg['bytes']} bytes")
+    print(f"\n{'parte':<14}{'consulta (s)':>14}{'rota (s)':>12}{'linhas':>9}{'bytes':>12}{'% total':>9}")
+    for part, q in result["queries"].items():
+        print(f"{part:<14}{q['query_s']:>14}{q['single_route_total_s']:>12}{str(q['rows']):>9}{q['bytes']:>12}{result['share'][part] * 100:>8.1f}%")
+    print(f"{'serialização+overhead':<26}{result['serialization_overhead_s']:>14}s ({result['share']['serialization_overhead'] * 100:.1f}%)")
+    print(f"{'transferência':<26}{agg['transfer_s']:>14}s ({result['share']['transfer'] * 100:.1f}%)")
+    print(f"\nConsultas medidas via: {result['query_source']}")
+    print(f"Seis rotas em paralelo: {result['parallel_wall_s']}s")
+    if result["aggregate_slower_than_parallel"]:
+        print("⚠️ /api/data é mais lento que as mesmas chamadas em paralelo: as consultas em série são o gargalo.")
+    else:
+        print("✅ /api/data não é mais lento que as chamadas em paralelo.")
+    for problem in result["problems"]:
+        print(f"❌ {problem}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de latência do endpoint agregado /api/data")
+    parser.add_argument("--root", default=ROOT)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--supabase-url", default=os.environ.get("NEXT_PUBLIC_SUPABASE_URL"))
+    parser.add_argument("--supabase-key", default=os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY", "local"))
+    parser.add_argument("--output", default=REPORT_PATH)
+    args = parser.parse_args()
+
+    with requests.Session() as session:
+        # Aquecimento: compilação sob demanda das rotas no `next dev`
+        profile_once(session, args.root)
+        runs = [profile_once(session, args.root, args.supabase_url, args.supabase_key) for _ in range(args.repeat)]
+
+    result = breakdown(runs)
+    print_breakdown(result)
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"date": time.ctime(), "root": args.root, "repeat": args.repeat, **result}, f, ensure_ascii=False, indent=2)
+    print(f"\nRelatório salvo em: {args.output}")
+    if result["problems"]:
+        print("❌ Medições inválidas: há respostas com erro ou fora do formato esperado.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+# testes/report_store.py
+
+import argparse
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from collections import deque
+
+from config import LOG_DIR
+from metrics import percentile
+
+# Histórico append-only: uma linha JSON por execução
+RUNS_PATH = os.path.join(LOG_DIR, "runs.jsonl")
+
+# Métricas de page_metrics que entram no histórico
+PAGE_METRIC_KEYS = ["ttfb_ms", "dom_content_loaded_ms", "load_ms", "fcp_ms", "lcp_ms", "cls", "long_task_ms", "js_heap_used_bytes", "requests_new"]
+
+# Padrões do modo compare
+BASELINE_RUNS = 20
+ALPHA = 0.01
+MIN_CHANGE = 0.10
+ROBUST_Z = 3.0
+
+
+def git_commit():
+    """Commit atual (curto) ou None fora de um repositório git."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten_report(report):
+    """
+    Achata o relatório de `run_test_flow` em {métrica: número}.
+    Todos os valores são "menor é melhor" (durações, tamanhos, contagens).
+    """
+    flat = {}
+    startup = report.get("startup") or {}
+    if startup.get("pool_build_s") is not None:
+        flat["startup.pool_build_s"] = startup["pool_build_s"]
+    if report.get("attempts_wall_time") is not None:
+        flat["attempts.wall_s"] = report["attempts_wall_time"]
+    for a in report.get("attempts", []):
+        if a.get("duration_s") is not None:
+            flat[f"attempt.{a['attempt_number']}.duration_s"] = a["duration_s"]
+    for m in report.get("metrics", []):
+        for key in PAGE_METRIC_KEYS:
+            if m.get(key) is not None:
+                flat[f"page.{m['step']}.{key}"] = m[key]
+
+    feed = report.get("feed") or {}
+    for api in feed.get("apis", []):
+        if isinstance(api.get("tempo_s"), (int, float)):
+            flat[f"api.{api['url']}.tempo_s"] = api["tempo_s"]
+    for step in feed.get("steps", []):
+        flat[f"step.{step['step']}.duration_s"] = step["duration_s"]
+    for it in feed.get("interactions", []):
+        flat[f"interaction.{it['name']}.duration_s"] = it["duration_s"]
+    inp = {}
+    for t in feed.get("traces", []):
+        if t.get("latency_ms") is not None:
+            inp.setdefault(t["control"], []).append(t["latency_ms"])
+    for control, values in inp.items():
+        flat[f"inp.{control}.p95_ms"] = round(percentile(values, 95), 1)
+    for m in feed.get("metrics", []):
+        for key in PAGE_METRIC_KEYS:
+            if m.get(key) is not None:
+                flat[f"page.{m['step']}.{key}"] = m[key]
+    if feed.get("waits"):
+        flat["wait.total_s"] = round(sum(w["duration_s"] for w in feed["waits"]), 3)
+    return flat
+
+
+def build_run(kind, metrics, summary=None):
+    """Registro de uma execução para o histórico."""
+    return {
+        "run_id": uuid.uuid4().hex[:12],
+        "timestamp": time.time(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "kind": kind,
+        "summary": summary,
+        "metrics": metrics,
+    }
+
+
+def append_run(run, path=RUNS_PATH):
+    """Acrescenta a execução ao histórico (nunca reescreve linhas antigas)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run, ensure_ascii=False, separators=(",", ":")) + "\n")
+    return path
+
+
+def load_runs(path=RUNS_PATH, kind=None):
+    """Lê o histórico em streaming; linhas corrompidas são ignoradas."""
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                run = json.loads(line)
+            except ValueError:
+                continue
+            if kind is None or run.get("kind") == kind:
+                yield run
+
+
+# --- Comparação estatística ---
+def _normal_sf(z):
+    """P(Z > z) para a normal padrão."""
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def mann_whitney_greater(current, baseline):
+    """
+    Teste U de Mann-Whitney unilateral (current > baseline), aproximação
+    normal com correção de empates. Retorna o p-valor.
+    """
+    n1, n2 = len(current), len(baseline)
+    ranked = sorted([(v, 0) for v in current] + [(v, 1) for v in baseline])
+    ranks, i, ties = [0.0] * len(ranked), 0, 0.0
+    while i < len(ranked):
+        j = i
+        while j + 1 < len(ranked) and ranked[j + 1][0] == ranked[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        t = j - i + 1
+        ties += t ** 3 - t
+        i = j + 1
+    r1 = sum(r for r, (_, group) in zip(ranks, ranked) if group == 0)
+    u1 = r1 - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))))
+    if sigma == 0:
+        return 1.0
+    return _normal_sf((u1 - n1 * n2 / 2 - 0.5) / sigma)
+
+
+def robust_z(value, baseline):
+    """z-score robusto (mediana e MAD) de um único valor contra o baseline."""
+    med = statistics.median(baseline)
+    mad = statistics.median(abs(v - med) for v in baseline) * 1.4826
+    if mad == 0:
+        return math.inf if value > med else 0.0
+    return (value - med) / mad
+
+
+def compare(runs, baseline_runs=BASELINE_RUNS, current_runs=1, alpha=ALPHA, min_change=MIN_CHANGE):
+    """
+    Compara as últimas `current_runs` execuções com as `baseline_runs`
+    anteriores, métrica a métrica. Uma regressão exige as duas coisas:
+    - significância: Mann-Whitney (p < alpha) com 3+ execuções atuais, ou
+      z-score robusto > ROBUST_Z com uma ou duas;
+    - tamanho: aumento da mediana de pelo menos `min_change`.
+
+    `runs` pode ser o gerador de `load_runs`: só as últimas
+    `baseline_runs + current_runs` execuções ficam em memória.
+    """
+    if baseline_runs < 1 or current_runs < 1:
+        raise ValueError("baseline_runs e current_runs precisam ser >= 1")
+    runs = list(deque(runs, maxlen=baseline_runs + current_runs))
+    current = runs[-current_runs:]
+    baseline = runs[:-current_runs]
+    results = []
+    if len(baseline) < 5:
+        return results
+
+    keys = sorted({k for r in current for k in r["metrics"]})
+    for key in keys:
+        cur = [r["metrics"][key] for r in current if key in r["metrics"]]
+        base = [r["metrics"][key] for r in baseline if key in r["metrics"]]
+        if len(base) < 5 or not cur:
+            continue
+        base_med, cur_med = statistics.median(base), statistics.median(cur)
+        change = (cur_med - base_med) / base_med if base_med else (math.inf if cur_med > 0 else 0.0)
+        if len(cur) >= 3:
+            p = mann_whitney_greater(cur, base)
+            significant, stat = p < alpha, {"p_value": round(p, 5)}
+        else:
+            z = robust_z(cur_med, base)
+            significant, stat = z > ROBUST_Z, {"robust_z": round(z, 2) if math.isfinite(z) else None}
+        results.append({
+            "metric": key,
+            "baseline_median": round(base_med, 4),
+            "current_median": round(cur_med, 4),
+            "change": round(change, 4) if math.isfinite(change) else None,
+            "regression": significant and change >= min_change,
+            **stat,
+        })
+    return results
+
+
+def _positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"inteiro inválido: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"precisa ser >= 1: {value}")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Histórico de execuções (JSONL) e comparação com baseline")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cmp_parser = sub.add_parser("compare", help="aponta regressões de latência contra o baseline")
+    cmp_parser.add_argument("--path", default=RUNS_PATH)
+    cmp_parser.add_argument("--kind", default="ui")
+    cmp_parser.add_argument("--baseline", type=_positive_int, default=BASELINE_RUNS, help="execuções anteriores usadas como baseline")
+    cmp_parser.add_argument("--current", type=_positive_int, default=1, help="últimas execuções avaliadas")
+    cmp_parser.add_argument("--alpha", type=float, default=ALPHA)
+    cmp_parser.add_argument("--min-change", type=float, default=MIN_CHANGE)
+    cmp_parser.add_argument("--all", action="store_true", help="lista também as métricas sem regressão")
+    args = parser.parse_args()
+
+    results = compare(load_runs(args.path, args.kind), args.baseline, args.current, args.alpha, args.min_change)
+    if not results:
+        print("Histórico insuficiente para comparar (mínimo de 5 execuções no baseline).")
+        return 0
+
+    regressions = [r for r in results if r["regression"]]
+    for r in results if args.all else regressions:
+        flag = "❌" if r["regression"] else "✅"
+        change = f"{r['change'] * 100:+.1f}%" if r["change"] is not None else "n/d"
+        stat = f"p={r['p_value']}" if "p_value" in r else f"z={r['robust_z']}"
+        print(f"{flag} {r['metric']}: {r['baseline_median']} → {r['current_median']} ({change}, {stat})")
+    print(f"\n{len(regressions)} regressão(ões) em {len(results)} métricas.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+# testes/scenarios.py
+
+# Cenários registrados, na ordem de registro: {nome: {...}}
+SCENARIOS = {}
+
+
+def scenario(name, label, group="feed", gate=False):
+    """
+    Registra `fn(ctx)` como cenário independente.
+
+    - `label`: prefixo da linha ❌ quando o cenário falha.
+    - `group`: "feed" (precisa de sessão e do feed aberto) ou "login".
+    - `gate`: na execução sequencial, uma falha aqui encerra o grupo.
+    """
+    def register(fn):
+        SCENARIOS[name] = {"name": name, "fn": fn, "label": label, "group": group, "gate": gate}
+        return fn
+    return register
+
+
+def names(group=None):
+    """Nomes dos cenários (de um grupo), na ordem de registro."""
+    return [n for n, s in SCENARIOS.items() if group is None or s["group"] == group]
+
+
+def shard(selected, index, count):
+    """
+    Fatia de `selected` do nó `index` (base 0) entre `count` nós. Depende só
+    da ordem de registro, então todos os nós calculam a mesma divisão.
+    """
+    if not 0 <= index < count:
+        raise ValueError(f"shard {index} fora do intervalo 0..{count - 1}")
+    return selected[index::count]
@@ -0,0 +1,162 @@
+# testes/scroll_bench.py
+
+import argparse
+import json
+import os
+import time
+
+from selenium.webdriver.common.by import By
+
+import auth_session
+import mock_supabase
+import report_store
+import synth_data
+from config import LOG_DIR, MED, ROOT, SESSION_USER
+from driver_factory import build_driver
+from locators import CARD_SELECTOR
+from metrics import percentile
+from waits import Waiter
+
+REPORT_PATH = os.path.join(LOG_DIR, "scroll_bench.json")
+
+# Velocidades de scroll (px/s) e orçamento de um frame a 60 Hz
+SPEEDS = [600, 1500, 3000]
+FRAME_MS = 1000 / 60
+# Tempo máximo de cada passada de scroll
+MAX_SCROLL_S = 20
+
+# Métricas acumuladas do CDP Performance.getMetrics (em segundos)
+CDP_DURATIONS = {
+    "ScriptDuration": "scripting_ms",
+    "LayoutDuration": "layout_ms",
+    "RecalcStyleDuration": "style_ms",
+    "TaskDuration": "task_ms",
+}
+
+# JS: rola do topo ao fim a `speed` px/s guiado por requestAnimationFrame e
+# devolve o intervalo entre frames consecutivos (ms)
+_SCROLL_JS = """
+const speed = arguments[0], maxMs = arguments[1], done = arguments[arguments.length - 1];
+window.scrollTo(0, 0);
+const bottom = Math.max(0, document.documentElement.scrollHeight - window.innerHeight);
+const deltas = [];
+let start = null, last = null;
+function frame(ts) {
+  if (start === null) { start = last = ts; }
+  else { deltas.push(ts - last); last = ts; }
+  const y = Math.min(bottom, speed * (ts - start) / 1000);
+  window.scrollTo(0, y);
+  if (y >= bottom || ts - start >= maxMs) return done({deltas, distance: y, bottom});
+  requestAnimationFrame(frame);
+}
+requestAnimationFrame(frame);
+"""
+
+
+def cdp_durations(driver):
+    metrics = {m["name"]: m["value"] for m in driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+    return {key: metrics.get(key, 0.0) for key in CDP_DURATIONS}
+
+
+def scroll_pass(driver, speed):
+    """Uma passada de scroll a `speed` px/s: tempos de frame + custo de script/layout."""
+    before = cdp_durations(driver)
+    driver.set_script_timeout(MAX_SCROLL_S + 5)
+    result = driver.execute_async_script(_SCROLL_JS, speed, MAX_SCROLL_S * 1000)
+    after = cdp_durations(driver)
+
+    deltas = result["deltas"]
+    # Cada intervalo de N frames conta N-1 frames perdidos
+    dropped = sum(max(0, round(d / FRAME_MS) - 1) for d in deltas)
+    stats = {
+        "speed_px_s": speed,
+        "distance_px": round(result["distance"]),
+        "frames": len(deltas),
+        "mean_frame_ms": round(sum(deltas) / len(deltas), 2) if deltas else None,
+        "p95_frame_ms": round(percentile(deltas, 95), 2) if deltas else None,
+        "p99_frame_ms": round(percentile(deltas, 99), 2) if deltas else None,
+        "max_frame_ms": round(max(deltas), 2) if deltas else None,
+        "dropped_frames": dropped,
+        "dropped_ratio": round(dropped / (dropped + len(deltas)), 4) if deltas else None,
+    }
+    for key, name in CDP_DURATIONS.items():
+        stats[name] = round((after[key] - before[key]) * 1000, 1)
+    return stats
+
+
+def bench_dataset(driver, label, speeds):
+    """Abre o feed e roda todas as velocidades para o dataset atual."""
+    waiter = Waiter(driver, timeout=MED)
+    driver.get(ROOT + "/")
+    waiter.element((By.CSS_SELECTOR, CARD_SELECTOR))
+    waiter.network_idle()
+    cards = len(driver.find_elements(By.CSS_SELECTOR, CARD_SELECTOR))
+    height = driver.execute_script("return document.documentElement.scrollHeight")
+    passes = [scroll_pass(driver, speed) for speed in speeds]
+    return {"dataset": label, "cards": cards, "page_height_px": height, "passes": passes}
+
+
+def print_results(results):
+    print(f"\n{'dataset':<10}{'cards':>7}{'px/s':>7}{'frames':>8}{'p95 ms':>9}{'p99 ms':>9}{'perdidos':>10}{'script ms':>11}{'layout ms':>11}")
+    for r in results:
+        for p in r["passes"]:
+            print(f"{r['dataset']:<10}{r['cards']:>7}{p['speed_px_s']:>7}{p['frames']:>8}{str(p['p95_frame_ms']):>9}{str(p['p99_frame_ms']):>9}"
+                  f"{p['dropped_frames']:>10}{p['scripting_ms']:>11}{p['layout_ms']:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de scroll do feed (bodyCardFeed) por tamanho de dataset")
+    parser.add_argument("--speeds", type=int, nargs="+", default=SPEEDS, help="velocidades em px/s")
+    parser.add_argument("--scales", type=float, nargs="+", default=None,
+                        help="escalas do synth_data servidas pelo mock_supabase (o Next deve apontar para ele)")
+    parser.add_argument("--supabase-port", type=int, default=mock_supabase.DEFAULT_PORT)
+    parser.add_argument("--login", default=SESSION_USER["login"])
+    parser.add_argument("--password", default=SESSION_USER["password"])
+    parser.add_argument("--output", default=REPORT_PATH)
+    args = parser.parse_args()
+
+    driver = build_driver()
+    results = []
+    try:
+        # Reaproveita a sessão em cache; só faz login pela UI se ela expirou
+        cookie = auth_session.get_session(args.login, args.password, driver=driver)
+        if cookie is None:
+            print("❌ Login falhou: sessão não obtida")
+            return
+        auth_session.inject_into_driver(driver, cookie)
+
+        if not args.scales:
+            results.append(bench_dataset(driver, "atual", args.speeds))
+        for scale in args.scales or []:
+            # Troca os dados do stand-in sem reiniciar o Next
+            data_dir = os.path.join(LOG_DIR, "data", f"{scale:g}x")
+            if not os.path.exists(os.path.join(data_dir, "editals.csv")):
+                synth_data.generate(data_dir, scale)
+            server = mock_supabase.start_server(args.supabase_port, data_dir)
+            try:
+                results.append(bench_dataset(driver, f"{scale:g}x", args.speeds))
+            finally:
+                server.shutdown()
+                server.server_close()
+    finally:
+        driver.quit()
+
+    print_results(results)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"date": time.ctime(), "results": results}, f, ensure_ascii=False, indent=2)
+
+    flat = {}
+    for r in results:
+        for p in r["passes"]:
+            prefix = f"scroll.{r['dataset']}.{p['speed_px_s']}"
+            flat[f"{prefix}.p95_frame_ms"] = p["p95_frame_ms"]
+            flat[f"{prefix}.dropped_frames"] = p["dropped_frames"]
+            flat[f"{prefix}.scripting_ms"] = p["scripting_ms"]
+            flat[f"{prefix}.layout_ms"] = p["layout_ms"]
+    report_store.append_run(report_store.build_run("scroll", {k: v for k, v in flat.items() if v is not None}))
+    print(f"\nRelatório salvo em: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
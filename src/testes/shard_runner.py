@@ -0,0 +1,276 @@
+# testes/shard_runner.py
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import util
+
+import requests
+
+import artifacts
+import auth_session
+import driver_factory
+import interaction_trace
+import locators
+import report_store
+import scenarios
+import teste_ui_api
+from config import LOG_DIR, ROOT, SESSION_USER
+
+SHARD_DIR = os.path.join(LOG_DIR, "shards")
+MERGED_DIR = os.path.join(LOG_DIR, "merged")
+
+# Um Chrome por processo: mais processos que núcleos só disputa CPU
+PROCESSES = int(os.environ.get("SHARD_PROCESSES", min(4, os.cpu_count() or 1)))
+# Duração assumida para cenários sem histórico (vão primeiro na fila)
+UNKNOWN_DURATION_S = float("inf")
+
+
+def empty_report():
+    """Relatório no mesmo formato de `run_test_flow`, pronto para ser somado."""
+    return {
+        "attempts": [],
+        "attempts_wall_time": None,
+        "feed_only": False,
+        "site_title": None,
+        "social_button_count": 0,
+        "has_signup_link": False,
+        "pool_size": 0,
+        "startup": {"pool_build_s": None, "driver_startup_s": []},
+        "metrics": [],
+        "feed": teste_ui_api.new_feed_report(),
+        "locator_stats": {key: 0 for key in locators.stats},
+        "shards": [],
+        "summary": "",
+    }
+
+
+def merge_reports(reports):
+    """Soma relatórios parciais (por cenário ou por shard) num só."""
+    merged = empty_report()
+    for r in reports:
+        merged["attempts"] += r["attempts"]
+        for key, items in r["feed"].items():
+            merged["feed"][key] += items
+        merged["startup"]["driver_startup_s"] += r["startup"]["driver_startup_s"]
+        for key, value in r["locator_stats"].items():
+            merged["locator_stats"][key] = merged["locator_stats"].get(key, 0) + value
+        merged["shards"] += r.get("shards", [])
+        merged["pool_size"] += r.get("pool_size", 0)
+
+    # Ordem estável: tentativas pelo número, cenários pela ordem de registro
+    order = {name: i for i, name in enumerate(scenarios.SCENARIOS)}
+    merged["attempts"].sort(key=lambda a: a["attempt_number"])
+    merged["feed"]["scenarios"].sort(key=lambda sc: order.get(sc["name"], len(order)))
+    merged["feed"]["steps"].sort(key=lambda st: order.get(st["step"], len(order)))
+
+    results = merged["feed"]["scenarios"]
+    ok = sum(1 for sc in results if sc["ok"])
+    logins = sum(1 for a in merged["attempts"] if a["success"])
+    merged["summary"] = (f"Cenários: {len(results)}, OK: {ok}, Falhas: {len(results) - ok} | "
+                         f"Logins: {len(merged['attempts'])}, Sucesso: {logins}")
+    return merged
+
+
+def expected_durations(path=report_store.RUNS_PATH, last=20):
+    """Mediana de `step.<cenário>.duration_s` nas últimas execuções (ui e shard)."""
+    history = {}
+    runs = [r for r in report_store.load_runs(path) if r.get("kind") in ("ui", "shard")][-last:]
+    for run in runs:
+        for key, value in run["metrics"].items():
+            if key.startswith("step.") and key.endswith(".duration_s"):
+                history.setdefault(key[len("step."):-len(".duration_s")], []).append(value)
+    return {name: statistics.median(values) for name, values in history.items()}
+
+
+def _init_worker():
+    # Processos do pool não rodam atexit: o Chrome quente fecha por um finalizador do multiprocessing
+    util.Finalize(None, driver_factory.quit_shared, exitpriority=10)
+    # Tempos de partida herdados do pai no fork não são deste processo
+    driver_factory.startup_times.clear()
+
+
+def _run_in_worker(name, cookie):
+    """Executa um cenário isolado no navegador quente deste processo."""
+    sc = scenarios.SCENARIOS[name]
+    driver = driver_factory.shared_driver()
+    before = dict(locators.stats)
+    with requests.Session() as http:
+        ctx = teste_ui_api.FeedContext(driver, http)
+        driver.delete_all_cookies()
+        if sc["group"] == "feed":
+            # Cada cenário parte do feed recém-carregado: falhas anteriores não vazam
+            driver_factory.set_media_blocking(driver, False)
+            auth_session.inject_into_driver(driver, cookie)
+            auth_session.inject_into_requests(http, cookie)
+            driver.get(ROOT + "/")
+            ctx.waiter.network_idle()
+        else:
+            driver_factory.set_media_blocking(driver, True)
+        teste_ui_api.run_scenario(ctx, name)
+    # O processo do pool não roda atexit: grava os screenshots antes de devolver o relatório
+    artifacts.pipeline().flush()
+
+    report = empty_report()
+    report["attempts"] = ctx.attempts
+    report["feed"] = ctx.feed_report
+    report["feed"]["waits"] = ctx.waiter.timings
+    report["startup"]["driver_startup_s"] = list(driver_factory.startup_times)
+    driver_factory.startup_times.clear()
+    report["locator_stats"] = {key: locators.stats[key] - before[key] for key in before}
+    return report
+
+
+def _failed(name, error):
+    """Relatório parcial de um cenário que nem chegou a rodar."""
+    report = empty_report()
+    result = {"name": name, "ok": False, "error": error, "duration_s": 0.0}
+    report["feed"]["scenarios"].append(result)
+    report["feed"]["ui"].append(f"❌ {scenarios.SCENARIOS[name]['label']}: {error}")
+    return report
+
+
+def run_shard(selected, processes=PROCESSES):
+    """
+    Executa os cenários `selected` num pool de processos (um Chrome cada).
+    Os mais demorados no histórico entram primeiro na fila.
+    """
+    cookie = None
+    if any(scenarios.SCENARIOS[n]["group"] == "feed" for n in selected):
+        user = SESSION_USER
+        # Login único antes de subir o pool: os processos leem a sessão do cache
+        cookie = auth_session.get_session(user["login"], user["password"])
+
+    durations = expected_durations()
+    queue = sorted(selected, key=lambda n: durations.get(n, UNKNOWN_DURATION_S), reverse=True)
+
+    partials = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as executor:
+        futures = {}
+        for name in queue:
+            if scenarios.SCENARIOS[name]["group"] == "feed" and cookie is None:
+                partials.append(_failed(name, "sessão não obtida"))
+                continue
+            futures[executor.submit(_run_in_worker, name, cookie)] = name
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                partials.append(future.result())
+            except Exception as e:
+                partials.append(_failed(name, repr(e)))
+            sc = partials[-1]["feed"]["scenarios"][-1]
+            print(f"{'✅' if sc['ok'] else '❌'} {name} ({sc['duration_s']}s)")
+
+    report = merge_reports(partials)
+    report["pool_size"] = processes
+    return report, round(time.perf_counter() - start, 3)
+
+
+def collect_screenshots(report, dest, source_dir=None):
+    """
+    Copia os screenshots referenciados no relatório para `dest` e reescreve
+    os caminhos. Caminhos que não existem localmente são procurados em
+    `source_dir` (artefato baixado de outro nó).
+    """
+    os.makedirs(dest, exist_ok=True)
+
+    def relocate(path):
+        if not path:
+            return path
+        src = path
+        if not os.path.exists(src) and source_dir:
+            src = os.path.join(source_dir, os.path.basename(path))
+        if not os.path.exists(src):
+            return path
+        target = os.path.join(dest, os.path.basename(path))
+        if os.path.abspath(src) != os.path.abspath(target):
+            shutil.copy2(src, target)
+        return target
+
+    report["feed"]["screenshots"] = [relocate(p) for p in report["feed"]["screenshots"]]
+    for a in report["attempts"]:
+        a["screenshot"] = relocate(a["screenshot"])
+    return report
+
+
+def write_result(report, out_dir, record_history):
+    """Grava JSON + texto em `out_dir` e, se o resultado estiver completo, o histórico."""
+    os.makedirs(out_dir, exist_ok=True)
+    interaction_trace.keep_slowest(report["feed"]["traces"], os.path.join(out_dir, "traces"))
+    with open(os.path.join(out_dir, "report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    teste_ui_api.write_text_report(report, os.path.join(out_dir, "report.txt"))
+    if record_history:
+        report_store.append_run(report_store.build_run("shard", report_store.flatten_report(report), report["summary"]))
+    print(f"\n{report['summary']}\nRelatório salvo em: {out_dir}")
+    return 0 if all(sc["ok"] for sc in report["feed"]["scenarios"]) else 1
+
+
+def _int_at_least(minimum):
+    """Tipo do argparse: inteiro >= `minimum`."""
+    def parse(value):
+        try:
+            number = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"inteiro inválido: {value!r}")
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"precisa ser >= {minimum}: {value}")
+        return number
+    return parse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa os cenários de UI em shards (processos e nós de CI)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="executa a fatia de cenários deste nó")
+    # Defaults em texto: o argparse aplica o `type` também a SHARD_INDEX/SHARD_COUNT do ambiente
+    run_parser.add_argument("--shard-index", type=_int_at_least(0), default=os.environ.get("SHARD_INDEX", "0"))
+    run_parser.add_argument("--shard-count", type=_int_at_least(1), default=os.environ.get("SHARD_COUNT", "1"))
+    run_parser.add_argument("--processes", type=_int_at_least(1), default=PROCESSES)
+    run_parser.add_argument("--group", choices=["feed", "login"], default=None, help="só cenários de um grupo")
+    run_parser.add_argument("--only", nargs="+", default=None, help="nomes de cenários")
+    run_parser.add_argument("--list", action="store_true", help="lista os cenários da fatia e sai")
+
+    merge_parser = sub.add_parser("merge", help="junta os resultados de vários nós")
+    merge_parser.add_argument("shard_dirs", nargs="+", help="diretórios gerados por `run` (com report.json)")
+    merge_parser.add_argument("--output", default=MERGED_DIR)
+    args = parser.parse_args()
+
+    if args.command == "merge":
+        reports = []
+        for shard_dir in args.shard_dirs:
+            with open(os.path.join(shard_dir, "report.json"), encoding="utf-8") as f:
+                reports.append(collect_screenshots(json.load(f), os.path.join(args.output, "screenshots"),
+                                                   os.path.join(shard_dir, "screenshots")))
+        return write_result(merge_reports(reports), args.output, record_history=True)
+
+    if args.shard_index >= args.shard_count:
+        run_parser.error(f"--shard-index {args.shard_index} fora do intervalo 0..{args.shard_count - 1}")
+    selected = args.only or scenarios.names(args.group)
+    unknown = [n for n in selected if n not in scenarios.SCENARIOS]
+    if unknown:
+        parser.error(f"cenários desconhecidos: {', '.join(unknown)}")
+    selected = scenarios.shard(selected, args.shard_index, args.shard_count)
+    if args.list:
+        print("\n".join(selected))
+        return 0
+
+    print(f"🧩 Shard {args.shard_index + 1}/{args.shard_count}: {len(selected)} cenários em {args.processes} processos")
+    report, wall = run_shard(selected, args.processes)
+    report["shards"] = [{"index": args.shard_index, "count": args.shard_count, "processes": args.processes,
+                         "wall_s": wall, "scenarios": selected}]
+    out_dir = os.path.join(SHARD_DIR, f"{args.shard_index}-of-{args.shard_count}")
+    collect_screenshots(report, os.path.join(out_dir, "screenshots"))
+    # Com um único nó o resultado já está completo; com vários, o histórico fica para o `merge`
+    return write_result(report, out_dir, record_history=args.shard_count == 1)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
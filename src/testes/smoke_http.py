@@ -0,0 +1,161 @@
+# testes/smoke_http.py
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qs, urlsplit
+
+import aiohttp
+
+import auth_session
+import report_store
+from config import LOG_DIR, ROOT
+
+REPORT_PATH = os.path.join(LOG_DIR, "smoke_http.json")
+
+# Rotas de middleware.ts: públicas (publicRoutes) e protegidas (todas as outras)
+PUBLIC_PATHS = ["/login", "/cadastro"]
+PROTECTED_PATHS = ["/", "/feed"]
+# Fora do matcher do middleware: nunca redirecionam para o login
+EXCLUDED_PATHS = ["/favicon.ico", "/api/tags"]
+
+# Com o servidor aquecido, a suíte inteira cabe nisto
+WALL_BUDGET_MS = 1000
+TIMEOUT_S = 10
+
+
+def build_checks(now=None):
+    """
+    Regras de roteamento e autenticação do middleware.ts, uma checagem por
+    combinação rota × token. `expect`:
+    - `status`: status exato (redirects do Next são 307);
+    - `location` / `query`: caminho e parâmetros do redirect;
+    - `cookie_deleted`: a resposta apaga o `auth-token`;
+    - `not_redirect`: qualquer status, desde que não mande para o login.
+    """
+    user_id, email = auth_session.TOKEN_USER
+    now = now or time.time()
+    tokens = {
+        "none": None,
+        "valid": auth_session.forge_token(user_id, email, now),
+        "expired": auth_session.forge_token(user_id, email, now - auth_session.EXPIRED_AGE_S),
+        "malformed": "nao-e-um-token",
+    }
+    checks = []
+
+    def add(path, token, label, **expect):
+        checks.append({"name": f"{path} [{token}]", "label": label, "path": path, "token": tokens[token], "expect": expect})
+
+    for path in PROTECTED_PATHS:
+        add(path, "none", "protegida sem sessão vai para o login com ?redirect=",
+            status=307, location="/login", query={"redirect": path})
+        add(path, "valid", "protegida com token válido renderiza", status=200)
+        add(path, "expired", "token expirado: login e cookie apagado",
+            status=307, location="/login", query={}, cookie_deleted=True)
+        add(path, "malformed", "token malformado: login e cookie apagado",
+            status=307, location="/login", query={}, cookie_deleted=True)
+    for path in PUBLIC_PATHS:
+        add(path, "none", "pública sem sessão renderiza", status=200)
+        add(path, "valid", "autenticado sai da página pública para a home", status=307, location="/", query={})
+        add(path, "expired", "pública com token expirado renderiza", status=200)
+    for path in EXCLUDED_PATHS:
+        add(path, "none", "fora do middleware não redireciona", not_redirect=True)
+    return checks
+
+
+def _deleted_cookies(headers):
+    """Nomes dos cookies que o `Set-Cookie` apaga (valor vazio + expiração no passado)."""
+    deleted = set()
+    for header in headers.getall("Set-Cookie", []):
+        cookie = SimpleCookie()
+        try:
+            cookie.load(header)
+        except Exception:
+            continue
+        for name, morsel in cookie.items():
+            expired = morsel["max-age"] == "0" or "1970" in morsel["expires"]
+            if not morsel.value and expired:
+                deleted.add(name)
+    return deleted
+
+
+def evaluate(check, status, location, deleted):
+    """Lista de problemas da resposta (vazia = passou)."""
+    expect, problems = check["expect"], []
+    parts = urlsplit(location) if location else None
+    if "status" in expect and status != expect["status"]:
+        problems.append(f"status {status}, esperado {expect['status']}")
+    if "location" in expect and (parts is None or parts.path != expect["location"]):
+        problems.append(f"redirect para {location}, esperado {expect['location']}")
+    if parts is not None and "query" in expect:
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        if query != expect["query"]:
+            problems.append(f"parâmetros {query}, esperado {expect['query']}")
+    if expect.get("cookie_deleted") and auth_session.COOKIE_NAME not in deleted:
+        problems.append(f"{auth_session.COOKIE_NAME} não foi apagado")
+    if expect.get("not_redirect") and parts is not None and parts.path.startswith("/login"):
+        problems.append(f"redirecionado para {location}")
+    return problems
+
+
+async def _run_check(session, root, check):
+    headers = {"Cookie": f"{auth_session.COOKIE_NAME}={check['token']}"} if check["token"] else {}
+    result = {"name": check["name"], "label": check["label"], "status": None, "location": None, "problems": []}
+    start = time.perf_counter()
+    try:
+        async with session.get(root + check["path"], headers=headers, allow_redirects=False) as resp:
+            await resp.read()
+            result.update(status=resp.status, location=resp.headers.get("Location"))
+            result["problems"] = evaluate(check, resp.status, result["location"], _deleted_cookies(resp.headers))
+    except Exception as e:
+        result["problems"] = [f"erro {type(e).__name__}"]
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    result["ok"] = not result["problems"]
+    return result
+
+
+async def run_smoke(root=ROOT, checks=None, concurrency=None, timeout=TIMEOUT_S):
+    """Todas as checagens em paralelo num pool de conexões; devolve (resultados, ms)."""
+    checks = checks if checks is not None else build_checks()
+    connector = aiohttp.TCPConnector(limit=concurrency or len(checks))
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    # DummyCookieJar: o cookie de cada checagem vai só no header dela
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout, cookie_jar=aiohttp.DummyCookieJar()) as session:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(_run_check(session, root, c) for c in checks))
+        wall_ms = round((time.perf_counter() - start) * 1000, 1)
+    return results, wall_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Smoke HTTP (sem navegador) das regras de rota e sessão do middleware")
+    parser.add_argument("--root", default=ROOT)
+    parser.add_argument("--concurrency", type=int, default=None, help="conexões no pool (padrão: uma por checagem)")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_S)
+    parser.add_argument("--output", default=REPORT_PATH)
+    args = parser.parse_args()
+
+    results, wall_ms = asyncio.run(run_smoke(args.root.rstrip("/"), concurrency=args.concurrency, timeout=args.timeout))
+    for r in results:
+        detail = "" if r["ok"] else f" → {'; '.join(r['problems'])}"
+        print(f"{'✅' if r['ok'] else '❌'} {r['name']:<24} {r['status']} {r['latency_ms']:>7}ms  {r['label']}{detail}")
+
+    failed = [r for r in results if not r["ok"]]
+    print(f"\n{len(results) - len(failed)}/{len(results)} OK em {wall_ms}ms")
+    if wall_ms > WALL_BUDGET_MS:
+        print(f"⚠️ Acima de {WALL_BUDGET_MS}ms: servidor frio (next dev compila na primeira visita) ou lento")
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"date": time.ctime(), "root": args.root, "wall_ms": wall_ms, "results": results}, f, ensure_ascii=False, indent=2)
+    report_store.append_run(report_store.build_run("smoke", {"smoke.wall_ms": wall_ms, "smoke.failures": len(failed)},
+                                                   f"{len(results) - len(failed)}/{len(results)} OK"))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+# testes/soak.py
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from urllib.parse import urlsplit
+
+import requests
+from selenium.common.exceptions import WebDriverException
+
+import artifacts
+import auth_session
+import interaction_trace
+import page_metrics
+import report_store
+import scenarios
+import teste_ui_api
+from config import API_ROUTES, LOG_DIR, LONG, ROOT, SESSION_USER, TESTS, VALID_LOGIN
+from driver_factory import build_driver, set_media_blocking, shared_driver
+from metrics import percentile, theil_sen_slope
+from waits import Waiter
+
+SOAK_DIR = os.path.join(LOG_DIR, "soak")
+
+# Cenários de cada iteração: login real, curtir/salvar no card e checagem das APIs
+SCENARIOS = [f"login_{TESTS.index(VALID_LOGIN) + 1}", "card_interactions", "apis"]
+INTERVAL_S = 60
+
+# Janela (fração da execução) comparada entre o início e o fim
+WINDOW = 0.25
+# Crescimento entre as janelas que caracteriza deriva
+DRIFT_THRESHOLD = 0.10
+# Séries de memória: crescimento aqui é suspeita de vazamento, não só deriva
+MEMORY_SERIES = ("server_rss_bytes", "js_heap_after_gc_bytes", "dom_nodes", "js_event_listeners")
+# Limite de pontos no Theil-Sen (O(n²)): execuções longas são amostradas
+MAX_TREND_POINTS = 300
+
+
+# --- Processo do Next.js ---
+def _listening_inodes(port):
+    """Inodes dos sockets TCP em LISTEN na porta (de /proc/net/tcp e tcp6)."""
+    inodes = set()
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table, encoding="ascii") as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    local, state, inode = fields[1], fields[3], fields[9]
+                    if state == "0A" and int(local.rsplit(":", 1)[1], 16) == port:
+                        inodes.add(inode)
+        except OSError:
+            continue
+    return inodes
+
+
+def find_server_pid(root=ROOT):
+    """PID do processo que escuta na porta do app (psutil, se instalado; senão /proc)."""
+    port = urlsplit(root).port or 80
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil:
+        try:
+            for conn in psutil.net_connections(kind="tcp"):
+                if conn.status == psutil.CONN_LISTEN and conn.laddr.port == port and conn.pid:
+                    return conn.pid
+        except psutil.AccessDenied:
+            pass
+
+    targets = {f"socket:[{inode}]" for inode in _listening_inodes(port)}
+    if not targets:
+        return None
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            for fd in os.listdir(f"/proc/{pid}/fd"):
+                if os.readlink(f"/proc/{pid}/fd/{fd}") in targets:
+                    return int(pid)
+        except OSError:
+            continue
+    return None
+
+
+def process_rss(pid):
+    """RSS do processo em bytes, ou None se não for possível ler."""
+    if pid is None:
+        return None
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+# --- Amostras ---
+def browser_memory(driver):
+    """Heap JS após forçar GC e contadores de DOM (CDP Memory.getDOMCounters)."""
+    sample = {"js_heap_after_gc_bytes": None, "dom_nodes": None, "js_event_listeners": None}
+    try:
+        driver.execute_cdp_cmd("HeapProfiler.collectGarbage", {})
+        sample["js_heap_after_gc_bytes"] = page_metrics.js_heap(driver)[0]
+        counters = driver.execute_cdp_cmd("Memory.getDOMCounters", {})
+        sample["dom_nodes"] = counters.get("nodes")
+        sample["js_event_listeners"] = counters.get("jsEventListeners")
+    except WebDriverException:
+        pass
+    return sample
+
+
+def loop_lag_ms(http, root, baseline):
+    """
+    Proxy do atraso do event loop do Node: latência de uma rota trivial
+    (/favicon.ico) acima da menor já observada. `baseline` guarda o mínimo.
+    """
+    start = time.perf_counter()
+    try:
+        http.get(root + "/favicon.ico", timeout=10).content
+    except requests.RequestException:
+        return None
+    ms = (time.perf_counter() - start) * 1000
+    baseline["min_ms"] = min(baseline.get("min_ms", ms), ms)
+    return round(ms - baseline["min_ms"], 2)
+
+
+def route_latencies(http, root, routes):
+    """Latência (ms) de cada rota /api/*; None em caso de erro."""
+    result = {}
+    for name in routes:
+        start = time.perf_counter()
+        try:
+            res = http.get(root + API_ROUTES[name], timeout=30)
+            res.content
+            result[name] = round((time.perf_counter() - start) * 1000, 1) if res.ok else None
+        except requests.RequestException:
+            result[name] = None
+    return result
+
+
+# --- Análise ---
+def _series(samples):
+    """{série: [(horas desde o início, valor)]} a partir das amostras."""
+    t0 = samples[0]["t"]
+    series = {}
+    for s in samples:
+        hours = (s["t"] - t0) / 3600
+        for key in ("server_rss_bytes", "loop_lag_ms", "js_heap_after_gc_bytes", "dom_nodes", "js_event_listeners"):
+            if s.get(key) is not None:
+                series.setdefault(key, []).append((hours, s[key]))
+        for route, ms in s["routes"].items():
+            if ms is not None:
+                series.setdefault(f"route.{route}.ms", []).append((hours, ms))
+        for name, sc in s["scenarios"].items():
+            series.setdefault(f"scenario.{name}.s", []).append((hours, sc["duration_s"]))
+    return series
+
+
+def drift(samples, window=WINDOW, threshold=DRIFT_THRESHOLD):
+    """
+    Para cada série: mediana da primeira e da última janela, variação e
+    tendência (Theil-Sen, unidades por hora). Memória que cresce acima do
+    limite com tendência positiva é marcada como suspeita de vazamento.
+    """
+    result = {}
+    for key, points in _series(samples).items():
+        if len(points) < 4:
+            continue
+        n = max(1, int(len(points) * window))
+        first = statistics.median(v for _, v in points[:n])
+        last = statistics.median(v for _, v in points[-n:])
+        change = (last - first) / first if first else None
+        trend = points[::max(1, len(points) // MAX_TREND_POINTS)]
+        slope = theil_sen_slope([h for h, _ in trend], [v for _, v in trend])
+        drifting = change is not None and change > threshold and (slope or 0) > 0
+        result[key] = {
+            "first_median": round(first, 2),
+            "last_median": round(last, 2),
+            "change": round(change, 4) if change is not None else None,
+            "slope_per_hour": round(slope, 4) if slope is not None else None,
+            "p95": round(percentile([v for _, v in points], 95), 2),
+            "drift": drifting,
+            "suspected_leak": drifting and key in MEMORY_SERIES,
+        }
+    return result
+
+
+def print_drift(result):
+    print(f"\n{'série':<32}{'início':>14}{'fim':>14}{'variação':>10}{'por hora':>14}")
+    for key, d in result.items():
+        flag = "🧠" if d["suspected_leak"] else ("⚠️" if d["drift"] else "  ")
+        change = f"{d['change'] * 100:+.1f}%" if d["change"] is not None else "n/d"
+        print(f"{flag}{key:<30}{d['first_median']:>14}{d['last_median']:>14}{change:>10}{str(d['slope_per_hour']):>14}")
+
+
+# --- Execução ---
+def _trim_traces(traces, n=interaction_trace.KEEP_SLOWEST):
+    """
+    Mantém o detalhe só nas `n` interações mais lentas até aqui: horas de
+    iterações com o trace completo de cada clique não cabem na memória.
+    """
+    pending = [r for r in traces if "detail" in r]
+    ranked = sorted((r for r in pending if r["latency_ms"] is not None), key=lambda r: r["latency_ms"], reverse=True)
+    keep = {id(r) for r in ranked[:n]}
+    for r in pending:
+        if id(r) not in keep:
+            del r["detail"]
+
+
+def run_iteration(feed_driver, login_driver, http, names, routes, pid, lag_baseline, traces):
+    """Uma iteração: cenários, latência das rotas e amostras de memória (traces vão para `traces`)."""
+    sample = {"t": time.time(), "scenarios": {}}
+    for name in names:
+        sc = scenarios.SCENARIOS[name]
+        driver = login_driver if sc["group"] == "login" else feed_driver
+        # O feed não é recarregado entre iterações: o heap acumula entre os cliques
+        ctx = teste_ui_api.FeedContext(driver, http)
+        result = teste_ui_api.run_scenario(ctx, name)
+        traces += ctx.feed_report["traces"]
+        sample["scenarios"][name] = {"ok": result["ok"], "duration_s": result["duration_s"]}
+        if ctx.attempts and not ctx.attempts[0]["success"]:
+            sample["scenarios"][name]["ok"] = False
+    # Um clique pode ter navegado para fora do feed: volta, e marca a amostra
+    sample["feed_reloaded"] = urlsplit(feed_driver.current_url).path != "/"
+    if sample["feed_reloaded"]:
+        feed_driver.get(ROOT + "/")
+        Waiter(feed_driver, timeout=LONG).network_idle()
+    sample["routes"] = route_latencies(http, ROOT, routes)
+    sample["loop_lag_ms"] = loop_lag_ms(http, ROOT, lag_baseline)
+    sample["server_rss_bytes"] = process_rss(pid)
+    sample.update(browser_memory(feed_driver))
+    return sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak: cenários em loop por horas, com deriva de memória e latência")
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--interval", type=float, default=INTERVAL_S, help="segundos entre o início das iterações")
+    parser.add_argument("--scenarios", nargs="+", default=SCENARIOS)
+    parser.add_argument("--routes", nargs="+", default=list(API_ROUTES), choices=list(API_ROUTES))
+    parser.add_argument("--server-pid", type=int, default=None, help="PID do Next.js (padrão: quem escuta na porta de ROOT)")
+    parser.add_argument("--keep-screenshots", action="store_true", help="grava screenshots de cenários que passaram")
+    args = parser.parse_args()
+
+    unknown = [n for n in args.scenarios if n not in scenarios.SCENARIOS]
+    if unknown:
+        parser.error(f"cenários desconhecidos: {', '.join(unknown)}")
+    if not args.keep_screenshots:
+        # Horas de iterações: só as capturas de falhas vão para o disco
+        artifacts.pipeline().policy = "failure"
+
+    pid = args.server_pid or find_server_pid()
+    if pid is None:
+        print("⚠️ Processo do Next.js não encontrado: RSS do servidor não será amostrado (use --server-pid)")
+
+    user = SESSION_USER
+    cookie = auth_session.get_session(user["login"], user["password"])
+    if cookie is None:
+        print("❌ Sessão não obtida")
+        return 1
+
+    run_id = time.strftime("%Y%m%d-%H%M%S")
+    os.makedirs(SOAK_DIR, exist_ok=True)
+    samples_path = os.path.join(SOAK_DIR, f"{run_id}.jsonl")
+
+    feed_driver = shared_driver()
+    login_driver = build_driver(block_media=True)
+    samples, overruns, lag_baseline, traces = [], 0, {}, []
+    try:
+        with requests.Session() as http:
+            set_media_blocking(feed_driver, False)
+            auth_session.inject_into_driver(feed_driver, cookie)
+            auth_session.inject_into_requests(http, cookie)
+            feed_driver.get(ROOT + "/")
+            Waiter(feed_driver, timeout=LONG).network_idle()
+
+            start = time.time()
+            end = start + args.hours * 3600
+            k = 0
+            print(f"🔁 Soak de {args.hours}h, uma iteração a cada {args.interval}s (amostras em {samples_path})")
+            while time.time() < end:
+                sample = run_iteration(feed_driver, login_driver, http, args.scenarios, args.routes, pid, lag_baseline, traces)
+                _trim_traces(traces)
+                sample["iteration"] = k
+                samples.append(sample)
+                with open(samples_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(sample, ensure_ascii=False) + "\n")
+                heap = sample["js_heap_after_gc_bytes"]
+                print(f"#{k} heap={heap} rss={sample['server_rss_bytes']} lag={sample['loop_lag_ms']}ms "
+                      f"falhas={sum(1 for sc in sample['scenarios'].values() if not sc['ok'])}")
+
+                # Ritmo fixo: a próxima iteração começa em start + k * interval
+                k += 1
+                wait = start + k * args.interval - time.time()
+                if wait < 0:
+                    overruns += 1
+                else:
+                    time.sleep(min(wait, max(0.0, end - time.time())))
+    except KeyboardInterrupt:
+        print("\n⏹️ Interrompido: analisando as amostras coletadas")
+    finally:
+        login_driver.quit()
+
+    if not samples:
+        return 1
+    result = drift(samples)
+    print_drift(result)
+    leaks = [key for key, d in result.items() if d["suspected_leak"]]
+    # Trace completo das interações mais lentas da execução inteira
+    trace_paths = interaction_trace.keep_slowest(traces, os.path.join(SOAK_DIR, run_id, "traces"))
+    summary = {
+        "run_id": run_id,
+        "date": time.ctime(),
+        "hours": round((samples[-1]["t"] - samples[0]["t"]) / 3600, 3),
+        "iterations": len(samples),
+        "overruns": overruns,
+        "server_pid": pid,
+        "failures": sum(1 for s in samples for sc in s["scenarios"].values() if not sc["ok"]),
+        "suspected_leaks": leaks,
+        "drift": result,
+        "inp": interaction_trace.summarize(traces),
+        "traces": trace_paths,
+        "samples": samples_path,
+    }
+    with open(os.path.join(SOAK_DIR, f"{run_id}.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    # No histórico só o valor do fim da execução (positivo, menor é melhor,
+    # como o compare espera); a inclinação pode ser negativa ou ~0 e fica no resumo
+    report_store.append_run(report_store.build_run(
+        "soak",
+        {f"soak.{key}.end": d["last_median"] for key, d in result.items()},
+        f"{len(samples)} iterações, {len(leaks)} suspeita(s) de vazamento",
+    ))
+
+    for key in leaks:
+        print(f"🧠 Suspeita de vazamento: {key} ({result[key]['change'] * 100:+.1f}%, {result[key]['slope_per_hour']}/h)")
+    print(f"\nResumo salvo em: {os.path.join(SOAK_DIR, run_id + '.json')}")
+    return 1 if leaks else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
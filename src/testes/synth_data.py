@@ -0,0 +1,322 @@
+# testes/synth_data.py
+
+import argparse
+import json
+import os
+import random
+import time
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from math import gcd
+
+from config import VALID_LOGIN
+from mock_supabase import MOCK_DIR, TABLE_FILES, load_csv
+
+# --- Configurações Iniciais ---
+# Linhas por tabela na escala 1× (as escalas 10× e 100× multiplicam estes valores)
+BASE_ROWS = {
+    "user_data": 2000,
+    "artist_data": 500,
+    "proposer_data": 200,
+    "tags_data": 100,
+    "editals_data": 2000,
+    "comments_data": 10000,
+}
+
+# Faixas de id por tabela: usuários a partir de 1 (os primeiros são os de
+# mock/user_data.csv), as demais tabelas em faixas de um milhão
+ID_BASE = {
+    "user_data": 1,
+    "tags_data": 1,
+    "proposer_data": 1_000_000,
+    "artist_data": 2_000_000,
+    "editals_data": 3_000_000,
+    "comments_data": 4_000_000,
+}
+
+# Cabeçalhos idênticos aos de mock/*.csv
+HEADERS = {
+    "user_data": ["id", "password", "name", "email", "imgUrl", "createdAt", "updatedAt", "userType", "listComment"],
+    "artist_data": ["id", "password", "name", "email", "imgUrl", "createdAt", "updatedAt", "userType", "listComment", "cpf", "listTags"],
+    "proposer_data": ["id", "password", "name", "email", "imgUrl", "createdAt", "updatedAt", "userType", "listComment", "cnpj", "listEdital"],
+    "tags_data": ["id", "name", "description", "color", "createdAt", "updatedAt"],
+    "editals_data": ["id", "title", "description", "publishDate", "endDate", "status", "inscriptionLink", "completeEditalLink", "imgCoverUrl", "createdAt", "updatedAt", "proposer", "listTags", "listComment"],
+    "comments_data": ["id", "authorName", "content", "approved", "status", "createdAt", "updatedAt", "user", "edital"],
+}
+
+# Linhas acumuladas antes de cada escrita em disco
+BATCH = 5000
+
+# Usuários de mock/ copiados para toda escala: o login dos testes
+# (config.VALID_LOGIN) precisa existir em qualquer massa de dados
+SEED_USERS_PATH = os.path.join(MOCK_DIR, TABLE_FILES["user_data"])
+# Passo que espalha os comentários pelos autores (ver Dataset.author)
+AUTHOR_STEP = 7919
+
+FIRST_NAMES = ["João", "Maria", "Pedro", "Ana", "Carlos", "Mariana", "Ricardo", "Beatriz", "Lucas", "Fernanda", "Rafael", "Juliana"]
+LAST_NAMES = ["Silva", "Oliveira", "Souza", "Costa", "Pereira", "Lima", "Almeida", "Ferreira", "Rodrigues", "Gomes"]
+TAG_NAMES = ["Pintura", "Música", "Escultura", "Fotografia", "Performance", "Dança", "Teatro", "Cinema", "Literatura", "Arte Moderna"]
+EDITAL_KINDS = ["Concurso", "Festival", "Ocupação", "Prêmio", "Residência", "Chamada Pública", "Mostra"]
+WORDS = ["edital", "projeto", "cultura", "artistas", "inscrição", "prazo", "proposta", "apoio", "comunidade", "criação", "circulação", "formação"]
+EDITAL_STATUS = ["OPEN", "PUBLISHED", "DRAFT", "CLOSED"]
+COMMENT_STATUS = ["APPROVED", "PENDING", "REJECTED", "HIDDEN", "FLAGGED"]
+EPOCH = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+def _iso(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _ascii(text):
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+
+def load_seed_users(path=SEED_USERS_PATH):
+    """Usuários de mock/ a manter; garante a conta de login dos testes."""
+    try:
+        _, rows = load_csv(path)
+    except OSError:
+        rows = []
+    account = VALID_LOGIN
+    if not any(r["email"] == account["login"] for r in rows):
+        rows.insert(0, {"id": ID_BASE["user_data"], "password": account["password"], "name": "Usuário de Teste",
+                        "email": account["login"], "imgUrl": None, "createdAt": _iso(EPOCH),
+                        "updatedAt": _iso(EPOCH), "userType": "Admin", "listComment": []})
+    return rows
+
+
+def _field(value):
+    """Formata um campo no mesmo dialeto dos CSVs de mock/."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, dict)):
+        # Colunas JSON: entre aspas, sem escapar as aspas internas (como em mock/)
+        return '"' + json.dumps(value, ensure_ascii=False) + '"'
+    value = str(value)
+    if "," in value or '"' in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+class Dataset:
+    """
+    Gera linhas determinísticas a partir de (seed, tabela, índice).
+
+    Cada linha é derivada do seu próprio índice, então as referências entre
+    tabelas (proposer, listTags, listComment, user, edital) podem ser
+    calculadas sem manter nenhuma tabela inteira em memória.
+    """
+
+    def __init__(self, scale=1, seed=42, seed_users=None):
+        self.seed = seed
+        self.counts = {t: max(1, int(n * scale)) for t, n in BASE_ROWS.items()}
+        self.seed_users = load_seed_users() if seed_users is None else seed_users
+        self.counts["user_data"] = max(self.counts["user_data"], len(self.seed_users))
+        first_generated = ID_BASE["user_data"] + len(self.seed_users)
+        if any(u["id"] >= first_generated for u in self.seed_users):
+            raise ValueError(f"ids dos usuários de {SEED_USERS_PATH} precisam ser menores que {first_generated}")
+        # Passo coprimo com o total de autores: author() é uma bijeção e
+        # comments_by() a inverte sem percorrer os comentários
+        self.n_authors = self.counts["user_data"] + self.counts["artist_data"]
+        self._step = next(s for s in range(AUTHOR_STEP, AUTHOR_STEP + self.n_authors + 2) if gcd(s, self.n_authors) == 1)
+        self._step_inv = pow(self._step, -1, self.n_authors)
+
+    def _rng(self, table, k):
+        return random.Random(f"{self.seed}:{table}:{k}")
+
+    def _person(self, rng):
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+    def _dates(self, rng, max_days=600):
+        created = EPOCH + timedelta(days=rng.randrange(max_days), seconds=rng.randrange(86400))
+        return created, created + timedelta(days=rng.randrange(30))
+
+    def tag_name(self, k):
+        return f"{TAG_NAMES[k % len(TAG_NAMES)]}" + (f" {k // len(TAG_NAMES)}" if k >= len(TAG_NAMES) else "")
+
+    def tag_ref(self, k):
+        return {"id": ID_BASE["tags_data"] + k, "name": self.tag_name(k)}
+
+    def user_id(self, k):
+        if k < len(self.seed_users):
+            return self.seed_users[k]["id"]
+        return ID_BASE["user_data"] + k
+
+    def author(self, k):
+        """Autor do comentário `k`: índice global sobre usuários + artistas."""
+        n_users = self.counts["user_data"]
+        idx = (k * self._step) % self.n_authors
+        if idx < n_users:
+            if idx < len(self.seed_users):
+                return self.user_id(idx), self.seed_users[idx]["name"]
+            return self.user_id(idx), self._person(self._rng("user_data", idx))
+        idx -= n_users
+        return ID_BASE["artist_data"] + idx, self._person(self._rng("artist_data", idx))
+
+    def comments_by(self, idx):
+        """Comentários do autor de índice global `idx` (inverso de author)."""
+        first = (idx * self._step_inv) % self.n_authors
+        refs = []
+        for k in range(first, self.counts["comments_data"], self.n_authors):
+            c = self.comment_row(k)
+            refs.append({"id": c["id"], "authorName": c["authorName"], "content": c["content"]})
+        return refs
+
+    # --- Linhas por tabela ---
+    def _user_like(self, table, k, user_type):
+        rng = self._rng(table, k)
+        name = self._person(rng)
+        created, updated = self._dates(rng)
+        row = {
+            "id": ID_BASE[table] + k,
+            "password": f"senha_{table.split('_')[0]}_{k}",
+            "name": name,
+            "email": f"{_ascii(name.split()[0].lower())}.{k}@{table.split('_')[0]}.example.com",
+            "imgUrl": f"https://exemplo.com/img/{table}/{k}.jpg" if rng.random() < 0.8 else None,
+            "createdAt": _iso(created),
+            "updatedAt": _iso(updated),
+            "userType": user_type,
+            "listComment": [],
+        }
+        return rng, row
+
+    def user_row(self, k):
+        if k < len(self.seed_users):
+            row = dict(self.seed_users[k])
+        else:
+            _, row = self._user_like("user_data", k, None)
+            row["userType"] = "Editor" if k % 7 == 0 else "User"
+        row["listComment"] = self.comments_by(k)
+        return row
+
+    def artist_row(self, k):
+        rng, row = self._user_like("artist_data", k, "ARTIST")
+        row["listComment"] = self.comments_by(self.counts["user_data"] + k)
+        row["cpf"] = "".join(str(rng.randrange(10)) for _ in range(11))
+        n_tags = self.counts["tags_data"]
+        row["listTags"] = [self.tag_ref(t) for t in sorted(rng.sample(range(n_tags), min(n_tags, rng.randint(1, 3))))]
+        return row
+
+    def proposer_row(self, k):
+        rng, row = self._user_like("proposer_data", k, "PROPOSER")
+        row["cnpj"] = "".join(str(rng.randrange(10)) for _ in range(14))
+        # Editais do proponente k: e ≡ k (mod n_proposers), ver edital_row
+        row["listEdital"] = [{"id": ID_BASE["editals_data"] + e} for e in range(k, self.counts["editals_data"], self.counts["proposer_data"])]
+        return row
+
+    def tag_row(self, k):
+        rng = self._rng("tags_data", k)
+        created, updated = self._dates(rng)
+        return {
+            "id": ID_BASE["tags_data"] + k,
+            "name": self.tag_name(k),
+            "description": " ".join(rng.choice(WORDS) for _ in range(4)).capitalize(),
+            "color": f"#{rng.randrange(0x1000000):06X}",
+            "createdAt": _iso(created),
+            "updatedAt": _iso(updated),
+        }
+
+    def comment_row(self, k):
+        rng = self._rng("comments_data", k)
+        created, updated = self._dates(rng)
+        user_id, author = self.author(k)
+        status = rng.choice(COMMENT_STATUS)
+        return {
+            "id": ID_BASE["comments_data"] + k,
+            "authorName": author,
+            "content": " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 25))).capitalize() + ".",
+            "approved": status == "APPROVED",
+            "status": status,
+            "createdAt": _iso(created),
+            "updatedAt": _iso(updated),
+            "user": user_id,
+            # Comentário k pertence ao edital k mod n_editals
+            "edital": ID_BASE["editals_data"] + k % self.counts["editals_data"],
+        }
+
+    def edital_row(self, e):
+        rng = self._rng("editals_data", e)
+        created, updated = self._dates(rng)
+        publish = created + timedelta(days=rng.randrange(15))
+        n_tags = self.counts["tags_data"]
+        comments = []
+        for k in range(e, self.counts["comments_data"], self.counts["editals_data"]):
+            c = self.comment_row(k)
+            comments.append({"id": c["id"], "authorName": c["authorName"], "content": c["content"]})
+        return {
+            "id": ID_BASE["editals_data"] + e,
+            "title": f"{rng.choice(EDITAL_KINDS)} de {self.tag_name(e % n_tags)} {e}",
+            "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40))).capitalize() + ".",
+            "publishDate": _iso(publish) if rng.random() < 0.9 else None,
+            "endDate": _iso(publish + timedelta(days=rng.randint(15, 120))) if rng.random() < 0.9 else None,
+            "status": rng.choice(EDITAL_STATUS),
+            "inscriptionLink": f"https://link.com/inscricao-{e}" if rng.random() < 0.7 else None,
+            "completeEditalLink": f"https://link.com/edital-{e}.pdf" if rng.random() < 0.8 else None,
+            "imgCoverUrl": f"https://exemplo.com/capa_{e}.jpg",
+            "createdAt": _iso(created),
+            "updatedAt": _iso(updated),
+            "proposer": ID_BASE["proposer_data"] + e % self.counts["proposer_data"],
+            "listTags": [self.tag_ref(t) for t in sorted(rng.sample(range(n_tags), min(n_tags, rng.randint(1, 4))))],
+            "listComment": comments,
+        }
+
+    def rows(self, table):
+        make = {
+            "user_data": self.user_row,
+            "artist_data": self.artist_row,
+            "proposer_data": self.proposer_row,
+            "tags_data": self.tag_row,
+            "editals_data": self.edital_row,
+            "comments_data": self.comment_row,
+        }[table]
+        for k in range(self.counts[table]):
+            yield make(k)
+
+
+def write_table(dataset, table, path):
+    """Escreve a tabela em streaming, em lotes de BATCH linhas."""
+    header = HEADERS[table]
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(header) + "\n")
+        batch = []
+        for row in dataset.rows(table):
+            batch.append(",".join(_field(row[col]) for col in header) + "\n")
+            if len(batch) >= BATCH:
+                f.writelines(batch)
+                count += len(batch)
+                batch = []
+        f.writelines(batch)
+        count += len(batch)
+    return count
+
+
+def generate(out_dir, scale=1, seed=42):
+    """Gera todas as tabelas de TABLE_FILES em `out_dir` e retorna as contagens."""
+    os.makedirs(out_dir, exist_ok=True)
+    dataset = Dataset(scale, seed)
+    written = {}
+    for table, filename in TABLE_FILES.items():
+        written[table] = write_table(dataset, table, os.path.join(out_dir, filename))
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos com o mesmo esquema de mock/*.csv")
+    parser.add_argument("--scale", type=float, default=1, help="multiplicador de BASE_ROWS (ex.: 1, 10, 100)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="padrão: logs/data/<escala>x")
+    args = parser.parse_args()
+
+    out_dir = args.out or os.path.join("logs", "data", f"{args.scale:g}x")
+    start = time.time()
+    written = generate(out_dir, args.scale, args.seed)
+    for table, count in written.items():
+        print(f"{table}: {count} linhas")
+    print(f"\nDados gerados em {out_dir} ({time.time() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
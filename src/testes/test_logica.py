@@ -0,0 +1,239 @@
+# testes/test_logica.py
+
+import http.client
+import json
+import os
+import random
+import tempfile
+
+import pytest
+
+import auth_session
+import dashboard
+import mock_supabase
+import report_store
+import synth_data
+
+
+def test_mock_csv_colunas():
+    """Cada linha dos CSVs de mock/ tem exatamente as colunas do cabeçalho, nos lugares certos."""
+    tables = mock_supabase.load_tables()
+    for name, table in tables.items():
+        for row in table.rows:
+            assert list(row) == table.columns, f"{name} {row.get('id')}: colunas fora do cabeçalho"
+
+    # Edital 303: vírgula sobrando entre os links, publishDate legitimamente vazio
+    edital = next(r for r in tables["editals_data"].rows if r["id"] == 303)
+    assert edital["publishDate"] is None
+    assert edital["endDate"] == "2024-12-31T23:59:59Z"
+    assert edital["status"] == "DRAFT"
+    assert edital["imgCoverUrl"] == "https://exemplo.com/capa_espaco.jpg"
+    assert edital["proposer"] == 103
+    assert isinstance(edital["listTags"], list)
+
+    artist = next(r for r in tables["artist_data"].rows if r["id"] == 201)
+    assert artist["cpf"] == "11122233344"
+    assert [t["name"] for t in artist["listTags"]] == ["Pintura", "Arte Moderna"]
+
+
+def test_mock_csv_linha_invalida():
+    """Campos a mais que não são vazios sobrando param a carga com erro."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "t.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("id,name\n1,a,b\n")
+        try:
+            mock_supabase.load_csv(path)
+        except ValueError as e:
+            assert "t.csv:2" in str(e)
+        else:
+            raise AssertionError("linha com 3 campos foi aceita")
+
+
+def test_mock_paginacao_invalida():
+    """limit/offset/Range inválidos e colunas desconhecidas no select viram 400 no formato do PostgREST."""
+    server = mock_supabase.start_server(port=0)
+    port = server.server_address[1]
+
+    def get(path, headers=None):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        conn.request("GET", path, headers=headers or {})
+        res = conn.getresponse()
+        return res.status, json.loads(res.read())
+
+    try:
+        for path, headers in [("/rest/v1/editals_data?limit=abc", None),
+                              ("/rest/v1/editals_data?offset=-1", None),
+                              ("/rest/v1/editals_data", {"Range": "x-2"}),
+                              ("/rest/v1/editals_data", {"Range": "3-1"})]:
+            status, body = get(path, headers)
+            assert status == 400 and body["code"] == "PGRST100", (path, headers, status, body)
+        status, body = get("/rest/v1/editals_data?select=id,nope")
+        assert status == 400 and body["code"] == "42703" and "nope" in body["message"]
+        status, body = get("/rest/v1/editals_data?select=id", {"Range": "1-2"})
+        assert status == 200 and [r["id"] for r in body] == [302, 303]
+    finally:
+        server.shutdown()
+
+
+def test_synth_ida_e_volta():
+    """Dados sintéticos relidos pelo mock: contagens, conta de login e chaves estrangeiras."""
+    with tempfile.TemporaryDirectory() as tmp:
+        written = synth_data.generate(tmp, scale=0.05)
+        tables = mock_supabase.load_tables(tmp)
+
+    for name, count in written.items():
+        assert len(tables[name].rows) == count, name
+
+    account = synth_data.VALID_LOGIN
+    users = {r["email"]: r for r in tables["user_data"].rows}
+    assert users[account["login"]]["password"] == account["password"]
+
+    ids = {name: {r["id"] for r in table.rows} for name, table in tables.items()}
+    for name in ids:
+        assert len(ids[name]) == len(tables[name].rows), f"ids repetidos em {name}"
+    comments = {r["id"]: r for r in tables["comments_data"].rows}
+    for c in comments.values():
+        assert c["user"] in ids["user_data"] | ids["artist_data"]
+        assert c["edital"] in ids["editals_data"]
+    for e in tables["editals_data"].rows:
+        assert e["proposer"] in ids["proposer_data"]
+        assert all(c["id"] in comments for c in e["listComment"])
+        assert all(t["id"] in ids["tags_data"] for t in e["listTags"])
+
+    listed = 0
+    for name in ("user_data", "artist_data"):
+        for r in tables[name].rows:
+            assert all(comments[c["id"]]["user"] == r["id"] for c in r["listComment"])
+            listed += len(r["listComment"])
+    assert listed == len(comments)
+
+
+def _runs(values, key="api.x.tempo_s"):
+    return [{"metrics": {key: v}} for v in values]
+
+
+def test_compare_regressao():
+    """Aumento grande contra um baseline estável é regressão; ruído não."""
+    rng = random.Random(7)
+    baseline = [100 + rng.gauss(0, 2) for _ in range(20)]
+
+    result = report_store.compare(_runs(baseline + [150]))
+    assert [r["regression"] for r in result] == [True]
+    assert result[0]["change"] > 0.4
+
+    result = report_store.compare(_runs(baseline + [101]))
+    assert [r["regression"] for r in result] == [False]
+
+    # Três execuções atuais: teste de Mann-Whitney
+    result = report_store.compare(_runs(baseline + [140, 150, 145]), current_runs=3)
+    assert result[0]["regression"] and result[0]["p_value"] < report_store.ALPHA
+
+    # Menos de 5 execuções no baseline: nada a comparar
+    assert report_store.compare(_runs([1, 2, 3, 9])) == []
+
+    try:
+        report_store.compare(_runs(baseline), current_runs=0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("current_runs=0 foi aceito")
+
+
+def test_mann_whitney():
+    assert report_store.mann_whitney_greater([10, 11, 12, 13], [1, 2, 3, 4, 5]) < 0.05
+    assert report_store.mann_whitney_greater([1, 2, 3], [1, 2, 3, 4, 5]) > 0.5
+    assert report_store.mann_whitney_greater([5, 5], [5, 5, 5]) == 1.0
+
+
+def test_token_issued_at():
+    token = auth_session.forge_token(1, "joao.silva@email.com", 1_700_000_000)
+    assert auth_session.token_issued_at(token) == 1_700_000_000
+    assert auth_session.token_issued_at("nao-e-um-token") is None
+    assert auth_session.is_valid({"value": token}, now=1_700_000_000 + 60)
+    assert not auth_session.is_valid({"value": token}, now=1_700_000_000 + auth_session.EXPIRED_AGE_S)
+
+
+def test_row_stream():
+    """Linhas do JSON saem assim que chegam inteiras, em qualquer corte dos pedaços."""
+    pytest.importorskip("requests")
+    from payload_profile import RowStream
+
+    body = json.dumps({"editals": [{"id": 1, "t": "á"}, {"id": 2}], "total": 2, "tags": [3, 45]}, ensure_ascii=False)
+    for size in (1, 3, 7, len(body)):
+        stream, rows = RowStream(), []
+        for i in range(0, len(body), size):
+            rows += stream.feed(body[i:i + size])
+        rows += stream.close()
+        assert [(section, value) for section, value, _ in rows] == [
+            ("editals", {"id": 1, "t": "á"}), ("editals", {"id": 2}), ("tags", 3), ("tags", 45)], size
+    assert rows[0][2] == len('{"id": 1, "t": "á"}'.encode("utf-8"))
+
+    stream = RowStream()
+    stream.feed('[{"id": 1}, {"id"')
+    try:
+        stream.close()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("JSON truncado foi aceito")
+
+
+def test_smoke_evaluate():
+    """Regras do middleware: redirect certo passa, status/destino/cookie errados apontam o problema."""
+    pytest.importorskip("aiohttp")
+    import smoke_http
+
+    checks = {c["name"]: c for c in smoke_http.build_checks(now=1_700_000_000)}
+    assert auth_session.token_issued_at(checks["/feed [expired]"]["token"]) == 1_700_000_000 - auth_session.EXPIRED_AGE_S
+
+    none = checks["/feed [none]"]
+    assert smoke_http.evaluate(none, 307, "/login?redirect=%2Ffeed", set()) == []
+    assert smoke_http.evaluate(none, 200, None, set()) == ["status 200, esperado 307", "redirect para None, esperado /login"]
+    assert len(smoke_http.evaluate(none, 307, "/login", set())) == 1
+
+    expired = checks["/ [expired]"]
+    assert smoke_http.evaluate(expired, 307, "http://localhost:3000/login", {auth_session.COOKIE_NAME}) == []
+    assert smoke_http.evaluate(expired, 307, "/login", set()) == [f"{auth_session.COOKIE_NAME} não foi apagado"]
+
+    excluded = checks["/api/tags [none]"]
+    assert smoke_http.evaluate(excluded, 404, None, set()) == []
+    assert smoke_http.evaluate(excluded, 307, "/login", set()) == ["redirecionado para /login"]
+
+
+def test_dashboard_indice_incremental():
+    """O índice lê só as linhas novas e é refeito se o histórico for reescrito."""
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "runs.jsonl")
+        for _ in range(30):
+            report_store.append_run(report_store.build_run("ui", {"a": 100 + rng.random()}), path)
+
+        index = dashboard.new_index(path)
+        assert dashboard.update_index(index, path) == 30
+        assert dashboard.update_index(index, path) == 0
+
+        report_store.append_run(report_store.build_run("ui", {"a": 300}), path)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"kind": "ui", "metrics"')  # linha ainda sendo escrita
+        assert dashboard.update_index(index, path) == 1
+        runs = index["kinds"]["ui"]["runs"]
+        assert len(runs) == 31 and "a" in runs[-1]["regressions"]
+        assert len(index["kinds"]["ui"]["series"]["a"]) == 31
+
+        # Histórico reescrito (rotação): o índice recomeça do zero
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(report_store.build_run("ui", {"a": 1})) + "\n")
+        assert dashboard.update_index(index, path) == 1
+        assert len(index["kinds"]["ui"]["runs"]) == 1
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            try:
+                test()
+            except pytest.skip.Exception as e:
+                print(f"⏭️ {name}: {e}")
+                continue
+            print(f"✅ {name}")
@@ -1,39 +1,29 @@
 # testes/test_open_homepage.py
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+import page_metrics
+from config import ROOT
+from driver_factory import shared_driver
+from waits import Waiter
 
 def test_open_homepage():
-    """Abre localhost:3000 e verifica se a página carrega."""
+    """Abre a aplicação (ROOT, padrão localhost:3000) e verifica se a página carrega."""
     
-    # Inicializa o Chrome
-    service = Service(ChromeDriverManager().install())
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized") 
-    options.add_argument("--disable-infobars")
-    options.add_argument("--disable-extensions")
+    # Navegador quente compartilhado (chromedriver em cache)
+    driver = shared_driver()
+    print(f"Startup do navegador: {driver.startup_s}s")
 
-    driver = webdriver.Chrome(service=service, options=options)
+    # Acessa a aplicação local
+    driver.get(ROOT)
 
-    try:
-        # Acessa a aplicação local
-        driver.get("http://localhost:3000")
+    # Aguarda a página terminar de carregar
+    Waiter(driver).document_ready()
 
-        # Aguarda alguns segundos para renderizar
-        time.sleep(3)
+    # Verifica se o título da página existe
+    print("Título da página:", driver.title)
+    print("Métricas", page_metrics.format_metrics(page_metrics.collect(driver, "homepage")))
+    assert driver.current_url.startswith(ROOT), f"A URL não começa com {ROOT}"
 
-        # Verifica se o título da página existe
-        print("Título da página:", driver.title)
-        assert "localhost" in driver.current_url, "A URL não contém localhost"
-
-        print("✅ Página carregada com sucesso!")
-
-    finally:
-        # Fecha o navegador
-        driver.quit()
+    print("✅ Página carregada com sucesso!")
 
 if __name__ == "__main__":
     test_open_homepage()
@@ -1,29 +1,34 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import MoveTargetOutOfBoundsException
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import MoveTargetOutOfBoundsException, NoSuchElementException
+import argparse
 import time
 import traceback
 import os
+import json
 import requests
 
+import artifacts
+import auth_session
+import interaction_trace
+import locators
+import page_metrics
+import report_store
+import scenarios
+from config import LONG, MED, ROOT, SESSION_USER, SHORT, TESTS
+from driver_factory import build_driver, set_media_blocking, shared_driver, startup_times
+from driver_pool import DriverPool
+from locators import CARD_PARTS, CARD_SELECTOR
+from scenarios import scenario
+from waits import Waiter
+
 # --- Configurações Iniciais ---
-ROOT = "http://localhost:3000"
 REPORT_PATH = os.path.join("logs", "login_test_report.txt")
-SCREENSHOT_DIR = os.path.join("logs", "screenshots")
-
-TESTS = [
-    {"login": "notanemail", "password": "password1", "label": "não-email + senha qualquer"},
-    {"login": "anyone@example.com", "password": "wrongpass", "label": "email qualquer + senha errada"},
-    {"login": "joao.silva@email.com", "password": "senha_segura_1", "label": "credenciais reais (esperado funcionar)"},
-]
+JSON_REPORT_PATH = os.path.join("logs", "login_test_report.json")
 
-SHORT, MED, LONG = 3, 8, 15
+# Pool de navegadores: as tentativas de login rodam em paralelo
+POOL_SIZE = int(os.environ.get("POOL_SIZE", "3"))
 
 
 # --- Funções de Utilitário ---
@@ -32,16 +37,16 @@ def clear_and_type(el, text):
     el.click()
     el.send_keys(Keys.CONTROL + "a")
     el.send_keys(Keys.DELETE)
-    time.sleep(0.2)
     el.send_keys(text)
 
 
-def save_screenshot(driver, name):
-    """Salva um screenshot no diretório de logs."""
-    os.makedirs(SCREENSHOT_DIR, exist_ok=True)
-    path = os.path.join(SCREENSHOT_DIR, f"{name}.png")
-    driver.save_screenshot(path)
-    return path
+def save_screenshot(driver, name, group=None, failure=False):
+    """
+    Captura um screenshot; compressão e escrita em disco ficam com o
+    pipeline de artefatos em segundo plano. Retorna o caminho (ou None se a
+    política SCREENSHOT_POLICY descartar a captura).
+    """
+    return artifacts.pipeline().capture(driver, name, group=group, failure=failure)
 
 
 def smooth_scroll(driver, pixels, steps=10, delay=0.1):
@@ -65,7 +70,6 @@ def safe_move_to_element(actions, driver, el):
     except MoveTargetOutOfBoundsException:
         try:
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", el)
-            time.sleep(0.2)
             actions.move_to_element(el).perform()
         except Exception:
             # ignora para não quebrar o fluxo de testes
@@ -76,93 +80,135 @@ def safe_move_to_element(actions, driver, el):
 
 
 def find_login_and_password_inputs(driver):
-    """Tenta localizar os campos de login, senha e o botão de submissão (usando is_displayed)."""
-    selectors = {
-        "login": ["input[type='email']", "input[name*='email']", "input[id*='email']", "input[placeholder*='email']", "input[type='text']"],
-        "password": ["input[type='password']", "input[name*='password']", "input[id*='password']", "input[placeholder*='senha']"],
-    }
-
-    login_input = password_input = submit_element = None
-    
-    for sel in selectors["login"]:
-        try:
-            el = driver.find_element(By.CSS_SELECTOR, sel)
-            if el.is_displayed():
-                login_input = el
-                break
-        except:
-            continue
-
-    for sel in selectors["password"]:
-        try:
-            el = driver.find_element(By.CSS_SELECTOR, sel)
-            if el.is_displayed():
-                password_input = el
-                break
-        except:
-            continue
-
-    try:
-        submit_element = driver.find_element(By.CSS_SELECTOR, "button[type='submit'], input[type='submit']")
-    except:
-        buttons = driver.find_elements(By.TAG_NAME, "button")
-        for b in buttons:
-            if any(t in b.text for t in ["Entrar", "Login", "Acessar"]):
-                submit_element = b
-                break
-
-    return login_input, password_input, submit_element
+    """
+    Localiza os campos de login, senha e o botão de submissão numa única
+    chamada ao navegador (seletores em `locators.LOGIN_GROUPS`).
+    """
+    found = locators.first_visible(driver, locators.LOGIN_GROUPS)
+    return found["login"], found["password"], found["submit"]
 
 
 def detect_social_buttons_and_signup(driver):
-    """Detecta botões sociais e link de cadastro no HTML (usando get_attribute)."""
-    html = driver.page_source.lower()
-    sb_count = 0
-    if "fa-google" in html or "/login/google" in html:
-        sb_count += 1
-    if "fa-microsoft" in html or "/login/microsoft" in html:
-        sb_count += 1
-    has_signup = any("cadastro" in (a.get_attribute("href") or "").lower() for a in driver.find_elements(By.TAG_NAME, "a"))
-    return sb_count, has_signup
+    """Detecta botões sociais e link de cadastro (varredura feita no navegador)."""
+    return locators.scan_login_page(driver)
 
 
 def wait_for_error_or_message(driver, timeout=8):
     """Aguarda e retorna mensagens de erro na tela."""
-    possible = [
-        ("[role='alert']", By.CSS_SELECTOR),
-        (".error", By.CSS_SELECTOR),
-        ("div[class*='error']", By.CSS_SELECTOR),
-    ]
     end = time.time() + timeout
     while time.time() < end:
-        for sel, by in possible:
-            try:
-                els = driver.find_elements(By.CSS_SELECTOR, sel)
-                texts = [e.text.strip() for e in els if e.text.strip()]
-                if texts:
-                    return " | ".join(texts)
-            except:
-                continue
-
-        page_text = driver.page_source.lower()
-        for kw in ["inválido", "senha incorreta", "erro", "credenciais", "invalid"]:
-            if kw in page_text:
-                return f"Mensagem contém '{kw}'"
+        message = locators.error_message(driver)
+        if message:
+            return message
         time.sleep(0.5)
     return None
 
 
-def test_feed_ui_and_apis(driver, report):
-    """Testa a interação com o feed, menus, cards e APIs."""
-    feed_report = {"apis": [], "ui": [], "screenshots": []}
-    actions = ActionChains(driver)
+def _card_part(cards, name):
+    """Primeiro elemento da parte `name` do card (resultado de locators.feed_cards)."""
+    if not cards[name]:
+        raise NoSuchElementException(f"{name} não encontrado no card")
+    return cards[name][0]
 
-    # --- 1️⃣ Testa APIs /api/editals e /api/proposers ---
+
+def timed_click(ctx, name, el):
+    """
+    Clica e registra o tempo até o DOM estabilizar em feed_report["interactions"].
+    O tracer fecha depois da medição: a coleta dele não entra na duração.
+    """
+    mark = ctx.tracer.begin()
+    start = time.perf_counter()
+    el.click()
+    ctx.waiter.dom_stable(quiet_ms=100)
+    ctx.feed_report["interactions"].append({"name": name, "duration_s": round(time.perf_counter() - start, 3)})
+    ctx.tracer.end(name, "click", mark)
+
+
+def new_feed_report():
+    """Estrutura do relatório do feed (mesmas chaves em execução sequencial ou em shards)."""
+    return {"apis": [], "ui": [], "screenshots": [], "waits": [], "metrics": [], "steps": [], "interactions": [],
+            "traces": [], "scenarios": []}
+
+
+class FeedContext:
+    """Estado compartilhado pelos cenários executados num mesmo driver."""
+
+    def __init__(self, driver, http=None, feed_report=None):
+        self.driver = driver
+        self.http = http or requests
+        self.feed_report = feed_report if feed_report is not None else new_feed_report()
+        self.attempts = []
+        self.actions = ActionChains(driver)
+        self.waiter = Waiter(driver, timeout=MED)
+        # Latência entrada → próximo paint de cada controle (interaction_trace)
+        self.tracer = interaction_trace.InteractionTracer(driver, self.feed_report["traces"])
+        self._cards = None
+        self.scenario = None
+
+    def ui(self, line):
+        self.feed_report["ui"].append(line)
+
+    def snapshot(self, step):
+        """Screenshot + métricas de página do passo atual."""
+        path = save_screenshot(self.driver, step, group=self.scenario)
+        if path:
+            self.feed_report["screenshots"].append(path)
+        self.feed_report["metrics"].append(page_metrics.collect(self.driver, step))
+
+    def cards(self):
+        """Contagem + partes do primeiro card, resolvidas uma vez por página."""
+        if self._cards is None:
+            if not self.waiter.element((By.CSS_SELECTOR, CARD_SELECTOR)):
+                raise TimeoutError("cards")
+            # Uma chamada só, sem trazer uma referência por card
+            self._cards = locators.feed_cards(self.driver, CARD_SELECTOR, CARD_PARTS)
+        return self._cards
+
+    def first_card(self):
+        cards = self.cards()
+        if not cards["count"]:
+            raise NoSuchElementException("Nenhum card encontrado")
+        return cards["first"]
+
+
+def run_scenario(ctx, name):
+    """
+    Executa um cenário registrado. Uma falha vira uma linha ❌ no relatório
+    (com screenshot) e não interrompe os cenários seguintes.
+    """
+    sc = scenarios.SCENARIOS[name]
+    ctx.scenario = name
+    start = time.perf_counter()
+    error = None
+    try:
+        sc["fn"](ctx)
+    except Exception as e:
+        error = repr(e)
+        ctx.ui(f"❌ {sc['label']}: {error}")
+        try:
+            ctx.feed_report["screenshots"].append(save_screenshot(ctx.driver, f"scenario_{name}_error", failure=True))
+        except Exception:
+            pass
+    # Com SCREENSHOT_POLICY=failure, as capturas de um cenário que passou são descartadas
+    discarded = set(artifacts.pipeline().resolve(name, failed=error is not None))
+    ctx.feed_report["screenshots"] = [p for p in ctx.feed_report["screenshots"] if p not in discarded]
+    ctx.scenario = None
+    result = {"name": name, "ok": error is None, "error": error, "duration_s": round(time.perf_counter() - start, 3)}
+    ctx.feed_report["steps"].append({"step": name, "duration_s": result["duration_s"]})
+    ctx.feed_report["scenarios"].append(result)
+    return result
+
+
+# --- Cenários do feed (registrados na ordem dos passos) ---
+@scenario("apis", "Falha nas APIs")
+def scenario_apis(ctx):
+    """1️⃣ Testa APIs /api/editals e /api/proposers."""
+    failed = []
     for api in ["/api/editals", "/api/proposers"]:
-        start = time.time()
+        start = time.perf_counter()
         try:
-            res = requests.get(f"{ROOT}{api}")
-            elapsed = round(time.time() - start, 2)
+            res = ctx.http.get(f"{ROOT}{api}")
+            elapsed = round(time.perf_counter() - start, 3)
             
             try:
                 data = res.json()
@@ -172,364 +218,479 @@ def test_feed_ui_and_apis(driver, report):
                 data_check = "JSON inválido"
                 is_ok = res.ok and False
 
-            feed_report["apis"].append({
+            ctx.feed_report["apis"].append({
                 "url": api,
                 "status": res.status_code,
-                "tempo": f"{elapsed}s",
+                "tempo_s": elapsed,
                 "ok": is_ok,
                 "data_check": data_check
             })
             if not is_ok:
-                feed_report["ui"].append(f"❌ API Falhou: {api} - Status {res.status_code}, {data_check}")
+                ctx.ui(f"❌ API Falhou: {api} - Status {res.status_code}, {data_check}")
+                failed.append(api)
             else:
-                feed_report["ui"].append(f"✅ API Sucesso: {api} - Status {res.status_code}, {data_check}")
+                ctx.ui(f"✅ API Sucesso: {api} - Status {res.status_code}, {data_check}")
 
         except Exception as e:
-            feed_report["apis"].append({
+            ctx.feed_report["apis"].append({
                 "url": api,
                 "status": "erro de rede",
-                "tempo": "0s",
+                "tempo_s": round(time.perf_counter() - start, 3),
                 "ok": False,
                 "erro": str(e)
             })
-            feed_report["ui"].append(f"❌ API Falhou: {api} - Erro de rede.")
+            ctx.ui(f"❌ API Falhou: {api} - Erro de rede.")
+            failed.append(api)
+    if failed:
+        raise AssertionError(f"APIs com falha: {', '.join(failed)}")
+
+
+@scenario("cards", "Falha ao localizar cards (Timeout ou Erro)", gate=True)
+def scenario_cards(ctx):
+    """2️⃣ Verifica presença de cards. Sem cards, os cenários seguintes não fazem sentido."""
+    cards = ctx.cards()
+    ctx.ui(f"Cards detectados: {cards['count']}")
+    if not cards["count"]:
+        ctx.ui("⚠️ Nenhum card encontrado.")
+        raise NoSuchElementException("Nenhum card encontrado")
+
+
+@scenario("card_interactions", "Erro na interação dos botões do card (Curtir/Salvar/Compartilhar)")
+def scenario_card_interactions(ctx):
+    """3️⃣ Interação: Curtir, Salvar, Compartilhar (Cliques e Descliques)."""
+    driver, actions, waiter = ctx.driver, ctx.actions, ctx.waiter
+    # Scroll suave até o card
+    driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", ctx.first_card())
+    waiter.scroll_settled()
+    
+    interaction_elements = ctx.cards()["interactions"]
+    
+    if len(interaction_elements) < 3:
+        ctx.ui("⚠️ Não foi possível encontrar os 3 botões de interação (Curtir, Salvar, Compartilhar).")
+        return
 
+    curtir_btn = interaction_elements[0]
+    salvar_btn = interaction_elements[1]
+    compartilhar_link = interaction_elements[2]
 
-    # --- 2️⃣ Verifica presença de cards ---
+    ctx.ui("Iniciando cliques nos botões de interação do card...")
+    
+    # Hover antes de clicar (uso safe_move_to_element)
+    safe_move_to_element(actions, driver, curtir_btn)
+    waiter.animations_done()
+    timed_click(ctx, "curtir", curtir_btn)
+    
+    safe_move_to_element(actions, driver, salvar_btn)
+    waiter.animations_done()
+    timed_click(ctx, "salvar", salvar_btn)
+    
+    safe_move_to_element(actions, driver, compartilhar_link)
+    waiter.animations_done()
+    timed_click(ctx, "compartilhar", compartilhar_link)
+    
+    ctx.ui("✅ Botões Curtir, Salvar e Compartilhar clicados (Ativado/Ação).")
+    ctx.snapshot("feed_card_interactions_marked")
+    
+    # Desativar
     try:
-        WebDriverWait(driver, MED).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div[class*='bodyCardFeed']"))
-        )
-        cards = driver.find_elements(By.CSS_SELECTOR, "div[class*='bodyCardFeed']")
-        feed_report["ui"].append(f"Cards detectados: {len(cards)}")
-        if not cards:
-            feed_report["ui"].append("⚠️ Nenhum card encontrado.")
-            return feed_report
+        timed_click(ctx, "curtir_desfazer", curtir_btn)
     except:
-        feed_report["ui"].append("❌ Falha ao localizar cards (Timeout ou Erro).")
-        return feed_report
-    
-    first_card = cards[0]
-
-
-    # --- 3️⃣ Interação: Curtir, Salvar, Compartilhar (Cliques e Descliques) ---
+        pass
     try:
-        # Scroll suave até o card
-        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", first_card)
-        time.sleep(1.5)
-        
-        interact_container = first_card.find_element(By.CSS_SELECTOR, "div[class*='InteractButtonsCardFeed']")
-        interaction_elements = interact_container.find_elements(By.XPATH, ".//button | .//a")
-        
-        if len(interaction_elements) < 3:
-            feed_report["ui"].append("⚠️ Não foi possível encontrar os 3 botões de interação (Curtir, Salvar, Compartilhar).")
-        else:
-            curtir_btn = interaction_elements[0]
-            salvar_btn = interaction_elements[1]
-            compartilhar_link = interaction_elements[2]
-
-            feed_report["ui"].append("Iniciando cliques nos botões de interação do card...")
-            
-            # Hover antes de clicar (uso safe_move_to_element)
-            safe_move_to_element(actions, driver, curtir_btn)
-            time.sleep(0.3)
-            curtir_btn.click()
-            time.sleep(0.5)
-            
-            safe_move_to_element(actions, driver, salvar_btn)
-            time.sleep(0.3)
-            salvar_btn.click()
-            time.sleep(0.5)
-            
-            safe_move_to_element(actions, driver, compartilhar_link)
-            time.sleep(0.3)
-            compartilhar_link.click()
-            time.sleep(0.5)
-            
-            feed_report["ui"].append("✅ Botões Curtir, Salvar e Compartilhar clicados (Ativado/Ação).")
-            feed_report["screenshots"].append(save_screenshot(driver, "feed_card_interactions_marked"))
-            
-            # Desativar
-            try:
-                curtir_btn.click()
-            except:
-                pass
-            time.sleep(0.5)
-            try:
-                salvar_btn.click()
-            except:
-                pass
-            time.sleep(0.5)
-            
-            feed_report["ui"].append("✅ Botões Curtir e Salvar clicados novamente (Desativado).")
-            feed_report["screenshots"].append(save_screenshot(driver, "feed_card_interactions_unmarked"))
-
-    except Exception as e:
-        feed_report["ui"].append(f"❌ Erro na interação dos botões do card (Curtir/Salvar/Compartilhar): {repr(e)}")
+        timed_click(ctx, "salvar_desfazer", salvar_btn)
+    except:
+        pass
+    
+    ctx.ui("✅ Botões Curtir e Salvar clicados novamente (Desativado).")
+    ctx.snapshot("feed_card_interactions_unmarked")
 
 
-    # --- 4️⃣ Interação: Menu 'More' (Abrir, Hover nos itens, Fechar) ---
-    try:
-        safe_move_to_element(actions, driver, first_card)
-        time.sleep(0.5)
+@scenario("more_menu", "Erro na interação com Menu More (abrir/hover/fechar)")
+def scenario_more_menu(ctx):
+    """4️⃣ Interação: Menu 'More' (Abrir, Hover nos itens, Fechar)."""
+    driver, actions, waiter = ctx.driver, ctx.actions, ctx.waiter
+    safe_move_to_element(actions, driver, ctx.first_card())
+    waiter.animations_done()
 
-        more_btn_card = first_card.find_element(By.CSS_SELECTOR, "button[class*='moreButtonCard']")
+    more_btn_card = _card_part(ctx.cards(), "more")
+    with ctx.tracer.trace("more_hover", "hover"):
         safe_move_to_element(actions, driver, more_btn_card)
-        time.sleep(0.3)
+        waiter.animations_done()
+    with ctx.tracer.trace("more_abrir"):
         more_btn_card.click()
-        
-        WebDriverWait(driver, SHORT).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div[class*='more']"))
-        )
-        time.sleep(1)
-        feed_report["ui"].append("✅ Menu 'More' aberto no card.")
-        feed_report["screenshots"].append(save_screenshot(driver, "feed_card_more_open"))
-
-        # Hover nos itens do menu More
-        more_menu_buttons = driver.find_elements(By.CSS_SELECTOR, "div[class*='moreContent'] button[class*='moreButton']")
-        
-        if more_menu_buttons:
-            feed_report["ui"].append(f"Iniciando hover em {len(more_menu_buttons)} itens do menu More...")
-            for btn in more_menu_buttons:
+        if not waiter.element((By.CSS_SELECTOR, "div[class*='more']"), timeout=SHORT):
+            raise TimeoutError("menu More não apareceu")
+        waiter.animations_done()
+    ctx.ui("✅ Menu 'More' aberto no card.")
+    ctx.snapshot("feed_card_more_open")
+
+    # Hover nos itens do menu More
+    more_menu_buttons = driver.find_elements(By.CSS_SELECTOR, "div[class*='moreContent'] button[class*='moreButton']")
+    
+    if more_menu_buttons:
+        ctx.ui(f"Iniciando hover em {len(more_menu_buttons)} itens do menu More...")
+        for btn in more_menu_buttons:
+            with ctx.tracer.trace("more_item_hover", "hover"):
                 safe_move_to_element(actions, driver, btn)
-                time.sleep(0.5)
-            feed_report["ui"].append("✅ Hover em todos os itens do menu More OK.")
-        else:
-            feed_report["ui"].append("⚠️ Nenhum item de botão encontrado no menu More.")
-
-        # Fecha o menu More
-        close_btn = driver.find_element(By.CSS_SELECTOR, "button[class*='closeButton']")
+                waiter.animations_done()
+        ctx.ui("✅ Hover em todos os itens do menu More OK.")
+    else:
+        ctx.ui("⚠️ Nenhum item de botão encontrado no menu More.")
+
+    # Fecha o menu More
+    close_btn = driver.find_element(By.CSS_SELECTOR, "button[class*='closeButton']")
+    with ctx.tracer.trace("more_fechar"):
         close_btn.click()
-        time.sleep(1)
-        feed_report["ui"].append("✅ Menu 'More' fechado.")
-
-    except Exception as e:
-        feed_report["ui"].append(f"❌ Erro na interação com Menu More (abrir/hover/fechar): {repr(e)}")
-
-
-    # --- 5️⃣ Testa botão Submit (ir para outra página e voltar) ---
-    try:
-        # Scroll suave até o botão de submit
-        submit_btn = first_card.find_element(By.CSS_SELECTOR, "a[class*='ButtomSubmitCardFeed'], button[class*='ButtomSubmitCardFeed']")
-        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", submit_btn)
-        time.sleep(1)
-        
-        safe_move_to_element(actions, driver, submit_btn)
-        time.sleep(0.5)
-        
-        current_url = driver.current_url
-        feed_report["ui"].append(f"URL atual antes do clique no Submit: {current_url}")
-        
-        submit_btn.click()
-        time.sleep(3)
-        
-        new_url = driver.current_url
-        feed_report["ui"].append(f"✅ Botão Submit clicado. Nova URL: {new_url}")
-        feed_report["screenshots"].append(save_screenshot(driver, "feed_submit_new_page"))
-        
-        # Volta para a página anterior
-        driver.back()
-        time.sleep(2)
-        
-        back_url = driver.current_url
-        feed_report["ui"].append(f"✅ Voltou para a página anterior. URL: {back_url}")
-        feed_report["screenshots"].append(save_screenshot(driver, "feed_back_from_submit"))
-        
-    except Exception as e:
-        feed_report["ui"].append(f"❌ Erro ao testar botão Submit: {repr(e)}")
-
-
-    # --- 6️⃣ Testa hovers no footer ---
-    try:
-        footer_buttons = driver.find_elements(By.CSS_SELECTOR, "footer button")
-        for btn in footer_buttons:
-            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", btn)
-            time.sleep(0.3)
+        waiter.animations_done()
+    ctx.ui("✅ Menu 'More' fechado.")
+
+
+@scenario("submit", "Erro ao testar botão Submit")
+def scenario_submit(ctx):
+    """5️⃣ Testa botão Submit (ir para outra página e voltar)."""
+    driver, actions, waiter = ctx.driver, ctx.actions, ctx.waiter
+    # Scroll suave até o botão de submit
+    submit_btn = _card_part(ctx.cards(), "submit")
+    driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", submit_btn)
+    waiter.scroll_settled()
+    
+    safe_move_to_element(actions, driver, submit_btn)
+    waiter.animations_done()
+    
+    current_url = driver.current_url
+    ctx.ui(f"URL atual antes do clique no Submit: {current_url}")
+    
+    submit_btn.click()
+    waiter.url_change(current_url, timeout=SHORT)
+    waiter.network_idle()
+    
+    new_url = driver.current_url
+    ctx.ui(f"✅ Botão Submit clicado. Nova URL: {new_url}")
+    ctx.snapshot("feed_submit_new_page")
+    
+    # Volta para a página anterior
+    driver.back()
+    waiter.url_change(new_url, timeout=SHORT)
+    waiter.document_ready()
+    
+    back_url = driver.current_url
+    ctx.ui(f"✅ Voltou para a página anterior. URL: {back_url}")
+    ctx.snapshot("feed_back_from_submit")
+
+
+@scenario("footer_hover", "Erro hover footer")
+def scenario_footer_hover(ctx):
+    """6️⃣ Testa hovers no footer."""
+    driver, actions, waiter = ctx.driver, ctx.actions, ctx.waiter
+    footer_buttons = driver.find_elements(By.CSS_SELECTOR, "footer button")
+    for btn in footer_buttons:
+        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", btn)
+        waiter.scroll_settled()
+        with ctx.tracer.trace("footer_hover", "hover"):
             safe_move_to_element(actions, driver, btn)
-            time.sleep(0.5)
-        feed_report["ui"].append(f"✅ Hover em {len(footer_buttons)} ícones do footer.")
-        feed_report["screenshots"].append(save_screenshot(driver, "feed_footer_hover"))
-    except Exception as e:
-        feed_report["ui"].append(f"❌ Erro hover footer: {repr(e)}")
+            waiter.animations_done()
+    ctx.ui(f"✅ Hover em {len(footer_buttons)} ícones do footer.")
+    ctx.snapshot("feed_footer_hover")
 
 
-    # --- 7️⃣ Testa menu dropdown (header) e Hover nos itens ---
+@scenario("header_menu", "Falha hover ou interação com itens do menu principal")
+def scenario_header_menu(ctx):
+    """7️⃣ Testa menu dropdown (header) e Hover nos itens."""
+    driver, actions, waiter = ctx.driver, ctx.actions, ctx.waiter
     try:
         # Scroll para o topo
         driver.execute_script("window.scrollTo({top: 0, behavior: 'smooth'});")
-        time.sleep(1)
+        waiter.scroll_settled()
         
         menu_btn = driver.find_element(By.XPATH, "//button[.//span[text()='Menu']]")
-        safe_move_to_element(actions, driver, menu_btn)
-        time.sleep(1.5)
-        feed_report["ui"].append("✅ Hover no botão 'Menu' principal OK.")
+        with ctx.tracer.trace("menu_hover", "hover"):
+            safe_move_to_element(actions, driver, menu_btn)
+            waiter.animations_done()
+        ctx.ui("✅ Hover no botão 'Menu' principal OK.")
         
         dropdown_items = driver.find_elements(By.CSS_SELECTOR, "header div[class*='shadow-lg'] a")
         if dropdown_items:
-            feed_report["ui"].append(f"Iniciando hover em {len(dropdown_items)} itens do menu principal...")
+            ctx.ui(f"Iniciando hover em {len(dropdown_items)} itens do menu principal...")
             for item in dropdown_items:
-                safe_move_to_element(actions, driver, item)
-                time.sleep(0.5)
-            feed_report["ui"].append("✅ Hover em todos os itens do menu principal OK.")
-        
-        feed_report["screenshots"].append(save_screenshot(driver, "feed_menu_hover_items"))
-    except Exception as e:
-        feed_report["ui"].append(f"❌ Falha hover ou interação com itens do menu principal: {repr(e)}")
+                with ctx.tracer.trace("menu_item_hover", "hover"):
+                    safe_move_to_element(actions, driver, item)
+                    waiter.animations_done()
+            ctx.ui("✅ Hover em todos os itens do menu principal OK.")
         
-    # movimento lateral original - agora seguro (ignora se fora da viewport)
-    try:
-        actions.move_by_offset(200, 0).perform()
-    except MoveTargetOutOfBoundsException:
-        # ignora se o movimento estiver fora da viewport
-        feed_report["ui"].append("⚠️ Movimento lateral ignorado (fora da viewport).")
-    except Exception:
-        # não queremos que esse movimento quebre o restante dos testes
-        pass
-    time.sleep(0.5)
+        ctx.snapshot("feed_menu_hover_items")
+    finally:
+        # movimento lateral original - agora seguro (ignora se fora da viewport)
+        try:
+            actions.move_by_offset(200, 0).perform()
+        except MoveTargetOutOfBoundsException:
+            # ignora se o movimento estiver fora da viewport
+            ctx.ui("⚠️ Movimento lateral ignorado (fora da viewport).")
+        except Exception:
+            # não queremos que esse movimento quebre o restante dos testes
+            pass
+        waiter.animations_done()
+
+
+@scenario("scroll", "Erro ao fazer scroll")
+def scenario_scroll(ctx):
+    """8️⃣ Faz scroll suave na página."""
+    driver, waiter = ctx.driver, ctx.waiter
+    # Scroll suave para o fim
+    total_height = driver.execute_script("return document.body.scrollHeight")
+    smooth_scroll(driver, total_height, steps=20, delay=0.15)
+    waiter.dom_stable()
+    ctx.ui("✅ Scroll suave para o fim da página realizado.")
+    ctx.snapshot("feed_scroll_bottom")
+    
+    # Scroll suave de volta para o topo
+    current_position = driver.execute_script("return window.pageYOffset")
+    smooth_scroll(driver, -current_position, steps=20, delay=0.15)
+    waiter.scroll_settled()
+    ctx.ui("✅ Scroll suave para o topo da página realizado.")
 
 
-    # --- 8️⃣ Faz scroll suave na página ---
+def test_feed_ui_and_apis(driver, report, http=None):
+    """
+    Testa a interação com o feed, menus, cards e APIs: executa os cenários
+    do grupo "feed" em sequência no mesmo driver.
+    `http` é a requests.Session (já autenticada) usada nas checagens de API.
+    """
+    ctx = FeedContext(driver, http)
+    ctx.feed_report["metrics"].append(page_metrics.collect(driver, "feed_load"))
+    for name in scenarios.names("feed"):
+        result = run_scenario(ctx, name)
+        if not result["ok"] and scenarios.SCENARIOS[name]["gate"]:
+            break
+    ctx.feed_report["waits"] = ctx.waiter.timings
+    return ctx.feed_report
+
+
+def run_login_attempt(driver, i, t):
+    """Executa uma tentativa de login em um driver do pool e retorna o dict `attempt`."""
+    attempt = {"attempt_number": i, "login": t["login"], "password": t["password"], "label": t["label"], "success": False, "error_message": None, "screenshot": None}
+    waiter = Waiter(driver, timeout=MED)
+    start = time.perf_counter()
+    crashed = False
     try:
-        # Scroll suave para o fim
-        total_height = driver.execute_script("return document.body.scrollHeight")
-        smooth_scroll(driver, total_height, steps=20, delay=0.15)
-        time.sleep(1.5)
-        feed_report["ui"].append("✅ Scroll suave para o fim da página realizado.")
-        feed_report["screenshots"].append(save_screenshot(driver, "feed_scroll_bottom"))
-        
-        # Scroll suave de volta para o topo
-        current_position = driver.execute_script("return window.pageYOffset")
-        smooth_scroll(driver, -current_position, steps=20, delay=0.15)
-        time.sleep(1)
-        feed_report["ui"].append("✅ Scroll suave para o topo da página realizado.")
+        # Cada worker começa sem sessão de tentativas anteriores
+        driver.delete_all_cookies()
+        driver.get(ROOT + "/login")
+        waiter.element((By.CSS_SELECTOR, "input[type='password']"))
+        login_input, password_input, submit_elem = find_login_and_password_inputs(driver)
+        if not login_input or not password_input:
+            attempt["error_message"] = "Campos de login/senha não encontrados"
+            return attempt
 
-    except Exception as e:
-        feed_report["ui"].append(f"❌ Erro ao fazer scroll: {repr(e)}")
+        clear_and_type(login_input, t["login"])
+        clear_and_type(password_input, t["password"])
 
-    return feed_report
+        if submit_elem:
+            submit_elem.click()
+        else:
+            password_input.send_keys(Keys.ENTER)
+
+        # Sai assim que houver redirecionamento ou mensagem de erro na tela
+        waiter.until("login_result", locators.login_settled, timeout=LONG)
+        success = "/login" not in driver.current_url
 
+        if success:
+            attempt["success"] = True
+            attempt["screenshot"] = save_screenshot(driver, f"attempt_{i}_success", group=f"attempt_{i}")
+            # Guarda o cookie para reaproveitar a sessão no teste do feed
+            auth_session.store_from_driver(driver)
+        else:
+            err = wait_for_error_or_message(driver, timeout=8)
+            attempt["error_message"] = err
+            attempt["screenshot"] = save_screenshot(driver, f"attempt_{i}_error", group=f"attempt_{i}")
+    except Exception as e:
+        crashed = True
+        attempt["error_message"] = repr(e)
+        attempt["screenshot"] = save_screenshot(driver, f"attempt_{i}_exception", failure=True)
+        traceback.print_exc()
+    # Capturas de sucesso/erro esperado só ficam (com SCREENSHOT_POLICY=failure) se a tentativa quebrou
+    if attempt["screenshot"] in artifacts.pipeline().resolve(f"attempt_{i}", failed=crashed):
+        attempt["screenshot"] = None
+    attempt["wait_s"] = waiter.total()
+    attempt["duration_s"] = round(time.perf_counter() - start, 3)
+    return attempt
+
+
+def _login_scenario(i, t):
+    def run(ctx):
+        ctx.attempts.append(run_login_attempt(ctx.driver, i, t))
+    return run
+
+
+# Cada credencial de TESTS vira um cenário isolado do grupo "login"
+for _i, _t in enumerate(TESTS, start=1):
+    scenario(f"login_{_i}", f"Tentativa de login {_i} ({_t['label']})", group="login")(_login_scenario(_i, _t))
+
+
+def write_text_report(report, path=REPORT_PATH):
+    """Grava o relatório legível (.txt) a partir do dict de `run_test_flow`."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("🧪 RELATÓRIO DE TESTE DE LOGIN + FEED\n")
+        f.write("=====================================\n\n")
+        f.write(f"Data: {time.ctime()}\n")
+        f.write(f"Título do site: {report['site_title']}\n")
+        f.write(f"Botões sociais: {report['social_button_count']} | Link cadastro: {report['has_signup_link']}\n")
+        f.write(f"Pool de drivers: {report['pool_size']} | Tempo das tentativas: {report['attempts_wall_time']}s\n")
+        f.write(f"Startup: pool pronto em {report['startup']['pool_build_s']}s | por driver: {report['startup']['driver_startup_s']}\n")
+        for m in report["metrics"]:
+            f.write(f"Métricas {page_metrics.format_metrics(m)}\n")
+        if report.get("artifacts"):
+            art = report["artifacts"]
+            f.write(f"Screenshots: {art['captured']} capturados | {art['written']} gravados | {art['deduped']} repetidos | "
+                    f"{art['discarded']} descartados | {art['bytes_written']} bytes | captura {art['capture_s']:.2f}s\n")
+        ls = report["locator_stats"]
+        f.write(f"Localizadores: {ls['round_trips']} chamadas | seletor em cache: {ls['hint_hits']} | sondagens: {ls['probes']}\n")
+        f.write("\n")
+
+        f.write("Tentativas de login:\n")
+        f.write("-" * 80 + "\n")
+        for a in report["attempts"]:
+            f.write(f"#{a['attempt_number']} {a['label']}\n")
+            f.write(f"Login: {a['login']} | Senha: {a['password']}\n")
+            f.write(f"Sucesso: {a['success']} | Erro: {a['error_message']}\n")
+            f.write(f"Tempo em esperas: {a.get('wait_s', 0)}s\n")
+            f.write(f"Screenshot: {a['screenshot']}\n")
+            f.write("-" * 80 + "\n")
 
-def run_test_flow():
-    """Função principal que executa o fluxo de testes de login e feed."""
-    service = Service(ChromeDriverManager().install())
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized")
-    driver = webdriver.Chrome(service=service, options=options)
-    wait = WebDriverWait(driver, LONG)
+        if report.get("feed"):
+            f.write("\n--- Testes de FEED ---\n")
+            for line in report["feed"]["ui"]:
+                f.write(f"{line}\n")
+            f.write("\n--- Testes de APIs ---\n")
+            for api in report["feed"]["apis"]:
+                f.write(f"{api['url']} → {api['status']} ({api['tempo_s']}s) | Data Check: {api.get('data_check', 'N/A')}\n")
+            f.write("\n--- Cenários (duração) ---\n")
+            for sc in report["feed"]["scenarios"]:
+                f.write(f"{'✅' if sc['ok'] else '❌'} {sc['name']}: {sc['duration_s']}s\n")
+            for it in report["feed"]["interactions"]:
+                f.write(f"clique {it['name']}: {it['duration_s']}s\n")
+            f.write("\n--- Latência de interação (entrada → próximo paint) ---\n")
+            for control, t in interaction_trace.summarize(report["feed"].get("traces", [])).items():
+                rerender = f" | ⚠️ feed re-renderizado {t['feed_rerenders']}x" if t["feed_rerenders"] else ""
+                f.write(f"{control}: {t['count']}x | p50 {t['p50_ms']}ms | p95 {t['p95_ms']}ms | máx {t['max_ms']}ms | "
+                        f"cards alterados (máx) {t['max_cards_touched']}{rerender}\n")
+            for t in report["feed"].get("traces", []):
+                if t.get("trace"):
+                    f.write(f"trace {t['control']} ({t['latency_ms']}ms): {t['trace']}\n")
+            f.write("\n--- Métricas de performance ---\n")
+            for m in report["feed"]["metrics"]:
+                f.write(f"{page_metrics.format_metrics(m)}\n")
+            f.write("\n--- Esperas (tempo real) ---\n")
+            for w in report["feed"]["waits"]:
+                f.write(f"{w['wait']}: {w['duration_s']}s {'OK' if w['ok'] else 'TIMEOUT'}\n")
+            f.write("\nScreenshots Feed:\n" + "\n".join(report["feed"]["screenshots"]))
+
+        f.write(f"\n\nResumo: {report['summary']}\n")
+
+
+def run_test_flow(feed_only=False):
+    """
+    Função principal que executa o fluxo de testes de login e feed.
+    Com `feed_only`, pula as tentativas de login e usa a sessão em cache.
+    """
+    # O navegador quente do processo entra no pool; os demais sobem sem imagens/fontes
+    start = time.perf_counter()
+    size = 1 if feed_only else min(POOL_SIZE, len(TESTS))
+    pool = DriverPool(lambda: build_driver(block_media=True), size, warm=[shared_driver()])
+    pool_build_s = round(time.perf_counter() - start, 3)
+    driver = pool.acquire()
+    waiter = Waiter(driver, timeout=LONG)
 
     report = {
         "attempts": [],
+        "attempts_wall_time": None,
+        "feed_only": feed_only,
         "site_title": None,
         "social_button_count": 0,
         "has_signup_link": False,
+        "pool_size": pool.size,
+        "startup": {"pool_build_s": pool_build_s, "driver_startup_s": list(startup_times)},
+        "metrics": [],
         "feed": None,
         "summary": ""
     }
 
     try:
-        driver.get(ROOT + "/login")
-        wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        time.sleep(2)
-
-        report["site_title"] = driver.title
-        sb_count, has_signup = detect_social_buttons_and_signup(driver)
-        report["social_button_count"] = sb_count
-        report["has_signup_link"] = has_signup
-
-        # --- Execução das tentativas de login ---
-        for i, t in enumerate(TESTS, start=1):
-            attempt = {"attempt_number": i, "login": t["login"], "password": t["password"], "label": t["label"], "success": False, "error_message": None, "screenshot": None}
-            try:
-                driver.get(ROOT + "/login")
-                time.sleep(1.5)
-                login_input, password_input, submit_elem = find_login_and_password_inputs(driver)
-                if not login_input or not password_input:
-                    attempt["error_message"] = "Campos de login/senha não encontrados"
-                    report["attempts"].append(attempt)
-                    continue
-
-                clear_and_type(login_input, t["login"])
-                clear_and_type(password_input, t["password"])
-                time.sleep(0.5)
-                
-                if submit_elem:
-                    submit_elem.click()
-                else:
-                    password_input.send_keys(Keys.ENTER)
-                time.sleep(4)
-
-                success = False
-                for _ in range(10):
-                    if "/login" not in driver.current_url:
-                        success = True
-                        break
-                    time.sleep(0.7)
-
-                if success:
-                    attempt["success"] = True
-                    attempt["screenshot"] = save_screenshot(driver, f"attempt_{i}_success")
-                else:
-                    err = wait_for_error_or_message(driver, timeout=8)
-                    attempt["error_message"] = err
-                    attempt["screenshot"] = save_screenshot(driver, f"attempt_{i}_error")
-
-                report["attempts"].append(attempt)
-            except Exception as e:
-                attempt["error_message"] = repr(e)
-                attempt["screenshot"] = save_screenshot(driver, f"attempt_{i}_exception")
-                report["attempts"].append(attempt)
-                traceback.print_exc()
-
-        # Se o login real foi bem-sucedido, executa testes no feed
-        last_success = next((a for a in report["attempts"] if a["success"]), None)
-        if last_success:
+        if not feed_only:
+            driver.get(ROOT + "/login")
+            waiter.element((By.TAG_NAME, "body"))
+            waiter.network_idle()
+
+            report["site_title"] = driver.title
+            report["metrics"].append(page_metrics.collect(driver, "login_page"))
+            sb_count, has_signup = detect_social_buttons_and_signup(driver)
+            report["social_button_count"] = sb_count
+            report["has_signup_link"] = has_signup
+            pool.release(driver)
+            driver = None
+
+            # --- Execução das tentativas de login (em paralelo no pool) ---
+            start = time.time()
+            attempts = pool.map(lambda d, it: run_login_attempt(d, *it), list(enumerate(TESTS, start=1)))
+            report["attempts_wall_time"] = round(time.time() - start, 2)
+            report["attempts"] = sorted(attempts, key=lambda a: a["attempt_number"])
+
+        if driver is None:
+            driver = pool.acquire()
+            waiter = Waiter(driver, timeout=LONG)
+
+        # Sessão: reaproveita o cookie do login (ou do cache) em vez de refazer o formulário
+        cookie = None
+        if feed_only or any(a["success"] for a in report["attempts"]):
+            cookie = auth_session.get_session(SESSION_USER["login"], SESSION_USER["password"], driver=driver)
+
+        if cookie:
             print("\n🧭 Acessando feed pós-login e executando testes de UI/API...")
+            # O feed precisa das imagens dos cards
+            set_media_blocking(driver, False)
+            auth_session.inject_into_driver(driver, cookie)
             driver.get(ROOT + "/")
-            time.sleep(3)
-            report["feed"] = test_feed_ui_and_apis(driver, report)
+            waiter.network_idle()
+            with requests.Session() as http:
+                auth_session.inject_into_requests(http, cookie)
+                report["feed"] = test_feed_ui_and_apis(driver, report, http)
 
         # Sumário
         total = len(report["attempts"])
         success = sum(1 for a in report["attempts"] if a["success"])
         report["summary"] = f"Total: {total}, Sucesso: {success}, Falhas: {total - success}"
+        report["locator_stats"] = dict(locators.stats)
+        if report["feed"]:
+            # Trace completo só das interações mais lentas; o relatório fica com o resumo
+            interaction_trace.keep_slowest(report["feed"]["traces"])
+        # Os arquivos citados no relatório precisam existir antes de gravá-lo
+        artifacts.pipeline().flush()
+        report["artifacts"] = dict(artifacts.pipeline().stats)
 
         # --- Salva relatório ---
-        os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
-        with open(REPORT_PATH, "w", encoding="utf-8") as f:
-            f.write("🧪 RELATÓRIO DE TESTE DE LOGIN + FEED\n")
-            f.write("=====================================\n\n")
-            f.write(f"Data: {time.ctime()}\n")
-            f.write(f"Título do site: {report['site_title']}\n")
-            f.write(f"Botões sociais: {report['social_button_count']} | Link cadastro: {report['has_signup_link']}\n\n")
-
-            f.write("Tentativas de login:\n")
-            f.write("-" * 80 + "\n")
-            for a in report["attempts"]:
-                f.write(f"#{a['attempt_number']} {a['label']}\n")
-                f.write(f"Login: {a['login']} | Senha: {a['password']}\n")
-                f.write(f"Sucesso: {a['success']} | Erro: {a['error_message']}\n")
-                f.write(f"Screenshot: {a['screenshot']}\n")
-                f.write("-" * 80 + "\n")
-
-            if report.get("feed"):
-                f.write("\n--- Testes de FEED ---\n")
-                for line in report["feed"]["ui"]:
-                    f.write(f"{line}\n")
-                f.write("\n--- Testes de APIs ---\n")
-                for api in report["feed"]["apis"]:
-                    f.write(f"{api['url']} → {api['status']} ({api['tempo']}) | Data Check: {api.get('data_check', 'N/A')}\n")
-                f.write("\nScreenshots Feed:\n" + "\n".join(report["feed"]["screenshots"]))
-
-            f.write(f"\n\nResumo: {report['summary']}\n")
-
-        print(f"\nRelatório salvo em: {REPORT_PATH}")
+        write_text_report(report)
+
+        # --- Relatório estruturado + histórico append-only ---
+        with open(JSON_REPORT_PATH, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        report_store.append_run(report_store.build_run("ui", report_store.flatten_report(report), report["summary"]))
+
+        print(f"\nRelatório salvo em: {REPORT_PATH} (JSON: {JSON_REPORT_PATH}, histórico: {report_store.RUNS_PATH})")
 
     except Exception as e:
         print("Erro geral:", e)
         traceback.print_exc()
     finally:
-        driver.quit()
+        pool.quit()
 
 
 if __name__ == "__main__":
-    run_test_flow()
+    # LOCAL_SUPABASE=1: serve mock/*.csv no lugar do Supabase remoto
+    # (o Next precisa apontar NEXT_PUBLIC_SUPABASE_URL para esta porta)
+    if os.environ.get("LOCAL_SUPABASE") == "1":
+        import mock_supabase
+        mock_supabase.start_server(int(os.environ.get("LOCAL_SUPABASE_PORT", mock_supabase.DEFAULT_PORT)))
+    parser = argparse.ArgumentParser(description="Testes de login + feed")
+    parser.add_argument("--feed-only", action="store_true", help="pula as tentativas de login e reaproveita a sessão em cache")
+    args = parser.parse_args()
+    run_test_flow(feed_only=args.feed_only)
@@ -0,0 +1,178 @@
+# testes/waits.py
+
+import json
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+# Intervalo de polling dos waits baseados em WebDriverWait
+POLL = 0.05
+
+def _document_complete(driver):
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+# JS: resolve quando o DOM fica `quiet_ms` sem mutações (ou estoura o timeout)
+_DOM_STABLE_JS = """
+const quietMs = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+const start = performance.now();
+let last = start;
+const obs = new MutationObserver(() => { last = performance.now(); });
+obs.observe(document.documentElement, {subtree: true, childList: true, attributes: true, characterData: true});
+(function check() {
+  const now = performance.now();
+  if (now - last >= quietMs || now - start >= timeoutMs) {
+    obs.disconnect();
+    done(now - last >= quietMs);
+  } else {
+    setTimeout(check, 25);
+  }
+})();
+"""
+
+# JS: resolve quando não há animações/transições CSS em execução
+_ANIMATIONS_DONE_JS = """
+const timeoutMs = arguments[0], done = arguments[arguments.length - 1];
+const start = performance.now();
+(function check() {
+  const running = document.getAnimations ? document.getAnimations().filter(a => a.playState === 'running') : [];
+  if (!running.length) return done(true);
+  if (performance.now() - start >= timeoutMs) return done(false);
+  requestAnimationFrame(check);
+})();
+"""
+
+# JS: resolve quando a posição de scroll fica parada por alguns frames
+_SCROLL_SETTLED_JS = """
+const timeoutMs = arguments[0], done = arguments[arguments.length - 1];
+const start = performance.now();
+let lastY = window.scrollY, still = 0;
+(function check() {
+  const y = window.scrollY;
+  still = (y === lastY) ? still + 1 : 0;
+  lastY = y;
+  if (still >= 3) return done(true);
+  if (performance.now() - start >= timeoutMs) return done(false);
+  requestAnimationFrame(check);
+})();
+"""
+
+
+class Waiter:
+    """
+    Camada de espera orientada a eventos.
+
+    Cada método retorna assim que a condição é satisfeita (ou estoura o
+    timeout) e registra em `timings` quanto tempo a espera realmente levou.
+    """
+
+    def __init__(self, driver, timeout=8):
+        self.driver = driver
+        self.timeout = timeout
+        self.timings = []
+
+    def _record(self, name, start, ok):
+        elapsed = round(time.perf_counter() - start, 3)
+        self.timings.append({"wait": name, "duration_s": elapsed, "ok": ok})
+        return ok
+
+    def _wait(self, condition, timeout=None):
+        """Espera sem registro: resultado da condição, ou None no timeout."""
+        try:
+            return WebDriverWait(self.driver, self.timeout if timeout is None else timeout, poll_frequency=POLL).until(condition)
+        except TimeoutException:
+            return None
+
+    def until(self, name, condition, timeout=None):
+        """Espera genérica: `condition(driver)` truthy encerra a espera."""
+        start = time.perf_counter()
+        result = self._wait(condition, timeout)
+        self._record(name, start, result is not None)
+        return result
+
+    def url_change(self, old_url, timeout=None):
+        """Espera a URL mudar em relação a `old_url`."""
+        return bool(self.until("url_change", lambda d: d.current_url != old_url, timeout))
+
+    def url_matches(self, predicate, timeout=None, name="url_matches"):
+        """Espera até `predicate(url)` ser verdadeiro."""
+        return bool(self.until(name, lambda d: predicate(d.current_url), timeout))
+
+    def element(self, locator, timeout=None):
+        """Espera um elemento ficar visível e o retorna (ou None); uma chamada ao driver por polling."""
+        return self.until(f"element {locator[1]}", EC.visibility_of_element_located(locator), timeout)
+
+    def document_ready(self, timeout=None):
+        """Espera `document.readyState === 'complete'`."""
+        return bool(self.until("document_ready", _document_complete, timeout))
+
+    def _async_js(self, name, script, timeout, *args):
+        """Executa um wait em JS (execute_async_script) e registra a duração."""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        self.driver.set_script_timeout(timeout + 1)
+        try:
+            ok = bool(self.driver.execute_async_script(script, *args, timeout * 1000))
+        except WebDriverException:
+            ok = False
+        return self._record(name, start, ok)
+
+    def dom_stable(self, quiet_ms=200, timeout=None):
+        """Espera o DOM ficar `quiet_ms` sem mutações (MutationObserver)."""
+        return self._async_js("dom_stable", _DOM_STABLE_JS, timeout, quiet_ms)
+
+    def animations_done(self, timeout=None):
+        """Espera o fim das transições/animações CSS em execução."""
+        return self._async_js("animations_done", _ANIMATIONS_DONE_JS, timeout)
+
+    def scroll_settled(self, timeout=None):
+        """Espera o fim de um scroll suave (posição estável por 3 frames)."""
+        return self._async_js("scroll_settled", _SCROLL_SETTLED_JS, timeout)
+
+    def network_idle(self, idle_ms=300, timeout=None):
+        """
+        Espera a rede ficar ociosa por `idle_ms`, acompanhando os eventos
+        Network.* do CDP (log de performance do chromedriver). Requer o
+        capability `goog:loggingPrefs` com `performance` habilitado.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        inflight = set()
+        last_activity = start
+        ok = False
+        while time.perf_counter() - start < timeout:
+            try:
+                entries = self.driver.get_log("performance")
+            except WebDriverException:
+                # Sem log de performance: cai para o estado do documento (a
+                # espera conta uma vez só, como network_idle)
+                remaining = max(POLL, timeout - (time.perf_counter() - start))
+                return self._record("network_idle", start, self._wait(_document_complete, remaining) is not None)
+            for entry in entries:
+                msg = json.loads(entry["message"])["message"]
+                method, params = msg.get("method"), msg.get("params", {})
+                if method == "Network.requestWillBeSent":
+                    inflight.add(params.get("requestId"))
+                elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+                    inflight.discard(params.get("requestId"))
+                else:
+                    continue
+                last_activity = time.perf_counter()
+            if not inflight and (time.perf_counter() - last_activity) * 1000 >= idle_ms:
+                ok = True
+                break
+            time.sleep(POLL)
+        return self._record("network_idle", start, ok)
+
+    def settled(self, timeout=None):
+        """Atalho para 'UI pronta': rede ociosa, DOM estável e sem animações."""
+        self.network_idle(timeout=timeout)
+        self.dom_stable(timeout=timeout)
+        return self.animations_done(timeout=timeout)
+
+    def total(self):
+        """Tempo total gasto em esperas até agora."""
+        return round(sum(t["duration_s"] for t in self.timings), 3)